@@ -0,0 +1,359 @@
+"""
+REST call budget checks for template applies.
+
+Applies a synthetic template through the offline harness and checks the
+REST calls each scenario makes against a fixed budget:
+
+- a fresh apply makes exactly one create per category and channel
+- applying to a guild that already matches makes no mutating calls, whether
+  the template was just applied or the guild was built by hand
+- changing one channel topic makes exactly one channel edit
+- reordered and drifted guilds take at most one call per template object
+- permission overwrites go out with the create or the one channel edit,
+  never as a call per role
+- template roles cost one call each when they change, and reordering them
+  is a single bulk position update
+- announcement, stage and forum channels are created with all their
+  attributes in one call, and adding a forum tag is one edit that keeps
+  the other tags' IDs
+- renaming channels that have a template ``id`` costs one edit each and
+  leaves no extras behind
+- on the JSON state store, only operations that change something are
+  journaled, so a converged apply writes no journal entries
+
+Usage:
+    python benchmarks/api_budget.py [--channels 50]
+
+Exits with status 1 if any budget is exceeded, so CI fails on regressions.
+"""
+
+import argparse
+import asyncio
+import copy
+import sys
+import tempfile
+from dataclasses import dataclass
+from typing import Dict, List
+
+import yaml
+
+from harness import FORUM, TEXT, ApplyRun, DiscordHarness, Layout, quiet_logs
+
+from apply_bench import FORMATS, drift, reorder, synthetic_layout, template_files
+
+from gitcord.utils.state_store import JsonStateStore
+
+CHANNEL_EDIT = ("PATCH", "/channels/{channel_id}")
+ROLE_POSITIONS = ("PATCH", "/guilds/{guild_id}/roles")
+
+# Overwrites for every category of the permissions scenarios
+CATEGORY_PERMISSIONS = {
+    "@everyone": {"deny": ["view_channel"]},
+    "Members": {"allow": ["view_channel"]},
+    "Moderators": {"allow": ["view_channel", "manage_messages"]},
+}
+ROLES = ("Members", "Moderators", "Muted")
+
+# The roles section of the roles scenarios, highest first
+TEMPLATE_ROLES = [
+    {"name": "Moderators", "color": "#3498db", "permissions": ["manage_messages", "kick_members"], "hoist": True},
+    {"name": "Members", "mentionable": True},
+    {"name": "Muted", "color": 0x95A5A6},
+]
+
+
+@dataclass
+class Budget:
+    """A limit on the calls one scenario may make."""
+
+    scenario: str
+    metric: str
+    actual: int
+    limit: int
+    exact: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.actual == self.limit if self.exact else self.actual <= self.limit
+
+    def __str__(self) -> str:
+        bound = "==" if self.exact else "<="
+        status = "ok" if self.ok else "FAIL"
+        return f"{status:<4} {self.scenario:<44} {self.metric:<16} {self.actual:>4} {bound} {self.limit}"
+
+
+def _mutating(run: ApplyRun, route=None) -> int:
+    return sum(
+        1 for call in run.calls
+        if call.is_mutating and (route is None or (call.method, call.route) == route)
+    )
+
+
+async def check_format(harness: DiscordHarness, layout: Layout, template_format: str) -> List[Budget]:
+    """Run every scenario for one template format and return its budgets."""
+    files: Dict[str, str] = template_files(layout, template_format)
+    objects = len(layout) + sum(len(channels) for channels in layout.values())
+    budgets = []
+
+    def expect(scenario, metric, actual, limit, exact=False):
+        budgets.append(Budget(f"{template_format}/{scenario}", metric, actual, limit, exact))
+
+    guild = harness.create_guild()
+    fresh = await harness.apply(guild, files)
+    expect("fresh", "mutating calls", fresh.mutating_calls, objects, exact=True)
+    expect("fresh", "all calls", fresh.api_calls, objects)
+
+    converged = await harness.apply(guild, files)
+    expect("converged", "mutating calls", converged.mutating_calls, 0, exact=True)
+
+    prebuilt = await harness.apply(harness.create_guild(layout), files)
+    expect("prebuilt", "mutating calls", prebuilt.mutating_calls, 0, exact=True)
+
+    fake = harness.fake_guild(guild)
+    channel = next(ch for ch in fake.channels.values() if ch["type"] == TEXT)
+    fake.edit_channel(int(channel["id"]), topic="Changed by hand")
+    topic = await harness.apply(guild, files)
+    expect("topic changed", "channel edits", _mutating(topic, CHANNEL_EDIT), 1, exact=True)
+    expect("topic changed", "mutating calls", topic.mutating_calls, 1, exact=True)
+
+    reorder(fake)
+    reordered = await harness.apply(guild, files)
+    expect("reordered", "mutating calls", reordered.mutating_calls, objects)
+    settled = await harness.apply(guild, files)
+    expect("reordered, then re-applied", "mutating calls", settled.mutating_calls, 0, exact=True)
+
+    drift(fake)
+    drifted = await harness.apply(guild, files)
+    expect("drifted", "mutating calls", drifted.mutating_calls, objects)
+    settled = await harness.apply(guild, files)
+    expect("drifted, then re-applied", "mutating calls", settled.mutating_calls, 0, exact=True)
+    return budgets
+
+
+def with_permissions(layout: Layout, template_format: str) -> Dict[str, str]:
+    """Template files for ``layout`` with category overwrites and some per-channel ones."""
+    layout = copy.deepcopy(layout)
+    for channels in layout.values():
+        for index, channel in enumerate(channels):
+            if index % 3 == 0:
+                channel["permissions"] = {"Muted": {"deny": ["send_messages", "add_reactions"]}}
+    files = template_files(layout, template_format)
+    for path, text in files.items():
+        if path == "template.yaml":
+            template = yaml.safe_load(text)
+            for category in template["categories"]:
+                category["permissions"] = CATEGORY_PERMISSIONS
+            files[path] = yaml.safe_dump(template, sort_keys=False)
+        elif path.endswith("/category.yaml"):
+            files[path] = yaml.safe_dump(
+                {**yaml.safe_load(text), "permissions": CATEGORY_PERMISSIONS}, sort_keys=False
+            )
+    return files
+
+
+async def check_permissions(harness: DiscordHarness, layout: Layout, template_format: str) -> List[Budget]:
+    """Budgets for a template where every category and a third of the channels set overwrites."""
+    files = with_permissions(layout, template_format)
+    objects = len(layout) + sum(len(channels) for channels in layout.values())
+    budgets = []
+
+    def expect(scenario, metric, actual, limit, exact=False):
+        budgets.append(Budget(f"{template_format}/permissions/{scenario}", metric, actual, limit, exact))
+
+    guild = harness.create_guild()
+    fake = harness.fake_guild(guild)
+    for role in ROLES:
+        fake.add_role(role)
+    fresh = await harness.apply(guild, files)
+    expect("fresh", "mutating calls", fresh.mutating_calls, objects, exact=True)
+    converged = await harness.apply(guild, files)
+    expect("converged", "mutating calls", converged.mutating_calls, 0, exact=True)
+
+    channel = next(ch for ch in fake.channels.values() if ch["type"] == TEXT)
+    fake.edit_channel(int(channel["id"]), permission_overwrites=[], topic="Changed by hand")
+    edited = await harness.apply(guild, files)
+    expect("overwrites changed", "mutating calls", edited.mutating_calls, 1, exact=True)
+    return budgets
+
+
+def with_channel_types(layout: Layout) -> Layout:
+    """``layout`` with channels of every type, each setting its type-specific attributes."""
+    layout = copy.deepcopy(layout)
+    for channels in layout.values():
+        for index, channel in enumerate(channels):
+            if channel["type"] == "voice":
+                channel.update(bitrate=96000, user_limit=10)
+                if index % 2:
+                    channel.update(type="stage", user_limit=50)
+            elif index % 3 == 1:
+                channel.update(type="announcement")
+            elif index % 3 == 2:
+                channel.update(
+                    type="forum", slowmode=30, layout="gallery", default_reaction="👍",
+                    thread_slowmode=60, tags=["Bug", {"name": "Idea", "emoji": "💡"}],
+                )
+            else:
+                channel.update(slowmode=10)
+    return layout
+
+
+async def check_channel_types(harness: DiscordHarness, layout: Layout, template_format: str) -> List[Budget]:
+    """Budgets for a template mixing every channel type and its attributes."""
+    layout = with_channel_types(layout)
+    files = template_files(layout, template_format)
+    objects = len(layout) + sum(len(channels) for channels in layout.values())
+    budgets = []
+
+    def expect(scenario, metric, actual, limit, exact=False):
+        budgets.append(Budget(f"{template_format}/channel types/{scenario}", metric, actual, limit, exact))
+
+    guild = harness.create_guild()
+    fresh = await harness.apply(guild, files)
+    expect("fresh", "mutating calls", fresh.mutating_calls, objects, exact=True)
+    expect("fresh", "warnings", len(fresh.report.warnings), 0, exact=True)
+    converged = await harness.apply(guild, files)
+    expect("converged", "mutating calls", converged.mutating_calls, 0, exact=True)
+
+    # Adding a forum tag is one edit that keeps the IDs of the tags already there
+    forum = next(ch for channels in layout.values() for ch in channels if ch["type"] == "forum")
+    fake_forum = harness.fake_guild(guild).find(forum["name"], FORUM)
+    tag_ids = {tag["name"]: tag["id"] for tag in fake_forum["available_tags"]}
+    forum["tags"] = forum["tags"] + ["Question"]
+    tagged = await harness.apply(guild, template_files(layout, template_format))
+    expect("forum tag added", "mutating calls", tagged.mutating_calls, 1, exact=True)
+    kept = sum(tag_ids.get(tag["name"]) == tag["id"] for tag in fake_forum["available_tags"])
+    expect("forum tag added", "tag IDs kept", kept, len(tag_ids), exact=True)
+    return budgets
+
+
+def with_ids(layout: Layout, suffix: str = "") -> Layout:
+    """``layout`` with a stable template ``id`` on every channel, and ``suffix`` added to their names."""
+    layout = copy.deepcopy(layout)
+    for channels in layout.values():
+        for channel in channels:
+            channel.update(id=channel["name"], name=channel["name"] + suffix)
+    return layout
+
+
+async def check_renames(harness: DiscordHarness, layout: Layout, template_format: str) -> List[Budget]:
+    """Budgets for renaming every channel of a template that gives them IDs."""
+    channels = sum(len(channels) for channels in layout.values())
+    budgets = []
+
+    def expect(scenario, metric, actual, limit, exact=False):
+        budgets.append(Budget(f"{template_format}/renamed/{scenario}", metric, actual, limit, exact))
+
+    guild = harness.create_guild()
+    await harness.apply(guild, template_files(with_ids(layout), template_format))
+    files = template_files(with_ids(layout, "-renamed"), template_format)
+    renamed = await harness.apply(guild, files)
+    expect("by id", "mutating calls", renamed.mutating_calls, channels, exact=True)
+    expect("by id", "channel edits", _mutating(renamed, CHANNEL_EDIT), channels, exact=True)
+    expect("by id", "extras", len(renamed.report.extra_ids), 0, exact=True)
+    converged = await harness.apply(guild, files)
+    expect("converged", "mutating calls", converged.mutating_calls, 0, exact=True)
+    return budgets
+
+
+async def check_roles(harness: DiscordHarness, layout: Layout) -> List[Budget]:
+    """Budgets for a monolithic template that also declares the roles its permissions use."""
+    files = with_permissions(layout, "monolithic")
+    template = yaml.safe_load(files["template.yaml"])
+    files["template.yaml"] = yaml.safe_dump({"roles": TEMPLATE_ROLES, **template}, sort_keys=False)
+    objects = len(layout) + sum(len(channels) for channels in layout.values())
+    budgets = []
+
+    def expect(scenario, metric, actual, limit, exact=False):
+        budgets.append(Budget(f"monolithic/roles/{scenario}", metric, actual, limit, exact))
+
+    guild = harness.create_guild()
+    fresh = await harness.apply(guild, files)
+    expect("fresh", "mutating calls", fresh.mutating_calls, objects + len(TEMPLATE_ROLES) + 1)
+    expect("fresh", "position updates", _mutating(fresh, ROLE_POSITIONS), 1)
+    expect("fresh", "warnings", len(fresh.report.warnings), 0, exact=True)
+    converged = await harness.apply(guild, files)
+    expect("converged", "mutating calls", converged.mutating_calls, 0, exact=True)
+
+    fake = harness.fake_guild(guild)
+    managed = [role for role in fake.roles if role["name"] in ROLES]
+    for role, position in zip(managed, reversed([role["position"] for role in managed])):
+        fake.edit_role(int(role["id"]), position=position)
+    reordered = await harness.apply(guild, files)
+    expect("reordered", "mutating calls", reordered.mutating_calls, 1, exact=True)
+    return budgets
+
+
+class CountingJsonStore(JsonStateStore):
+    """The JSON state store, counting journal entries written."""
+
+    def __init__(self, data_dir: str):
+        super().__init__(data_dir)
+        self.journal_writes = 0
+
+    def journal_op(self, guild_id, key, status, object_id=None) -> None:
+        self.journal_writes += 1
+        super().journal_op(guild_id, key, status, object_id)
+
+
+async def check_journal(layout: Layout) -> List[Budget]:
+    """Budgets for the apply journal on the default JSON state store."""
+    files = template_files(layout, "monolithic")
+    objects = len(layout) + sum(len(channels) for channels in layout.values())
+    budgets = []
+
+    def expect(scenario, metric, actual, limit, exact=False):
+        budgets.append(Budget(f"json store/{scenario}", metric, actual, limit, exact))
+
+    with tempfile.TemporaryDirectory() as state_dir:
+        store = CountingJsonStore(state_dir)
+        async with DiscordHarness(state_store=store) as harness:
+            guild = harness.create_guild()
+
+            async def journal_writes() -> int:
+                before = store.journal_writes
+                await harness.apply(guild, files)
+                return store.journal_writes - before
+
+            # Each change is started, then done
+            expect("fresh", "journal writes", await journal_writes(), 2 * objects, exact=True)
+            expect("converged", "journal writes", await journal_writes(), 0, exact=True)
+            fake = harness.fake_guild(guild)
+            channel = next(ch for ch in fake.channels.values() if ch["type"] == TEXT)
+            fake.edit_channel(int(channel["id"]), topic="Changed by hand")
+            expect("topic changed", "journal writes", await journal_writes(), 2, exact=True)
+    return budgets
+
+
+async def run_checks(channels: int) -> List[Budget]:
+    layout = synthetic_layout(channels)
+    budgets = []
+    async with DiscordHarness() as harness:
+        for template_format in FORMATS:
+            budgets.extend(await check_format(harness, layout, template_format))
+            budgets.extend(await check_permissions(harness, layout, template_format))
+            budgets.extend(await check_channel_types(harness, layout, template_format))
+            budgets.extend(await check_renames(harness, layout, template_format))
+        budgets.extend(await check_roles(harness, layout))
+    budgets.extend(await check_journal(layout))
+    return budgets
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--channels", type=int, default=50, help="channels in the synthetic template")
+    args = parser.parse_args()
+
+    quiet_logs()
+    budgets = asyncio.run(run_checks(args.channels))
+    for budget in budgets:
+        print(budget)
+    failed = [budget for budget in budgets if not budget.ok]
+    if failed:
+        print(f"{len(failed)} of {len(budgets)} REST call budgets exceeded")
+        return 1
+    print(f"All {len(budgets)} REST call budgets met")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
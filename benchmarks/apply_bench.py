@@ -0,0 +1,246 @@
+"""
+Template apply benchmark suite.
+
+Applies synthetic templates of 5 to 500 channels, in both the monolithic
+(``template.yaml``) and legacy (one YAML per category and channel) formats,
+to guilds in four states:
+
+- ``fresh``: an empty guild
+- ``converged``: a guild the template was just applied to
+- ``reordered``: converged, then every category and channel order reversed
+- ``drifted``: converged, then topics and NSFW flags changed, channels
+  deleted, moved to other categories and extra ones added
+
+For each run it records parse, plan and wall-clock apply time and the REST
+calls made, and writes everything to a JSON file for comparison across
+releases. Applies journal and record history in an in-memory SQLite store,
+or with ``--state json`` in the default JSON store in a temporary directory.
+
+Usage:
+    python benchmarks/apply_bench.py [--sizes 5 50 500] [--latency 0.05]
+        [--rate-limit 5/5] [--repeat 3] [--state json] [--output FILE]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+import yaml
+
+from harness import CATEGORY, TEXT, DiscordHarness, FakeGuild, Layout, RateLimit, quiet_logs
+
+import gitcord
+from gitcord.utils.state_store import JsonStateStore
+from gitcord.utils.helpers import (
+    parse_category_config_from_str,
+    parse_channel_config_from_str,
+    parse_monolithic_template_from_str,
+)
+
+DEFAULT_SIZES = (5, 50, 500)
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results", "apply_bench.json")
+CHANNELS_PER_CATEGORY = 10
+FORMATS = ("monolithic", "legacy")
+SCENARIOS = ("fresh", "converged", "reordered", "drifted")
+
+
+def synthetic_layout(channels: int) -> Layout:
+    """A template of ``channels`` channels, ten per category, one in five voice."""
+    layout: Layout = {}
+    for index in range(channels):
+        category = layout.setdefault(f"Category {index // CHANNELS_PER_CATEGORY:02d}", [])
+        if index % 5 == 4:
+            category.append({"name": f"voice-{index:03d}", "type": "voice"})
+        else:
+            category.append({
+                "name": f"text-{index:03d}",
+                "type": "text",
+                "topic": f"Topic of channel {index}",
+                "nsfw": index % 7 == 0,
+            })
+    return layout
+
+
+def template_files(layout: Layout, template_format: str) -> Dict[str, str]:
+    """Render a layout as the files of a monolithic or legacy template."""
+    if template_format == "monolithic":
+        template = {
+            "server": {"name": "Benchmark", "version": "1.0"},
+            "categories": [
+                {"name": name, "type": "category", "channels": channels}
+                for name, channels in layout.items()
+            ],
+        }
+        return {"template.yaml": yaml.safe_dump(template, sort_keys=False)}
+    files = {}
+    for index, (name, channels) in enumerate(layout.items()):
+        root = f"{index:02d}-{name.lower().replace(' ', '-')}"
+        files[f"{root}/category.yaml"] = yaml.safe_dump({
+            "name": name, "type": "category", "channels": [ch["name"] for ch in channels],
+        }, sort_keys=False)
+        for channel in channels:
+            files[f"{root}/{channel['name']}.yaml"] = yaml.safe_dump(channel, sort_keys=False)
+    return files
+
+
+def parse_time(files: Dict[str, str], repeat: int = 5) -> float:
+    """Median seconds to parse every file of a template."""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for path, text in files.items():
+            if path == "template.yaml":
+                parse_monolithic_template_from_str(text)
+            elif path.endswith("/category.yaml"):
+                parse_category_config_from_str(text)
+            else:
+                parse_channel_config_from_str(text)
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def reorder(fake: FakeGuild) -> None:
+    """Reverse the order of the categories and of the channels in each."""
+    categories = fake.ordered(CATEGORY)
+    for category, position in zip(categories, reversed([ch["position"] for ch in categories])):
+        fake.edit_channel(int(category["id"]), position=position)
+    for category in categories:
+        children = [ch for ch in fake.children(int(category["id"])) if ch["type"] == TEXT]
+        for channel, position in zip(children, reversed([ch["position"] for ch in children])):
+            fake.edit_channel(int(channel["id"]), position=position)
+
+
+def drift(fake: FakeGuild) -> None:
+    """Edit, delete, move and add channels the way people do by hand."""
+    categories = fake.ordered(CATEGORY)
+    for number, category in enumerate(categories):
+        next_category = categories[(number + 1) % len(categories)]
+        for index, channel in enumerate(fake.children(int(category["id"]))):
+            channel_id = int(channel["id"])
+            if index % 10 == 9:
+                fake.delete_channel(channel_id)
+            elif index % 7 == 3:
+                fake.edit_channel(channel_id, parent_id=next_category["id"])
+            elif channel["type"] == TEXT and index % 3 == 0:
+                fake.edit_channel(channel_id, topic="Edited by hand", nsfw=not channel["nsfw"])
+        fake.add_channel(f"extra-{number:02d}", TEXT, int(category["id"]))
+
+
+SCENARIO_SETUP: Dict[str, Callable[[FakeGuild], None]] = {
+    "converged": lambda fake: None,
+    "reordered": reorder,
+    "drifted": drift,
+}
+
+
+async def run_case(harness: DiscordHarness, files: Dict[str, str], scenario: str) -> dict:
+    """Prepare a guild for a scenario and measure one apply to it."""
+    guild = harness.create_guild()
+    if scenario != "fresh":
+        await harness.apply(guild, files)
+        SCENARIO_SETUP[scenario](harness.fake_guild(guild))
+    run = await harness.apply(guild, files)
+    return {
+        "plan_ms": run.plan * 1000,
+        "wall_ms": run.wall * 1000,
+        "api_calls": run.api_calls,
+        "mutating_calls": run.mutating_calls,
+        "rate_limited": run.rate_limited,
+        "changes": len(run.report.changes),
+        "warnings": len(run.report.warnings),
+    }
+
+
+def _median_result(samples: List[dict]) -> dict:
+    return {key: statistics.median(sample[key] for sample in samples) for key in samples[0]}
+
+
+async def run_suite(args) -> dict:
+    with tempfile.TemporaryDirectory() as state_dir:
+        store = JsonStateStore(state_dir) if args.state == "json" else None
+        return await _run_suite(args, store)
+
+
+async def _run_suite(args, store) -> dict:
+    rate_limits = {"*": args.rate_limit} if args.rate_limit else None
+    results = []
+    async with DiscordHarness(
+        state_store=store, latency=args.latency, jitter=args.jitter, rate_limits=rate_limits
+    ) as harness:
+        for size in args.sizes:
+            layout = synthetic_layout(size)
+            for template_format in FORMATS:
+                files = template_files(layout, template_format)
+                parse_ms = parse_time(files) * 1000
+                for scenario in SCENARIOS:
+                    samples = [await run_case(harness, files, scenario) for _ in range(args.repeat)]
+                    result = {
+                        "channels": size,
+                        "format": template_format,
+                        "scenario": scenario,
+                        "parse_ms": parse_ms,
+                        **_median_result(samples),
+                    }
+                    results.append(result)
+                    print(
+                        f"{size:>4} {template_format:<10} {scenario:<9} "
+                        f"parse {parse_ms:7.1f} ms  plan {result['plan_ms']:7.1f} ms  "
+                        f"apply {result['wall_ms']:8.1f} ms  calls {result['api_calls']:>4} "
+                        f"({result['mutating_calls']} mutating, {result['rate_limited']} rate limited)"
+                    )
+    return {
+        "gitcord_version": gitcord.__version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "settings": {
+            "latency_s": args.latency,
+            "jitter": args.jitter,
+            "rate_limit": f"{args.rate_limit.limit}/{args.rate_limit.per:g}" if args.rate_limit else None,
+            "repeat": args.repeat,
+            "state": args.state,
+        },
+        "results": results,
+    }
+
+
+def _rate_limit(value: str) -> RateLimit:
+    limit, _, per = value.partition("/")
+    return RateLimit(int(limit), float(per or 1))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random latency fraction")
+    parser.add_argument(
+        "--rate-limit", type=_rate_limit, default=None,
+        help="bucket limit per route as REQUESTS/SECONDS, e.g. 5/5",
+    )
+    parser.add_argument("--repeat", type=int, default=1, help="runs per case, median reported")
+    parser.add_argument(
+        "--state", choices=("sqlite", "json"), default="sqlite", help="state store backend to apply with"
+    )
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    args = parser.parse_args()
+
+    quiet_logs()
+    suite = asyncio.run(run_suite(args))
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(suite, f, indent=2)
+        f.write("\n")
+    print(f"Wrote {len(suite['results'])} results to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
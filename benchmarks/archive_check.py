@@ -0,0 +1,259 @@
+"""
+Template archive download checks.
+
+Serves tar.gz archives from a local stand-in for GitHub's codeload and
+fetches them through ``TemplateArchives``, checking that:
+
+- a download yields the template's YAML files, without hidden folders or
+  other files, and a subfolder can be selected
+- an archive far bigger than the extractor's queue streams through it
+- an archive holding more than 5 MB of YAML is rejected
+- truncated and corrupt downloads are rejected with a ValueError and are
+  not cached
+- a repeated fetch sends the ``ETag`` and ``Last-Modified`` validators it
+  got back, and a ``304 Not Modified`` is served from the cache, from memory
+  or from disk after a restart
+- the in-memory cache evicts the least recently used archive once it holds
+  ``archive_cache_size`` of them
+
+Usage:
+    python benchmarks/archive_check.py
+
+Exits with status 1 if any check fails, so CI fails on regressions.
+"""
+
+import asyncio
+import contextlib
+import os
+import random
+import sys
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from harness import FakeArchive, FakeCodeload, make_archive, quiet_logs
+
+from gitcord.config import config
+from gitcord.constants.paths import get_archive_cache_file
+from gitcord.utils.template_archive import MAX_TEMPLATE_BYTES, TemplateArchives
+
+TEMPLATE = {
+    "template.yaml": "categories:\n  - name: General\n    type: category\n",
+    "community/category.yaml": "name: Community\ntype: category\nchannels: [chat]\n",
+    "community/chat.yaml": "name: chat\ntype: text\n",
+    "README.md": "# Template\n",
+    ".github/workflows/ci.yml": "on: push\n",
+}
+EXPECTED = {path: data for path, data in TEMPLATE.items() if path.endswith(".yaml")}
+
+
+@dataclass
+class Check:
+    """Outcome of one check."""
+
+    name: str
+    ok: bool
+    detail: str = ""
+
+    def __str__(self) -> str:
+        status = "ok" if self.ok else "FAIL"
+        return f"{status:<4} {self.name:<36} {self.detail}"
+
+
+class ArchiveChecks:
+    """Repositories served by a ``FakeCodeload``, fetched through a fresh ``TemplateArchives``."""
+
+    def __init__(self, codeload: FakeCodeload):
+        self.codeload = codeload
+        self.archives = TemplateArchives(base_url=codeload.base_url)
+        self.checks: List[Check] = []
+        # Unique per run, so cache files of earlier runs are never hit
+        self._owner = f"archive-check-{os.getpid()}"
+        self._cache_files: List[str] = []
+
+    def add(self, repo: str, archive: FakeArchive) -> str:
+        """Serve ``archive`` as ``repo`` and return its GitHub URL."""
+        url = self.codeload.add(self._owner, repo, archive)
+        self._cache_files.append(get_archive_cache_file(self.archives.archive_url(url)))
+        return url
+
+    def expect(self, name: str, ok: bool, detail: str = "") -> None:
+        self.checks.append(Check(name, ok, detail))
+
+    async def fetch_error(self, url: str) -> Optional[Exception]:
+        """The error fetching ``url`` raises, or None if it succeeds."""
+        try:
+            await self.archives.fetch(url)
+        except Exception as e:  # pylint: disable=broad-except
+            return e
+        return None
+
+    def expect_rejected(self, name: str, error: Optional[Exception], message: str = "") -> None:
+        """Expect ``error`` to be a ValueError containing ``message``."""
+        rejected = isinstance(error, ValueError) and message in str(error)
+        self.expect(name, rejected, f"{type(error).__name__}: {error}" if error else "no error")
+
+    def last_request_conditional(self) -> bool:
+        """Whether the last request sent any validator."""
+        headers = self.codeload.requests[-1].headers
+        return "If-None-Match" in headers or "If-Modified-Since" in headers
+
+    def remove_cache_files(self) -> None:
+        """Delete the on-disk cache, leaving only what is cached in memory."""
+        for path in self._cache_files:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(path)
+
+    async def close(self) -> None:
+        """Close the HTTP session and delete the cache files of the run."""
+        await self.archives.close()
+        self.remove_cache_files()
+
+
+async def check_download(checks: ArchiveChecks) -> None:
+    """A template's YAML files come back, whole or for one subfolder."""
+    url = checks.add("template", FakeArchive(make_archive(TEMPLATE), etag='"v1"'))
+    files = await checks.archives.fetch(url)
+    checks.expect("download", files == EXPECTED, f"{len(files)} YAML file(s)")
+    folder = await checks.archives.fetch(url, folder="community")
+    names = sorted(folder)
+    checks.expect("download/subfolder", names == ["category.yaml", "chat.yaml"], ", ".join(names))
+
+
+async def check_streaming(checks: ArchiveChecks) -> None:
+    """An archive many times the extractor's queue streams through it."""
+    # Incompressible, so the download is as big as the padding
+    padding = random.Random(0).randbytes(4 * 1024 * 1024)
+    body = make_archive({"assets/padding.bin": padding, **TEMPLATE})
+    url = checks.add("large", FakeArchive(body))
+    files = await checks.archives.fetch(url)
+    size = f"{len(body) // 1024} KiB downloaded"
+    checks.expect("streaming/large archive", files == EXPECTED, size)
+
+
+async def check_yaml_cap(checks: ArchiveChecks) -> None:
+    """More YAML than ``MAX_TEMPLATE_BYTES`` is rejected and not cached."""
+    chunk = "key: value\n" * (1024 * 1024 // 11)
+    too_much = {f"big/{index}.yaml": chunk for index in range(MAX_TEMPLATE_BYTES // len(chunk) + 1)}
+    url = checks.add("too-much-yaml", FakeArchive(make_archive(too_much), etag='"big"'))
+    checks.expect_rejected("YAML cap/rejected", await checks.fetch_error(url), "too much YAML")
+    await checks.fetch_error(url)
+    checks.expect("YAML cap/not cached", not checks.last_request_conditional())
+
+
+async def check_broken_streams(checks: ArchiveChecks) -> None:
+    """Cut short and corrupt downloads raise a ValueError and are not cached."""
+    body = make_archive({"assets/padding.bin": random.Random(1).randbytes(256 * 1024), **TEMPLATE})
+    corrupt = bytearray(body)
+    corrupt[len(body) // 2] ^= 0xFF
+    cases: Dict[str, FakeArchive] = {
+        "truncated": FakeArchive(body, etag='"truncated"', truncate_at=len(body) // 2),
+        "missing trailer": FakeArchive(body, etag='"trailer"', truncate_at=len(body) - 4),
+        "corrupt": FakeArchive(bytes(corrupt), etag='"corrupt"'),
+        "not gzip": FakeArchive(b"<html>Not an archive</html>", etag='"html"'),
+    }
+    for name, archive in cases.items():
+        url = checks.add(name.replace(" ", "-"), archive)
+        checks.expect_rejected(f"{name}/rejected", await checks.fetch_error(url))
+        await checks.fetch_error(url)
+        checks.expect(f"{name}/not cached", not checks.last_request_conditional())
+
+
+async def check_revalidation(checks: ArchiveChecks) -> None:
+    """Validators are sent back and a 304 is answered from the cache, in memory or on disk."""
+    archive = FakeArchive(
+        make_archive(TEMPLATE), etag='"rev-1"', last_modified="Mon, 05 Oct 2026 10:00:00 GMT"
+    )
+    url = checks.add("revalidated", archive)
+    await checks.archives.fetch(url)
+    checks.expect("revalidation/first fetch", not checks.last_request_conditional())
+
+    files = await checks.archives.fetch(url)
+    request = checks.codeload.requests[-1]
+    sent = request.headers.get("If-None-Match")
+    checks.expect("revalidation/If-None-Match", sent == archive.etag, sent or "not sent")
+    since = request.headers.get("If-Modified-Since")
+    ok = since == archive.last_modified
+    checks.expect("revalidation/If-Modified-Since", ok, since or "not sent")
+    checks.expect("revalidation/304 from memory", request.status == 304 and files == EXPECTED)
+
+    # A new instance has an empty memory cache, as after a restart
+    restarted = TemplateArchives(base_url=checks.codeload.base_url)
+    try:
+        files = await restarted.fetch(url)
+    finally:
+        await restarted.close()
+    request = checks.codeload.requests[-1]
+    ok = request.status == 304 and files == EXPECTED
+    checks.expect("revalidation/304 from disk", ok, request.headers.get("If-None-Match", ""))
+
+    changed = {**TEMPLATE, "community/rules.yaml": "name: rules\ntype: text\n"}
+    archive.body, archive.etag = make_archive(changed), '"rev-2"'
+    files = await checks.archives.fetch(url)
+    checks.expect("revalidation/changed archive", "community/rules.yaml" in files)
+    await checks.archives.fetch(url)
+    sent = checks.codeload.requests[-1].headers.get("If-None-Match")
+    checks.expect("revalidation/new ETag sent", sent == '"rev-2"', sent or "not sent")
+
+    dated = FakeArchive(make_archive(TEMPLATE), last_modified="Tue, 06 Oct 2026 10:00:00 GMT")
+    url = checks.add("last-modified-only", dated)
+    await checks.archives.fetch(url)
+    files = await checks.archives.fetch(url)
+    request = checks.codeload.requests[-1]
+    since = request.headers.get("If-Modified-Since")
+    ok = since == dated.last_modified and request.status == 304 and files == EXPECTED
+    checks.expect("revalidation/Last-Modified only", ok, since or "not sent")
+
+    url = checks.add("no-validators", FakeArchive(make_archive(TEMPLATE)))
+    await checks.archives.fetch(url)
+    await checks.archives.fetch(url)
+    checks.expect("revalidation/no validators", not checks.last_request_conditional())
+
+
+async def check_eviction(checks: ArchiveChecks) -> None:
+    """The memory cache keeps the most recently used archives."""
+    os.environ["GITCORD_PERF_ARCHIVE_CACHE_SIZE"] = "2"
+    config.reload_performance()
+    urls = {
+        name: checks.add(f"lru-{name}", FakeArchive(make_archive(TEMPLATE), etag=f'"{name}"'))
+        for name in ("a", "b", "c")
+    }
+    for name in ("a", "b", "a", "c"):
+        await checks.archives.fetch(urls[name])
+    # Only what memory holds can still be revalidated
+    checks.remove_cache_files()
+    await checks.archives.fetch(urls["a"])
+    checks.expect("LRU/recently used kept", checks.last_request_conditional())
+    await checks.archives.fetch(urls["b"])
+    checks.expect("LRU/least recently used evicted", not checks.last_request_conditional())
+
+
+async def run_checks() -> List[Check]:
+    async with FakeCodeload() as codeload:
+        checks = ArchiveChecks(codeload)
+        try:
+            await check_download(checks)
+            await check_streaming(checks)
+            await check_yaml_cap(checks)
+            await check_broken_streams(checks)
+            await check_revalidation(checks)
+            await check_eviction(checks)
+        finally:
+            await checks.close()
+    return checks.checks
+
+
+def main() -> int:
+    quiet_logs()
+    checks = asyncio.run(run_checks())
+    for check in checks:
+        print(check)
+    failed = [check for check in checks if not check.ok]
+    if failed:
+        print(f"{len(failed)} of {len(checks)} archive checks failed")
+        return 1
+    print(f"All {len(checks)} archive checks passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,247 @@
+"""
+Offline harness for benchmarking GitCord against an in-memory Discord.
+
+``DiscordHarness`` starts a ``FakeDiscord`` server, points discord.py at it
+and logs a real ``GitCordBot`` in, so ``setup_hook`` loads every cog and
+instruments the HTTP client exactly as in production. Guilds are built in
+the fake and loaded into the bot's cache; applies then run the real
+``Admin`` code path over real HTTP, rate limiter and gateway cache updates.
+
+Example::
+
+    async with DiscordHarness(latency=0.05) as harness:
+        guild = harness.create_guild({"General": [{"name": "chat", "type": "text"}]})
+        run = await harness.apply(guild, {"template.yaml": text})
+        print(run.wall, run.mutating_calls)
+
+``DiscordHarness.replay`` re-runs an apply recorded into a cassette (see
+``gitcord.utils.cassette``) against the recorded guild and responses.
+"""
+
+import logging
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import gitcord  # noqa: F401
+except ImportError:
+    # Running from a checkout without the package installed
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "src"))
+
+import discord
+from discord.http import Route
+
+from gitcord.bot import GitCordBot
+from gitcord.utils.apply_events import OpKind
+from gitcord.utils.apply_report import ApplyReport
+from gitcord.utils.cassette import Cassette
+from gitcord.utils.state_store import SqliteStateStore, StateStore, set_state_store
+
+from .fake_codeload import FakeArchive, FakeCodeload, make_archive
+from .fake_discord import (
+    CATEGORY,
+    FORUM,
+    NEWS,
+    STAGE,
+    TEXT,
+    VOICE,
+    FakeDiscord,
+    FakeGuild,
+    RateLimit,
+    RecordedCall,
+)
+from .replay import CassetteReplay
+
+CHANNEL_TYPES = {"text": TEXT, "voice": VOICE, "news": NEWS, "stage": STAGE, "forum": FORUM}
+
+# Template layout: category name to its channels, as in a monolithic template
+Layout = Dict[str, List[dict]]
+
+
+class TimingProgress:
+    """Progress tracker that sends no messages and notes when planning ended."""
+
+    message = None
+
+    def __init__(self):
+        self.planned_at: Optional[float] = None
+        self.events = 0
+
+    async def update(self, event) -> None:
+        self.events += 1
+        if event.op is OpKind.PLAN and self.planned_at is None:
+            self.planned_at = time.perf_counter()
+
+
+@dataclass
+class ApplyRun:
+    """Outcome and cost of one apply through the harness."""
+
+    report: ApplyReport
+    wall: float
+    plan: float
+    calls: List[RecordedCall] = field(default_factory=list)
+
+    @property
+    def api_calls(self) -> int:
+        return len(self.calls)
+
+    @property
+    def mutating_calls(self) -> int:
+        return sum(1 for call in self.calls if call.is_mutating)
+
+    @property
+    def rate_limited(self) -> int:
+        return sum(1 for call in self.calls if call.status == 429)
+
+
+class DiscordHarness:
+    """
+    A logged-in ``GitCordBot`` talking to a ``FakeDiscord``; options go to ``FakeDiscord``.
+
+    Applies use ``state_store``, an in-memory SQLite store by default.
+    """
+
+    TOKEN = "harness-token"
+
+    def __init__(self, state_store: Optional[StateStore] = None, **fake_options):
+        self.discord = FakeDiscord(**fake_options)
+        self.state_store = state_store
+        self.bot: Optional[GitCordBot] = None
+        self._route_base = Route.BASE
+        self._previous_store = None
+
+    async def __aenter__(self) -> "DiscordHarness":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def start(self) -> None:
+        await self.discord.start()
+        Route.BASE = self.discord.base_url
+        # Applies journal and record history; keep that out of the data directory
+        self._previous_store = set_state_store(
+            self.state_store or SqliteStateStore(":memory:", json_dir=None)
+        )
+        self.bot = GitCordBot()
+        self.discord.attach(self.bot._connection)
+        await self.bot.login(self.TOKEN)
+
+    async def close(self) -> None:
+        if self.bot:
+            await self.bot.close()
+        await self.discord.close()
+        Route.BASE = self._route_base
+        if self._previous_store is not None:
+            set_state_store(self._previous_store).close()
+
+    @property
+    def admin(self):
+        """The loaded ``Admin`` cog."""
+        return self.bot.get_cog("Admin")
+
+    def load_guild(self, fake: FakeGuild) -> discord.Guild:
+        """Put a fake guild in the bot's cache, as a GUILD_CREATE would."""
+        return self.bot._connection._add_guild_from_data(fake.payload())
+
+    def create_guild(self, layout: Optional[Layout] = None, name: str = "Benchmark Guild") -> discord.Guild:
+        """
+        Create a guild, optionally already holding ``layout``, and load it.
+
+        Channels take the fields of their template entry (``topic``, ``nsfw``),
+        so a guild created from a template's layout is already converged.
+        """
+        fake = self.discord.add_guild(name)
+        if layout:
+            populate(fake, layout)
+        return self.load_guild(fake)
+
+    def fake_guild(self, guild: discord.Guild) -> FakeGuild:
+        return self.discord.guilds[guild.id]
+
+    async def apply(self, guild: discord.Guild, files: Dict[str, str], source: str = "harness") -> ApplyRun:
+        """Run a full apply of template files through the ``Admin`` cog and time it."""
+        report = ApplyReport()
+        progress = TimingProgress()
+        first_call = len(self.discord.calls)
+        started = time.perf_counter()
+        await self.admin._stream_apply(guild, files, report, progress, source=source)
+        finished = time.perf_counter()
+        # Concurrent applies share the call log, so keep only this guild's calls
+        calls = [
+            call for call in self.discord.calls[first_call:]
+            if call.guild_id in (None, guild.id)
+        ]
+        return ApplyRun(
+            report=report,
+            wall=finished - started,
+            plan=(progress.planned_at or finished) - started,
+            calls=calls,
+        )
+
+    async def replay(self, cassette: Cassette, time_scale: float = 1.0) -> Tuple[ApplyRun, CassetteReplay]:
+        """
+        Re-run a recorded apply: load the recorded guild, then apply the recorded
+        files while answering requests with the recorded responses.
+        """
+        guild = self.load_guild(self.discord.add_guild_from_payload(cassette.guild))
+        replay = self.discord.replay = CassetteReplay(cassette, time_scale)
+        try:
+            run = await self.apply(guild, cassette.files, source=cassette.source or "replay")
+        finally:
+            self.discord.replay = None
+        return run, replay
+
+
+def quiet_logs(level: int = logging.ERROR) -> None:
+    """Keep per-operation logs out of measurements and output."""
+    logging.getLogger("gitcord").setLevel(level)
+    # Simulated 429s are expected; discord.py warns about each one
+    logging.getLogger("discord.http").setLevel(max(level, logging.ERROR))
+
+
+def populate(fake: FakeGuild, layout: Layout) -> None:
+    """Add categories and channels to a fake guild in layout order."""
+    text_position = voice_position = 0
+    for category_position, (category_name, channels) in enumerate(layout.items()):
+        category_id = fake.add_category(category_name, position=category_position)
+        for channel in channels:
+            channel_type = CHANNEL_TYPES[channel.get("type", "text").lower()]
+            fields = {}
+            if "topic" in channel and channel_type != VOICE:
+                fields["topic"] = channel["topic"]
+            if "nsfw" in channel:
+                fields["nsfw"] = channel["nsfw"]
+            if channel_type in (VOICE, STAGE):
+                position, voice_position = voice_position, voice_position + 1
+            else:
+                position, text_position = text_position, text_position + 1
+            fake.add_channel(channel["name"], channel_type, category_id, position, **fields)
+
+
+__all__ = [
+    "ApplyRun",
+    "CATEGORY",
+    "CassetteReplay",
+    "CHANNEL_TYPES",
+    "DiscordHarness",
+    "FakeArchive",
+    "FakeCodeload",
+    "FakeDiscord",
+    "FakeGuild",
+    "FORUM",
+    "Layout",
+    "RateLimit",
+    "RecordedCall",
+    "TEXT",
+    "TimingProgress",
+    "VOICE",
+    "make_archive",
+    "populate",
+    "quiet_logs",
+]
@@ -0,0 +1,125 @@
+"""
+In-memory stand-in for GitHub's archive downloads.
+
+``FakeCodeload`` serves tar.gz archives at codeload's
+``/<owner>/<repo>/tar.gz/<ref>`` URLs from a local aiohttp server, in small
+chunks so downloads stream. It answers conditional requests with
+``304 Not Modified`` like codeload does, and can cut archives short to test
+truncated downloads. Every request is recorded with its headers.
+
+Point ``TemplateArchives`` at it with ``base_url=codeload.base_url``.
+"""
+
+import io
+import tarfile
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Union
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+# Small enough that an archive of a few hundred kilobytes takes many chunks
+SERVE_CHUNK_SIZE = 16 * 1024
+
+
+def make_archive(files: Dict[str, Union[str, bytes]], root: str = "repo-main") -> bytes:
+    """A tar.gz of ``files`` under a single ``root`` directory, as codeload builds them."""
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as archive:
+        for path, data in files.items():
+            if isinstance(data, str):
+                data = data.encode("utf-8")
+            member = tarfile.TarInfo(f"{root}/{path}")
+            member.size = len(data)
+            archive.addfile(member, io.BytesIO(data))
+    return buffer.getvalue()
+
+
+@dataclass
+class FakeArchive:
+    """An archive served by ``FakeCodeload`` and the validators sent with it."""
+
+    body: bytes
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    # Bytes actually sent, cutting the download short when below len(body)
+    truncate_at: Optional[int] = None
+
+
+@dataclass
+class ArchiveRequest:
+    """A request ``FakeCodeload`` received, and how it answered."""
+
+    path: str
+    headers: Dict[str, str]
+    status: int
+
+
+class FakeCodeload:
+    """Local aiohttp server serving template archives."""
+
+    def __init__(self):
+        self.archives: Dict[str, FakeArchive] = {}
+        self.requests: List[ArchiveRequest] = []
+        self._server: Optional[TestServer] = None
+
+    def add(self, owner: str, repo: str, archive: FakeArchive, ref: str = "main") -> str:
+        """Serve ``archive`` for a repository at ``ref``; returns the repository's GitHub URL."""
+        self.archives[f"/{owner}/{repo}/tar.gz/{ref}"] = archive
+        return f"https://github.com/{owner}/{repo}"
+
+    @property
+    def base_url(self) -> str:
+        """URL to use as the ``TemplateArchives`` base URL."""
+        return str(self._server.make_url("")).rstrip("/")
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_get("/{owner}/{repo}/tar.gz/{ref}", self._serve)
+        self._server = TestServer(app, host="127.0.0.1")
+        await self._server.start_server()
+
+    async def close(self) -> None:
+        if self._server:
+            await self._server.close()
+            self._server = None
+
+    async def __aenter__(self) -> "FakeCodeload":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    def _not_modified(self, request: web.Request, archive: FakeArchive) -> bool:
+        # An entity tag wins over the date, as in RFC 9110
+        if archive.etag and "If-None-Match" in request.headers:
+            return request.headers["If-None-Match"] == archive.etag
+        return bool(archive.last_modified) and (
+            request.headers.get("If-Modified-Since") == archive.last_modified
+        )
+
+    async def _serve(self, request: web.Request) -> web.StreamResponse:
+        archive = self.archives.get(request.path)
+        headers = {}
+        if archive and archive.etag:
+            headers["ETag"] = archive.etag
+        if archive and archive.last_modified:
+            headers["Last-Modified"] = archive.last_modified
+        if archive is None:
+            status = 404
+        elif self._not_modified(request, archive):
+            status = 304
+        else:
+            status = 200
+        self.requests.append(ArchiveRequest(request.path, dict(request.headers), status))
+        if status != 200:
+            return web.Response(status=status, headers=headers)
+
+        response = web.StreamResponse(headers={**headers, "Content-Type": "application/x-gzip"})
+        await response.prepare(request)
+        body = archive.body[:archive.truncate_at]
+        for start in range(0, len(body), SERVE_CHUNK_SIZE):
+            await response.write(body[start:start + SERVE_CHUNK_SIZE])
+        await response.write_eof()
+        return response
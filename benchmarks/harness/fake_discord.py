@@ -0,0 +1,734 @@
+"""
+In-memory stand-in for the Discord REST API and gateway.
+
+``FakeDiscord`` keeps guilds, roles, categories and channels in memory and serves
+the REST routes gitcord uses from a local aiohttp server, so discord.py runs
+its real HTTP client, rate limiter and cache against it. Every change is
+also fed to the attached ``ConnectionState`` as the gateway event Discord
+would send, so the guild cache moves exactly like it does in production.
+
+Latency and Discord-style rate limit buckets (per route and major
+parameter, plus an optional global limit) are simulated per request. With a
+``CassetteReplay`` set, requests found in the cassette are answered with the
+recorded response and timing instead.
+"""
+
+import asyncio
+import hashlib
+import json
+import random
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple, Union
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+if TYPE_CHECKING:
+    from .replay import CassetteReplay
+
+# Discord channel types
+TEXT, VOICE, CATEGORY, NEWS, STAGE, FORUM = 0, 2, 4, 5, 13, 15
+
+# Channels are positioned against others of the same sorting bucket
+SORTING_BUCKETS = {TEXT: TEXT, NEWS: TEXT, FORUM: TEXT, VOICE: VOICE, STAGE: VOICE, CATEGORY: CATEGORY}
+
+API_PREFIX = "/api/v10"
+
+# Snowflakes are deterministic: sequential and all after this one
+FIRST_SNOWFLAKE = 1_100_000_000_000_000_000
+
+# Fields a channel create or edit copies onto the channel as sent
+_CHANNEL_FIELDS = (
+    "name", "topic", "nsfw", "parent_id", "rate_limit_per_user", "bitrate", "user_limit",
+    "rtc_region", "permission_overwrites", "default_auto_archive_duration", "flags",
+    "available_tags", "default_forum_layout", "default_reaction_emoji",
+    "default_thread_rate_limit_per_user",
+)
+
+# Fields a role create or edit copies onto the role as sent
+_ROLE_FIELDS = ("name", "permissions", "hoist", "mentionable")
+
+Latency = Union[float, Callable[[str], float]]
+
+
+class FakeAPIError(Exception):
+    """Discord JSON error response raised by a handler."""
+
+    def __init__(self, status: int, code: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.code = code
+        self.message = message
+
+
+@dataclass
+class RecordedCall:
+    """One REST request served by the fake."""
+
+    method: str
+    route: str
+    status: int
+    body: Any
+    started: float
+    duration: float
+    guild_id: Optional[int] = None
+
+    @property
+    def is_mutating(self) -> bool:
+        return self.method != "GET"
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """``limit`` requests per ``per`` seconds."""
+
+    limit: int
+    per: float
+
+
+class _Bucket:
+    """Fixed-window rate limit bucket, like Discord's."""
+
+    def __init__(self, key: str, policy: RateLimit):
+        self.hash = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+        self.policy = policy
+        self.remaining = policy.limit
+        self.reset_at = 0.0
+
+    def take(self, now: float) -> Optional[float]:
+        """Use up a request; return the retry delay if the bucket is empty."""
+        if now >= self.reset_at:
+            self.remaining = self.policy.limit
+            self.reset_at = now + self.policy.per
+        if self.remaining <= 0:
+            return self.reset_at - now
+        self.remaining -= 1
+        return None
+
+    def headers(self, now: float) -> Dict[str, str]:
+        reset_after = max(self.reset_at - now, 0.0)
+        return {
+            "X-RateLimit-Limit": str(self.policy.limit),
+            "X-RateLimit-Remaining": str(self.remaining),
+            "X-RateLimit-Reset": f"{time.time() + reset_after:.3f}",
+            "X-RateLimit-Reset-After": f"{reset_after:.3f}",
+            "X-RateLimit-Bucket": self.hash,
+        }
+
+
+def _role(role_id: int, name: str, position: int, **fields) -> dict:
+    role = {
+        "id": str(role_id), "name": name, "permissions": "0", "position": position,
+        "color": 0, "colors": {"primary_color": 0, "secondary_color": None, "tertiary_color": None},
+        "hoist": False, "managed": False, "mentionable": False, "flags": 0,
+    }
+    role.update(fields)
+    _set_color(role, role["color"])
+    return role
+
+
+def _set_color(role: dict, color: int) -> None:
+    # Discord still sends the legacy color next to colors, discord.py reads colors
+    role["color"] = color
+    role["colors"] = {**role["colors"], "primary_color": color}
+
+
+class FakeGuild:
+    """A guild's roles and channels as Discord would return them."""
+
+    def __init__(self, discord: "FakeDiscord", guild_id: int, name: str):
+        self.discord = discord
+        self.id = guild_id
+        self.name = name
+        self.channels: Dict[int, dict] = {}
+        self.roles: List[dict] = [_role(guild_id, "@everyone", 0)]
+
+    def payload(self) -> dict:
+        """GUILD_CREATE style payload."""
+        return {
+            "id": str(self.id),
+            "name": self.name,
+            "owner_id": str(self.discord.user_id),
+            "roles": [dict(role) for role in self.roles],
+            "channels": [dict(ch) for ch in self.channels.values()],
+            "member_count": 1,
+            "features": [],
+            "emojis": [],
+            "stickers": [],
+        }
+
+    # Out-of-band changes, as if made in the Discord client. Once the guild is
+    # loaded into the bot they reach its cache as gateway events.
+
+    def add_category(self, name: str, position: Optional[int] = None, **fields) -> int:
+        """Add a category without going through the API; returns its ID."""
+        return self.add_channel(name, CATEGORY, None, position, **fields)
+
+    def add_channel(
+        self, name: str, channel_type: int = TEXT, parent_id: Optional[int] = None,
+        position: Optional[int] = None, **fields,
+    ) -> int:
+        """Add a channel without going through the API; returns its ID."""
+        channel_id = self._add(channel_type, name, parent_id, position, fields)
+        self.discord._dispatch("CHANNEL_CREATE", self.channels[channel_id])
+        return channel_id
+
+    def edit_channel(self, channel_id: int, **fields) -> None:
+        """Change channel fields without going through the API."""
+        self.channels[channel_id].update(fields)
+        self.discord._dispatch("CHANNEL_UPDATE", self.channels[channel_id])
+
+    def delete_channel(self, channel_id: int) -> None:
+        """Delete a channel without going through the API."""
+        self.discord.channel_guilds.pop(channel_id, None)
+        self.discord._dispatch("CHANNEL_DELETE", self.channels.pop(channel_id))
+
+    def add_role(self, name: str, permissions: int = 0, **fields) -> int:
+        """Add a role above the existing ones without going through the API; returns its ID."""
+        role = _role(
+            self.discord.next_id(), name, max(role["position"] for role in self.roles) + 1,
+            permissions=str(permissions), **fields,
+        )
+        self.roles.append(role)
+        self.discord._dispatch("GUILD_ROLE_CREATE", {"guild_id": str(self.id), "role": role})
+        return int(role["id"])
+
+    def edit_role(self, role_id: int, **fields) -> None:
+        """Change role fields without going through the API."""
+        role = self.role(role_id)
+        role.update(fields)
+        _set_color(role, role["color"])
+        self.discord._dispatch("GUILD_ROLE_UPDATE", {"guild_id": str(self.id), "role": role})
+
+    def role(self, role_id: int) -> dict:
+        for role in self.roles:
+            if role["id"] == str(role_id):
+                return role
+        raise FakeAPIError(404, 10011, "Unknown Role")
+
+    def ordered_roles(self) -> List[dict]:
+        """Roles from the highest down, as the Discord client lists them."""
+        return sorted(self.roles, key=lambda role: (role["position"], -int(role["id"])), reverse=True)
+
+    def insert_role(self, role: dict) -> List[dict]:
+        """
+        Add a role at position 1, just above @everyone, as Discord creates them.
+
+        Returns:
+            The other roles whose position changed
+        """
+        shifted = [other for other in self.roles if other["position"] >= 1]
+        for other in shifted:
+            other["position"] += 1
+        role["position"] = 1
+        self.roles.append(role)
+        return shifted
+
+    def move_roles(self, entries: List[dict]) -> List[dict]:
+        """
+        Apply a bulk role position update.
+
+        Returns:
+            The roles that changed
+        """
+        changed = []
+        for entry in entries:
+            role = self.role(int(entry["id"]))
+            if role["id"] == str(self.id):
+                raise FakeAPIError(400, 50035, "Invalid Form Body")
+            if role["position"] != entry["position"]:
+                role["position"] = entry["position"]
+                changed.append(role)
+        return changed
+
+    def find(self, name: str, channel_type: Optional[int] = None) -> Optional[dict]:
+        """First channel named ``name``, optionally of one type."""
+        for channel in self.channels.values():
+            if channel["name"] == name and channel_type in (None, channel["type"]):
+                return channel
+        return None
+
+    def children(self, category_id: int) -> List[dict]:
+        """Channels of a category in display order."""
+        return sorted(
+            (ch for ch in self.channels.values() if ch["parent_id"] == str(category_id)),
+            key=lambda ch: (SORTING_BUCKETS.get(ch["type"], ch["type"]), ch["position"], int(ch["id"])),
+        )
+
+    def _add(self, channel_type, name, parent_id, position, fields) -> int:
+        channel_id = self.discord.next_id()
+        bucket = SORTING_BUCKETS.get(channel_type, channel_type)
+        if position is None:
+            position = 1 + max(
+                (ch["position"] for ch in self.channels.values()
+                 if SORTING_BUCKETS.get(ch["type"], ch["type"]) == bucket),
+                default=-1,
+            )
+        channel = {
+            "id": str(channel_id),
+            "guild_id": str(self.id),
+            "type": channel_type,
+            "name": name,
+            "position": position,
+            "parent_id": str(parent_id) if parent_id else None,
+            "permission_overwrites": [],
+            "nsfw": False,
+            "flags": 0,
+        }
+        if channel_type in (TEXT, NEWS, FORUM):
+            channel.update(topic=None, rate_limit_per_user=0, last_message_id=None)
+        if channel_type == FORUM:
+            channel.update(
+                available_tags=[], default_forum_layout=0, default_reaction_emoji=None,
+                default_thread_rate_limit_per_user=0,
+            )
+        elif channel_type in (VOICE, STAGE):
+            channel.update(bitrate=64000, user_limit=0, rtc_region=None)
+        channel.update(fields)
+        self.channels[channel_id] = channel
+        self.discord.channel_guilds[channel_id] = self.id
+        return channel_id
+
+    def in_bucket(self, channel: dict) -> List[dict]:
+        """Other channels positioned against ``channel``."""
+        bucket = SORTING_BUCKETS.get(channel["type"], channel["type"])
+        return [
+            ch for ch in self.channels.values()
+            if ch is not channel and SORTING_BUCKETS.get(ch["type"], ch["type"]) == bucket
+        ]
+
+    def place(self, channel: dict, position: int) -> List[dict]:
+        """
+        Put a channel at ``position``, shifting the channels at or after it down.
+
+        Returns:
+            The other channels whose position changed
+        """
+        channel["position"] = position
+        shifted = []
+        for other in self.in_bucket(channel):
+            if other["position"] >= position:
+                other["position"] += 1
+                shifted.append(other)
+        return shifted
+
+    def bulk_update(self, entries: List[dict]) -> List[dict]:
+        """
+        Apply a bulk channel position update.
+
+        Returns:
+            The channels that changed
+        """
+        changed = []
+        for entry in entries:
+            channel = self.channels.get(int(entry["id"]))
+            if channel is None:
+                raise FakeAPIError(400, 50035, "Invalid Form Body")
+            before = dict(channel)
+            if entry.get("position") is not None:
+                channel["position"] = entry["position"]
+            if "parent_id" in entry:
+                channel["parent_id"] = entry["parent_id"] and str(entry["parent_id"])
+                if entry.get("lock_permissions") and channel["parent_id"]:
+                    parent = self.channels[int(channel["parent_id"])]
+                    channel["permission_overwrites"] = list(parent["permission_overwrites"])
+            if channel != before:
+                changed.append(channel)
+        return changed
+
+    def upsert(self, channel: dict) -> bool:
+        """Store a channel object as returned by Discord; True if it is new."""
+        channel_id = int(channel["id"])
+        created = channel_id not in self.channels
+        self.channels[channel_id] = dict(channel)
+        self.discord.channel_guilds[channel_id] = self.id
+        return created
+
+    def remove(self, channel_id: int) -> List[dict]:
+        """
+        Delete a channel; children of a deleted category lose their parent.
+
+        Returns:
+            The deleted channel followed by the children that changed
+        """
+        channel = self.channels.pop(channel_id)
+        self.discord.channel_guilds.pop(channel_id, None)
+        orphans = []
+        if channel["type"] == CATEGORY:
+            for child in self.channels.values():
+                if child["parent_id"] == channel["id"]:
+                    child["parent_id"] = None
+                    orphans.append(child)
+        return [channel, *orphans]
+
+    def ordered(self, channel_type: int = TEXT) -> List[dict]:
+        """Channels of a sorting bucket in Discord display order."""
+        bucket = SORTING_BUCKETS.get(channel_type, channel_type)
+        return sorted(
+            (ch for ch in self.channels.values() if SORTING_BUCKETS.get(ch["type"], ch["type"]) == bucket),
+            key=lambda ch: (ch["position"], int(ch["id"])),
+        )
+
+
+class FakeDiscord:
+    """
+    Local server answering Discord REST routes from in-memory guilds.
+
+    Args:
+        latency: Seconds added to every response, or a function of the route
+            (``"PATCH /channels/{channel_id}"``) returning them
+        jitter: Up to this fraction of the latency is randomly added, seeded
+        rate_limits: Bucket limits per route; ``"*"`` applies to other routes
+        global_limit: Requests per window across all routes
+        seed: Seed for the latency jitter
+
+    Set ``replay`` to a ``CassetteReplay`` to serve recorded responses.
+    """
+
+    def __init__(
+        self,
+        latency: Latency = 0.0,
+        jitter: float = 0.0,
+        rate_limits: Optional[Dict[str, RateLimit]] = None,
+        global_limit: Optional[RateLimit] = None,
+        seed: int = 0,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limits = rate_limits or {}
+        self.global_limit = global_limit
+        self.guilds: Dict[int, FakeGuild] = {}
+        self.channel_guilds: Dict[int, int] = {}
+        self.calls: List[RecordedCall] = []
+        self.states: List[Any] = []
+        self._random = random.Random(seed)
+        self._next_id = FIRST_SNOWFLAKE
+        self._buckets: Dict[str, _Bucket] = {}
+        self._global_bucket = _Bucket("global", global_limit) if global_limit else None
+        self.user_id = self.next_id()
+        self.replay: Optional["CassetteReplay"] = None
+        self._server: Optional[TestServer] = None
+
+    # Model
+
+    def next_id(self) -> int:
+        self._next_id += 1
+        return self._next_id
+
+    def add_guild(self, name: str = "Benchmark Guild") -> FakeGuild:
+        guild = FakeGuild(self, self.next_id(), name)
+        self.guilds[guild.id] = guild
+        return guild
+
+    def add_guild_from_payload(self, payload: dict) -> FakeGuild:
+        """Add a guild from a GUILD_CREATE style payload, keeping its IDs."""
+        guild = FakeGuild(self, int(payload["id"]), payload.get("name", "Recorded Guild"))
+        if payload.get("roles"):
+            guild.roles = [dict(role) for role in payload["roles"]]
+        for channel in payload.get("channels", []):
+            guild.upsert(channel)
+        self.guilds[guild.id] = guild
+        return guild
+
+    def attach(self, state) -> None:
+        """Send gateway events for changes to a discord.py ``ConnectionState``."""
+        self.states.append(state)
+
+    def _dispatch(self, event: str, data: dict) -> None:
+        # Events for guilds a state has not loaded yet are discarded by discord.py
+        parse = f"parse_{event.lower()}"
+        for state in self.states:
+            getattr(state, parse)(dict(data))
+
+    # Accounting
+
+    def reset_calls(self) -> None:
+        self.calls.clear()
+
+    def call_counts(self, mutating_only: bool = False) -> Dict[str, int]:
+        """Number of calls per ``METHOD /route``."""
+        counts: Dict[str, int] = {}
+        for call in self.calls:
+            if mutating_only and not call.is_mutating:
+                continue
+            key = f"{call.method} {call.route}"
+            counts[key] = counts.get(key, 0) + 1
+        return counts
+
+    @property
+    def mutating_calls(self) -> int:
+        return sum(1 for call in self.calls if call.is_mutating and call.status < 300)
+
+    # Server
+
+    @property
+    def base_url(self) -> str:
+        """URL to use as discord.py's ``Route.BASE``."""
+        return str(self._server.make_url(API_PREFIX))
+
+    async def start(self) -> None:
+        app = web.Application(middlewares=[self._middleware])
+        routes = [
+            ("GET", "/users/@me", self._get_user),
+            ("GET", "/oauth2/applications/@me", self._get_application),
+            ("GET", "/guilds/{guild_id}/channels", self._list_channels),
+            ("POST", "/guilds/{guild_id}/channels", self._create_channel),
+            ("PATCH", "/guilds/{guild_id}/channels", self._bulk_channel_update),
+            ("PATCH", "/channels/{channel_id}", self._edit_channel),
+            ("DELETE", "/channels/{channel_id}", self._delete_channel),
+            ("POST", "/guilds/{guild_id}/roles", self._create_role),
+            ("PATCH", "/guilds/{guild_id}/roles", self._bulk_role_update),
+            ("PATCH", "/guilds/{guild_id}/roles/{role_id}", self._edit_role),
+        ]
+        for method, path, handler in routes:
+            app.router.add_route(method, API_PREFIX + path, handler)
+        self._server = TestServer(app, host="127.0.0.1")
+        await self._server.start_server()
+
+    async def close(self) -> None:
+        if self._server:
+            await self._server.close()
+            self._server = None
+
+    def _route_of(self, request: web.Request) -> str:
+        resource = request.match_info.route.resource
+        path = resource.canonical if resource else request.path
+        return path[len(API_PREFIX):] if path.startswith(API_PREFIX) else path
+
+    def _guild_id_of(self, request: web.Request) -> Optional[int]:
+        info = request.match_info
+        if "guild_id" in info:
+            return int(info["guild_id"])
+        if "channel_id" in info:
+            return self.channel_guilds.get(int(info["channel_id"]))
+        return None
+
+    def _major_parameters(self, request: web.Request) -> str:
+        info = request.match_info
+        return "+".join(info[key] for key in ("channel_id", "guild_id") if key in info)
+
+    def _delay(self, route_key: str) -> float:
+        latency = self.latency(route_key) if callable(self.latency) else self.latency
+        if latency and self.jitter:
+            latency += latency * self.jitter * self._random.random()
+        return latency
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler):
+        started = time.perf_counter()
+        route = self._route_of(request)
+        route_key = f"{request.method} {route}"
+        guild_id = self._guild_id_of(request)
+        body = await request.json() if request.can_read_body else None
+        interaction = self.replay.take(request.method, request.path[len(API_PREFIX):]) if self.replay else None
+        if interaction is not None:
+            response = await self._replayed(interaction, guild_id, body)
+            self.calls.append(RecordedCall(
+                request.method, route, response.status, body, started,
+                time.perf_counter() - started, guild_id,
+            ))
+            return response
+        delay = self._delay(route_key)
+        if delay:
+            await asyncio.sleep(delay)
+
+        loop_now = asyncio.get_running_loop().time()
+        headers: Dict[str, str] = {}
+        retry_after, is_global = None, False
+        if self._global_bucket:
+            retry_after = self._global_bucket.take(loop_now)
+            is_global = retry_after is not None
+        policy = self.rate_limits.get(route_key) or self.rate_limits.get("*")
+        bucket = None
+        if policy and retry_after is None:
+            bucket_key = f"{route_key}:{self._major_parameters(request)}"
+            bucket = self._buckets.get(bucket_key)
+            if bucket is None:
+                bucket = self._buckets[bucket_key] = _Bucket(route_key, policy)
+            retry_after = bucket.take(loop_now)
+        if bucket:
+            headers.update(bucket.headers(loop_now))
+
+        if retry_after is not None:
+            response = _json_response(
+                {"message": "You are being rate limited.", "retry_after": retry_after, "global": is_global},
+                status=429,
+                headers={
+                    **headers,
+                    "Retry-After": f"{retry_after:.3f}",
+                    "X-RateLimit-Scope": "global" if is_global else "user",
+                    # discord.py treats 429s without it as a Cloudflare ban
+                    "Via": "1.1 google",
+                    **({"X-RateLimit-Global": "true"} if is_global else {}),
+                },
+            )
+        else:
+            try:
+                response = await handler(request, body)
+            except FakeAPIError as e:
+                response = _json_response({"message": e.message, "code": e.code}, status=e.status)
+            response.headers.update(headers)
+        self.calls.append(RecordedCall(
+            request.method, route, response.status, body, started,
+            time.perf_counter() - started, guild_id,
+        ))
+        return response
+
+    async def _replayed(self, interaction, guild_id: Optional[int], body) -> web.Response:
+        """Answer with a recorded response after its recorded duration."""
+        await asyncio.sleep(interaction.duration * self.replay.time_scale)
+        guild = self.guilds.get(guild_id)
+        if guild is not None and interaction.status < 300:
+            self._apply_recorded(guild, interaction, body)
+        if interaction.response in (None, ""):
+            return web.Response(status=interaction.status)
+        return _json_response(interaction.response, status=interaction.status)
+
+    def _apply_recorded(self, guild: FakeGuild, interaction, body) -> None:
+        """Keep the model and the bot's cache in step with a recorded change."""
+        method, route, response = interaction.method, interaction.route, interaction.response
+        if method == "PATCH" and route == "/guilds/{guild_id}/channels":
+            for channel in guild.bulk_update(body):
+                self._dispatch("CHANNEL_UPDATE", channel)
+        elif method == "DELETE" and route == "/channels/{channel_id}":
+            if int(response["id"]) in guild.channels:
+                deleted, *orphans = guild.remove(int(response["id"]))
+                self._dispatch("CHANNEL_DELETE", deleted)
+                for child in orphans:
+                    self._dispatch("CHANNEL_UPDATE", child)
+        elif method == "PATCH" and route == "/guilds/{guild_id}/roles":
+            for role in guild.move_roles(body):
+                self._dispatch_role("GUILD_ROLE_UPDATE", guild, role)
+        elif method == "POST" and route == "/guilds/{guild_id}/roles":
+            role = dict(response)
+            for other in guild.insert_role(role):
+                self._dispatch_role("GUILD_ROLE_UPDATE", guild, other)
+            self._dispatch_role("GUILD_ROLE_CREATE", guild, role)
+        elif method == "PATCH" and route == "/guilds/{guild_id}/roles/{role_id}":
+            role = guild.role(int(response["id"]))
+            role.update({key: value for key, value in response.items() if key != "position"})
+            self._dispatch_role("GUILD_ROLE_UPDATE", guild, role)
+        elif method in ("POST", "PATCH") and route in ("/guilds/{guild_id}/channels", "/channels/{channel_id}"):
+            created = guild.upsert(response)
+            channel = guild.channels[int(response["id"])]
+            # Discord shifts the other channels by gateway events, which are not recorded
+            shifted = guild.place(channel, body["position"]) if body and body.get("position") is not None else []
+            self._dispatch("CHANNEL_CREATE" if created else "CHANNEL_UPDATE", channel)
+            for other in shifted:
+                self._dispatch("CHANNEL_UPDATE", other)
+
+    # Handlers
+
+    def _dispatch_role(self, event: str, guild: FakeGuild, role: dict) -> None:
+        self._dispatch(event, {"guild_id": str(guild.id), "role": role})
+
+    def _guild(self, request: web.Request) -> FakeGuild:
+        guild = self.guilds.get(int(request.match_info["guild_id"]))
+        if guild is None:
+            raise FakeAPIError(404, 10004, "Unknown Guild")
+        return guild
+
+    def _channel(self, request: web.Request) -> Tuple[FakeGuild, dict]:
+        channel_id = int(request.match_info["channel_id"])
+        guild_id = self.channel_guilds.get(channel_id)
+        if guild_id is not None:
+            return self.guilds[guild_id], self.guilds[guild_id].channels[channel_id]
+        raise FakeAPIError(404, 10003, "Unknown Channel")
+
+    async def _get_user(self, _request, _body):
+        return _json_response({
+            "id": str(self.user_id), "username": "gitcord-benchmark", "discriminator": "0",
+            "global_name": None, "avatar": None, "bot": True, "flags": 0, "mfa_enabled": False,
+        })
+
+    async def _get_application(self, _request, _body):
+        return _json_response({
+            "id": str(self.user_id), "name": "gitcord-benchmark", "icon": None, "description": "",
+            "bot_public": False, "bot_require_code_grant": False, "verify_key": "",
+            "flags": 0, "owner": {"id": str(self.user_id), "username": "owner", "discriminator": "0", "avatar": None},
+        })
+
+    async def _list_channels(self, request, _body):
+        return _json_response(list(self._guild(request).channels.values()))
+
+    async def _create_channel(self, request, body):
+        guild = self._guild(request)
+        fields = {key: body[key] for key in _CHANNEL_FIELDS if body.get(key) is not None}
+        parent_id = fields.pop("parent_id", None)
+        channel_id = guild._add(body.get("type", TEXT), fields.pop("name"), parent_id, None, fields)
+        channel = guild.channels[channel_id]
+        self._number_tags(channel)
+        shifted = guild.place(channel, body["position"]) if body.get("position") is not None else []
+        self._dispatch("CHANNEL_CREATE", channel)
+        for other in shifted:
+            self._dispatch("CHANNEL_UPDATE", other)
+        return _json_response(channel, status=201)
+
+    async def _edit_channel(self, request, body):
+        guild, channel = self._channel(request)
+        for key in _CHANNEL_FIELDS:
+            if key in body:
+                channel[key] = body[key]
+        self._number_tags(channel)
+        shifted = guild.place(channel, body["position"]) if body.get("position") is not None else []
+        self._dispatch("CHANNEL_UPDATE", channel)
+        for other in shifted:
+            self._dispatch("CHANNEL_UPDATE", other)
+        return _json_response(channel)
+
+    def _number_tags(self, channel: dict) -> None:
+        """Give the forum tags a create or edit sent without an ID one, as Discord does."""
+        for tag in channel.get("available_tags") or []:
+            tag["id"] = str(tag.get("id") or self.next_id())
+
+    async def _bulk_channel_update(self, request, body):
+        for channel in self._guild(request).bulk_update(body):
+            self._dispatch("CHANNEL_UPDATE", channel)
+        return web.Response(status=204)
+
+    async def _delete_channel(self, request, _body):
+        guild, channel = self._channel(request)
+        deleted, *orphans = guild.remove(int(channel["id"]))
+        self._dispatch("CHANNEL_DELETE", deleted)
+        for child in orphans:
+            self._dispatch("CHANNEL_UPDATE", child)
+        return _json_response(deleted)
+
+
+    async def _create_role(self, request, body):
+        guild = self._guild(request)
+        role = _role(
+            self.next_id(), body.get("name", "new role"), 1,
+            **{key: body[key] for key in _ROLE_FIELDS if key in body and key != "name"},
+        )
+        _set_color(role, (body.get("colors") or {}).get("primary_color", 0))
+        for other in guild.insert_role(role):
+            self._dispatch_role("GUILD_ROLE_UPDATE", guild, other)
+        self._dispatch_role("GUILD_ROLE_CREATE", guild, role)
+        return _json_response(role)
+
+    async def _edit_role(self, request, body):
+        guild = self._guild(request)
+        role = guild.role(int(request.match_info["role_id"]))
+        for key in _ROLE_FIELDS:
+            if key in body:
+                role[key] = str(body[key]) if key == "permissions" else body[key]
+        if "colors" in body:
+            _set_color(role, body["colors"].get("primary_color", 0))
+        self._dispatch_role("GUILD_ROLE_UPDATE", guild, role)
+        return _json_response(role)
+
+    async def _bulk_role_update(self, request, body):
+        guild = self._guild(request)
+        for role in guild.move_roles(body):
+            self._dispatch_role("GUILD_ROLE_UPDATE", guild, role)
+        return _json_response(guild.ordered_roles())
+
+
+def _json_response(data: Any, status: int = 200, headers: Optional[Dict[str, str]] = None) -> web.Response:
+    # discord.py only decodes bodies labelled exactly "application/json", without a charset
+    return web.Response(
+        body=json.dumps(data).encode("utf-8"), status=status, headers=headers,
+        content_type="application/json",
+    )
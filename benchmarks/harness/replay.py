@@ -0,0 +1,61 @@
+"""
+Serve a recorded cassette back through ``FakeDiscord``.
+
+Each request the bot makes is matched against the first unplayed recorded
+interaction with the same method and path. A match is answered with the
+recorded status and body after the recorded duration, scaled by
+``time_scale``. Requests the cassette does not hold fall through to the
+simulation, so a replay still finishes when the apply code has changed;
+``unmatched`` and ``unplayed`` show where it diverged from the recording.
+"""
+
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from gitcord.utils.cassette import Cassette, Interaction
+
+
+@dataclass
+class CassetteReplay:
+    """Replay state of one cassette."""
+
+    cassette: Cassette
+    time_scale: float = 1.0
+    played: List[bool] = field(init=False)
+    unmatched: List[Tuple[str, str]] = field(default_factory=list)
+
+    def __post_init__(self):
+        self.played = [False] * len(self.cassette.interactions)
+
+    def take(self, method: str, path: str) -> Optional[Interaction]:
+        """The next unplayed interaction for a request, or None if there is none."""
+        for index, interaction in enumerate(self.cassette.interactions):
+            if not self.played[index] and interaction.method == method and interaction.path == path:
+                self.played[index] = True
+                return interaction
+        self.unmatched.append((method, path))
+        return None
+
+    @property
+    def matched(self) -> int:
+        return sum(self.played)
+
+    @property
+    def unplayed(self) -> List[Interaction]:
+        """Recorded interactions the replayed apply never asked for."""
+        return [
+            interaction for interaction, played in zip(self.cassette.interactions, self.played)
+            if not played
+        ]
+
+    @property
+    def diverged(self) -> bool:
+        return bool(self.unmatched or self.unplayed)
+
+    @property
+    def recorded_duration(self) -> float:
+        """Seconds from the first recorded request to the last response."""
+        return max(
+            (interaction.started + interaction.duration for interaction in self.cassette.interactions),
+            default=0.0,
+        )
@@ -0,0 +1,117 @@
+"""
+Startup import-time benchmark for GitCord bot.
+
+Runs ``python -X importtime`` in fresh interpreters for the bot entry point
+and for the cog extensions ``setup_hook`` loads, and reports the median
+cumulative import time of each plus the slowest modules.
+
+Usage:
+    python benchmarks/import_time.py [--runs N] [--budget-ms MS] [--output FILE]
+
+Exits with status 1 if the entry point plus cogs exceed ``--budget-ms``.
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Startup budget for importing the entry point and every cog, in milliseconds
+DEFAULT_BUDGET_MS = 600.0
+
+TARGETS = {
+    "entry point": "import gitcord.bot",
+    "entry point + cogs": (
+        "import gitcord.bot, gitcord.cogs.admin, gitcord.cogs.channels, "
+        "gitcord.cogs.utility, gitcord.cogs.help"
+    ),
+}
+
+_LINE_RE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def _run_importtime(statement: str) -> List[Tuple[str, int, int, int]]:
+    """Import in a fresh interpreter; return (module, self_us, cumulative_us, depth) rows."""
+    env = {**os.environ, "PYTHONPATH": os.path.join(ROOT, "src")}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        env=env,
+        cwd=ROOT,
+        check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append((module, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return rows
+
+
+def measure(statement: str, runs: int) -> Tuple[float, Dict[str, float]]:
+    """
+    Import ``statement`` ``runs`` times.
+
+    Returns:
+        Median total in milliseconds and median cumulative milliseconds per
+        top-level import of the run
+    """
+    totals = []
+    per_module: Dict[str, List[float]] = {}
+    for _ in range(runs):
+        rows = _run_importtime(statement)
+        top_level = [row for row in rows if row[3] == 0]
+        totals.append(sum(row[2] for row in top_level) / 1000)
+        for module, _self_us, cumulative_us, depth in rows:
+            if depth <= 1:
+                per_module.setdefault(module, []).append(cumulative_us / 1000)
+    medians = {module: statistics.median(values) for module, values in per_module.items()}
+    return statistics.median(totals), medians
+
+
+def render(results: Dict[str, Tuple[float, Dict[str, float]]], runs: int, budget_ms: float) -> str:
+    """Format results as a plain-text report."""
+    lines = [
+        f"GitCord import-time benchmark (python {sys.version.split()[0]}, median of {runs} runs)",
+        f"Budget for entry point + cogs: {budget_ms:.0f} ms",
+        "",
+    ]
+    for name, (total, modules) in results.items():
+        lines.append(f"{name}: {total:.1f} ms")
+        slowest = sorted(modules.items(), key=lambda item: item[1], reverse=True)[:15]
+        for module, cumulative in slowest:
+            lines.append(f"  {cumulative:8.1f} ms  {module}")
+        lines.append("")
+    return "\n".join(lines)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="interpreters per target")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--output", help="also write the report to this file")
+    args = parser.parse_args()
+
+    results = {name: measure(statement, args.runs) for name, statement in TARGETS.items()}
+    report = render(results, args.runs, args.budget_ms)
+    print(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report)
+
+    total = results["entry point + cogs"][0]
+    if total > args.budget_ms:
+        print(f"Startup imports took {total:.1f} ms, over the {args.budget_ms:.0f} ms budget")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,220 @@
+"""
+Multi-guild load test.
+
+Builds hundreds to thousands of guilds in one ``FakeDiscord`` behind a
+shared global rate limit, then triggers an apply in every guild at once, as
+when a template repository used by all of them is pulled. Reports how the
+bot schedules them:
+
+- latency per guild from trigger to finished apply: p50, p95, p99 and max
+- fairness: Jain's index of those latencies, where 1.0 means every guild
+  waited equally long
+- throughput and rate limited responses
+- event loop lag, sampled by a task that should wake every 10 ms
+- peak memory: resident set size, plus Python allocations under
+  ``--tracemalloc``
+
+Several guild counts can be given to find where latency and loop lag
+stop being acceptable, i.e. how many guilds one process can serve before
+sharding.
+
+Usage:
+    python benchmarks/load_test.py [--guilds 100 200 500] [--channels 10]
+        [--scenario drifted] [--global-limit 50/1] [--latency 0.05]
+        [--concurrency 4] [--tracemalloc] [--output FILE]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Dict, List, Optional
+
+from harness import DiscordHarness, RateLimit, quiet_logs
+
+from apply_bench import drift, synthetic_layout, template_files
+
+import gitcord
+from gitcord.config import config
+
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results", "load_test.json")
+SCENARIOS = ("fresh", "converged", "drifted")
+LAG_INTERVAL = 0.01
+
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    """p50, p95, p99 and max of ``values``."""
+    if len(values) < 2:
+        value = values[0] if values else 0.0
+        return {"p50": value, "p95": value, "p99": value, "max": value}
+    cuts = statistics.quantiles(values, n=100, method="inclusive")
+    return {"p50": cuts[49], "p95": cuts[94], "p99": cuts[98], "max": max(values)}
+
+
+def jain_index(values: List[float]) -> float:
+    """Jain's fairness index: 1.0 when all values are equal, 1/n when one takes everything."""
+    total = sum(values)
+    squares = sum(value * value for value in values)
+    return total * total / (len(values) * squares) if squares else 1.0
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process, where the platform reports it."""
+    try:
+        import resource  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+async def sample_loop_lag(samples: List[float], stop: asyncio.Event) -> None:
+    """Record how late the loop wakes a task sleeping for ``LAG_INTERVAL``."""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        started = loop.time()
+        await asyncio.sleep(LAG_INTERVAL)
+        samples.append(max(loop.time() - started - LAG_INTERVAL, 0.0))
+
+
+async def run_load(args, guild_count: int) -> dict:
+    """Trigger an apply in ``guild_count`` guilds at once and measure it."""
+    layout = synthetic_layout(args.channels)
+    files = template_files(layout, "monolithic")
+    async with DiscordHarness(
+        latency=args.latency, jitter=args.jitter, global_limit=args.global_limit,
+    ) as harness:
+        guilds = []
+        for number in range(guild_count):
+            if args.scenario == "fresh":
+                guild = harness.create_guild(name=f"Load Guild {number}")
+            else:
+                guild = harness.create_guild(layout, name=f"Load Guild {number}")
+                if args.scenario == "drifted":
+                    drift(harness.fake_guild(guild))
+            guilds.append(guild)
+
+        lag: List[float] = []
+        stop = asyncio.Event()
+        monitor = asyncio.create_task(sample_loop_lag(lag, stop))
+        if args.tracemalloc:
+            tracemalloc.start()
+        started = time.perf_counter()
+        runs = await asyncio.gather(*(harness.apply(guild, files, source="load test") for guild in guilds))
+        wall = time.perf_counter() - started
+        traced_peak = tracemalloc.get_traced_memory()[1] if args.tracemalloc else None
+        if args.tracemalloc:
+            tracemalloc.stop()
+        stop.set()
+        await monitor
+
+    latencies = [run.wall for run in runs]
+    waits = [run.plan for run in runs]
+    calls = sum(run.api_calls for run in runs)
+    return {
+        "guilds": guild_count,
+        "wall_s": wall,
+        "latency_s": percentiles(latencies),
+        "wait_s": percentiles(waits),
+        "fairness": jain_index(latencies),
+        "api_calls": calls,
+        "calls_per_s": calls / wall if wall else 0.0,
+        "rate_limited": sum(run.rate_limited for run in runs),
+        "problems": sum(len(run.report.warnings) for run in runs),
+        "loop_lag_ms": {key: value * 1000 for key, value in percentiles(lag).items()},
+        "peak_rss_mb": peak_rss_mb(),
+        "traced_peak_mb": traced_peak / (1024 * 1024) if traced_peak is not None else None,
+    }
+
+
+def render(result: dict) -> str:
+    latency, wait, lag = result["latency_s"], result["wait_s"], result["loop_lag_ms"]
+    lines = [
+        f"{result['guilds']} guilds",
+        f"  wall           {result['wall_s']:8.2f} s",
+        f"  latency        p50 {latency['p50']:7.2f} s  p95 {latency['p95']:7.2f} s  "
+        f"p99 {latency['p99']:7.2f} s  max {latency['max']:7.2f} s",
+        f"  queued         p50 {wait['p50']:7.2f} s  p95 {wait['p95']:7.2f} s  "
+        f"p99 {wait['p99']:7.2f} s  max {wait['max']:7.2f} s",
+        f"  fairness       {result['fairness']:.3f} (Jain's index of latencies)",
+        f"  REST calls     {result['api_calls']} ({result['calls_per_s']:.1f}/s, "
+        f"{result['rate_limited']} rate limited), {result['problems']} warnings or errors",
+        f"  loop lag       p50 {lag['p50']:6.1f} ms  p99 {lag['p99']:6.1f} ms  max {lag['max']:6.1f} ms",
+    ]
+    if result["peak_rss_mb"] is not None:
+        lines.append(f"  peak RSS       {result['peak_rss_mb']:.1f} MB")
+    if result["traced_peak_mb"] is not None:
+        lines.append(f"  traced peak    {result['traced_peak_mb']:.1f} MB")
+    return "\n".join(lines)
+
+
+def _format_limit(limit: Optional[RateLimit]) -> Optional[str]:
+    return f"{limit.limit}/{limit.per:g}" if limit else None
+
+
+def _rate_limit(value: str) -> Optional[RateLimit]:
+    if value.lower() == "none":
+        return None
+    limit, _, per = value.partition("/")
+    return RateLimit(int(limit), float(per or 1))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--guilds", type=int, nargs="+", default=[200], help="guild counts to run")
+    parser.add_argument("--channels", type=int, default=10, help="channels in each guild's template")
+    parser.add_argument("--scenario", choices=SCENARIOS, default="drifted")
+    parser.add_argument(
+        "--global-limit", type=_rate_limit, default=RateLimit(50, 1.0),
+        help="requests per window across all guilds as REQUESTS/SECONDS, or none (default 50/1)",
+    )
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per request")
+    parser.add_argument("--jitter", type=float, default=0.5, help="extra random latency fraction")
+    parser.add_argument("--concurrency", type=int, help="apply_concurrency to run with")
+    parser.add_argument("--tracemalloc", action="store_true", help="trace Python allocations, slower")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    args = parser.parse_args()
+
+    if args.concurrency:
+        os.environ["GITCORD_PERF_APPLY_CONCURRENCY"] = str(args.concurrency)
+        config.reload_performance()
+    quiet_logs()
+    settings = {
+        "channels": args.channels,
+        "scenario": args.scenario,
+        "apply_concurrency": config.performance.apply_concurrency,
+        "global_limit": _format_limit(args.global_limit),
+        "latency_s": args.latency,
+        "jitter": args.jitter,
+    }
+    print(
+        f"{args.channels} channels per guild ({args.scenario}), concurrency "
+        f"{settings['apply_concurrency']}, global limit {settings['global_limit'] or 'none'}"
+    )
+    results = []
+    for guild_count in args.guilds:
+        results.append(asyncio.run(run_load(args, guild_count)))
+        print(render(results[-1]))
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({
+            "gitcord_version": gitcord.__version__,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "settings": settings,
+            "results": results,
+        }, f, indent=2)
+        f.write("\n")
+    print(f"Wrote {len(results)} results to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
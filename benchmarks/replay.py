@@ -0,0 +1,76 @@
+"""
+Replay recorded applies offline.
+
+Loads cassettes written by a bot running with ``GITCORD_CASSETTE_DIR`` set
+and re-runs each apply through the harness against the recorded guild, with
+every REST call answered by its recorded response after its recorded
+duration. Reports the replayed apply time next to the recorded one and any
+divergence from the recorded call sequence, optionally under cProfile.
+
+Usage:
+    python benchmarks/replay.py CASSETTE [CASSETTE ...] [--time-scale 1.0]
+        [--profile FILE] [--top 25]
+
+Exits with status 1 if an apply made calls the cassette does not hold or
+skipped recorded ones.
+"""
+
+import argparse
+import asyncio
+import cProfile
+import io
+import pstats
+import sys
+from typing import List
+
+from harness import DiscordHarness, quiet_logs
+
+from gitcord.utils.cassette import Cassette
+
+
+async def replay_all(paths: List[str], time_scale: float) -> bool:
+    """Replay each cassette in turn; True if any diverged from its recording."""
+    diverged = False
+    async with DiscordHarness() as harness:
+        for path in paths:
+            cassette = Cassette.load(path)
+            run, replay = await harness.replay(cassette, time_scale)
+            print(
+                f"{path}: {replay.matched}/{len(cassette.interactions)} recorded calls replayed, "
+                f"apply {run.wall * 1000:.1f} ms (recorded calls span "
+                f"{replay.recorded_duration * 1000:.1f} ms), {len(run.report.changes)} changes"
+            )
+            for method, request_path in replay.unmatched:
+                print(f"  not in cassette: {method} {request_path}")
+            for interaction in replay.unplayed:
+                print(f"  not replayed:    {interaction.method} {interaction.path}")
+            diverged = diverged or replay.diverged
+    return diverged
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("cassettes", nargs="+", help="cassette files to replay")
+    parser.add_argument(
+        "--time-scale", type=float, default=1.0,
+        help="multiplier for recorded call durations, 0 replays without waiting",
+    )
+    parser.add_argument("--profile", help="write cProfile stats of the replays to this file")
+    parser.add_argument("--top", type=int, default=25, help="functions to list from the profile")
+    args = parser.parse_args()
+
+    quiet_logs()
+    if not args.profile:
+        diverged = asyncio.run(replay_all(args.cassettes, args.time_scale))
+    else:
+        profiler = cProfile.Profile()
+        diverged = profiler.runcall(asyncio.run, replay_all(args.cassettes, args.time_scale))
+        profiler.dump_stats(args.profile)
+        summary = io.StringIO()
+        pstats.Stats(profiler, stream=summary).sort_stats("cumulative").print_stats(args.top)
+        print(summary.getvalue())
+    return 1 if diverged else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,6 +3,9 @@ Main GitCord bot class and entry point.
 """
 
 import asyncio
+import contextlib
+import signal
+import time
 
 import discord
 from discord.ext import commands
@@ -10,6 +13,21 @@ from discord.ext import commands
 from .config import config
 from .events import setup_events
 from .utils.logger import main_logger as logger
+from .utils.metrics import (
+    create_trace_config,
+    instrument_http_client,
+    metrics_server_from_env,
+)
+from .utils.state_store import get_state_store
+from .views import PERSISTENT_ITEMS
+
+# Add more cogs here as they are created
+COG_EXTENSIONS = (
+    "gitcord.cogs.admin",
+    "gitcord.cogs.channels",
+    "gitcord.cogs.utility",
+    "gitcord.cogs.help",
+)
 
 
 class GitCordBot(commands.Bot):
@@ -24,7 +42,9 @@ class GitCordBot(commands.Bot):
             command_prefix=config.prefix,
             intents=intents,
             help_command=None,  # We can implement a custom help command later
+            http_trace=create_trace_config(),
         )
+        self.metrics_server = metrics_server_from_env()
 
         # Set up event handlers
         self.event_handler = setup_events(self)
@@ -35,24 +55,61 @@ class GitCordBot(commands.Bot):
         """Setup hook to register slash commands and load cogs."""
         logger.info("Setting up bot...")
 
+        # Record applies into cassettes when GITCORD_CASSETTE_DIR is set; the
+        # metrics wrapper goes around it so it can see response statuses
+        from .utils.cassette import instrument_cassettes
+
+        instrument_cassettes(self.http)
+        # Time every REST call per route and gitcord operation
+        instrument_http_client(self.http)
+
+        # Opening the store can migrate JSON state for every guild, so do it
+        # off the event loop before any command or apply first uses it
+        await asyncio.to_thread(get_state_store)
+
         # Load cogs
         await self._load_cogs()
 
+        # Delete buttons keep working for messages sent before a restart
+        self.add_dynamic_items(*PERSISTENT_ITEMS)
+
+        if self.metrics_server:
+            await self.metrics_server.start()
+
+        # Deployments retune performance settings with SIGHUP (not on Windows)
+        with contextlib.suppress(NotImplementedError, AttributeError):
+            asyncio.get_running_loop().add_signal_handler(signal.SIGHUP, self._reload_performance)
+
         # Command syncing is now done manually using the `/synccommands` slash command.
 
         logger.info("Bot setup completed")
 
     async def _load_cogs(self) -> None:
-        """Load all bot cogs."""
-        # Load the modularized cogs
-        await self.load_extension("gitcord.cogs.admin")
-        await self.load_extension("gitcord.cogs.channels")
-        await self.load_extension("gitcord.cogs.utility")
-        await self.load_extension("gitcord.cogs.help")
-        logger.info("Loaded all modularized cogs")
-
-        # Add more cogs here as they are created
-        # await self.load_extension("gitcord.cogs.git")
+        """Load all bot cogs concurrently."""
+        started = time.perf_counter()
+        await asyncio.gather(*(self.load_extension(name) for name in COG_EXTENSIONS))
+        logger.info(
+            "Loaded %d cogs in %.1f ms", len(COG_EXTENSIONS), (time.perf_counter() - started) * 1000
+        )
+
+    @staticmethod
+    def _reload_performance() -> None:
+        """Re-read performance settings, keeping the current ones if they are invalid."""
+        try:
+            settings = config.reload_performance()
+        except (OSError, ValueError) as e:
+            logger.error("Failed to reload performance settings: %s", e)
+            return
+        logger.info("Reloaded performance settings: %s", settings)
+
+    async def close(self) -> None:
+        """Stop the metrics server, close shared HTTP sessions and close the bot."""
+        if self.metrics_server:
+            await self.metrics_server.stop()
+        from .utils.template_archive import template_archives
+
+        await template_archives.close()
+        await super().close()
 
     async def on_command_error(
         self, context, error
@@ -3,31 +3,65 @@ Administrative commands cog for GitCord bot.
 Contains admin-only utility commands.
 """
 
+import asyncio
+import functools
+import logging
+import time
+from dataclasses import asdict
+from typing import Optional
+
 import discord
 from discord import app_commands
 from discord.ext import commands
 
-import tempfile
-import zipfile
 import os
-import shutil
-from urllib.parse import urlparse
+import posixpath
 import re
-import requests
-import subprocess
 
 from .base_cog import BaseCog
+from ..config import config
 from ..utils.helpers import (
+    CHANNEL_TYPES,
+    channel_changes,
+    create_channel_by_type,
+    create_channel_kwargs,
     create_embed,
     clean_webpage_text,
+    load_template_files,
     parse_category_config_from_str,
     parse_channel_config_from_str,
+    parse_monolithic_template_from_str,
     create_error_embed,
+    template_id,
     create_success_embed,
+    truncate_text,
+)
+from ..utils.apply_events import ApplyEvent, ObjectKind, OpKind
+from ..utils.apply_journal import ApplyJournal, category_key, channel_key
+from ..utils.apply_progress import ApplyProgress
+from ..utils.logger import log_context
+from ..utils.git_mirror import GitResult, GitTimeoutError, git_mirrors, run_git
+from ..utils.metrics import (
+    APPLY_OPERATION_DURATION,
+    APPLY_PHASE_DURATION,
+    tag_api_operation,
+    track_api_usage,
+)
+from ..utils.apply_report import ApplyReport
+from ..utils.cassette import record_cassette
+from ..utils.permissions import (
+    find_role,
+    merge_permissions,
+    missing_roles,
+    overwrites_to_apply,
+    resolve_overwrites,
 )
-from ..views.base_views import DeleteExtraObjectsView
+from ..utils.roles import role_changes, role_kwargs, role_positions
+from ..views import ApplyReportView
 from ..utils import template_metadata
-from ..constants.paths import get_template_repo_dir
+from ..utils.state_store import ApplyRecord, fingerprint_template, get_state_store
+from ..utils.template_archive import template_archives
+from ..constants.paths import get_mirror_dir, get_template_repo_dir
 
 
 class Admin(BaseCog):
@@ -36,8 +70,18 @@ class Admin(BaseCog):
     def __init__(self, bot: commands.Bot):
         """Initialize the Admin cog."""
         super().__init__(bot)
+        self._apply_limit = 0
+        self._apply_semaphore: Optional[asyncio.Semaphore] = None
         self.logger.info("Admin cog loaded")
 
+    def _apply_slots(self) -> asyncio.Semaphore:
+        """Get the semaphore bounding concurrent applies, resized when the setting changes."""
+        limit = config.performance.apply_concurrency
+        if limit != self._apply_limit:
+            # Applies already running finish under the old semaphore
+            self._apply_limit, self._apply_semaphore = limit, asyncio.Semaphore(limit)
+        return self._apply_semaphore
+
     @app_commands.command(
         name="synccommands", description="Manually sync slash commands"
     )
@@ -46,7 +90,8 @@ class Admin(BaseCog):
         """Synchronize application commands for this guild."""
         await interaction.response.defer(thinking=True, ephemeral=True)
         try:
-            synced = await self.bot.tree.sync(guild=interaction.guild)
+            with tag_api_operation("command_sync"):
+                synced = await self.bot.tree.sync(guild=interaction.guild)
             await interaction.followup.send(
                 f"Synced {len(synced)} command(s).", ephemeral=True
             )
@@ -69,7 +114,8 @@ class Admin(BaseCog):
             # Send initial response
             await ctx.send("🔄 Syncing slash commands...")
 
-            synced = await self.bot.tree.sync(guild=ctx.guild)
+            with tag_api_operation("command_sync"):
+                synced = await self.bot.tree.sync(guild=ctx.guild)
 
             embed = create_embed(
                 title="✅ Commands Synced",
@@ -90,43 +136,34 @@ class Admin(BaseCog):
                 ctx, "❌ Sync Failed", f"Failed to sync commands: {e}"
             )
 
-    def _convert_to_git_style_diff(self, result_msgs: list) -> str:
-        """Convert verbose template messages to git-style diff format."""
-        diff_lines = []
-        
-        for msg in result_msgs:
-            # Skip summary lines and info messages
-            if "**" in msg or msg.startswith("ℹ️") or "already exists" in msg:
-                continue
-                
-            # Parse different message types
-            if "🔄 Updated channel:" in msg or "🔄 Updated category:" in msg:
-                # Extract name: "🔄 Updated channel: moderator-only in Boilerplate" -> "M  moderator-only"
-                parts = msg.split(": ", 1)[1].split(" in ")
-                name = parts[0] if parts else "unknown"
-                diff_lines.append(f"M  {name}")
-            elif "Created channel:" in msg or "Created category:" in msg:
-                # Extract name: "Created channel: new-channel in Category" -> "A  new-channel"
-                parts = msg.split(": ", 1)[1].split(" in ")
-                name = parts[0] if parts else "unknown"
-                diff_lines.append(f"A  {name}")
-            elif "Deleted channel:" in msg or "Deleted category:" in msg:
-                # Extract name for deletions
-                parts = msg.split(": ", 1)[1].split(" in ")
-                name = parts[0] if parts else "unknown"
-                diff_lines.append(f"D  {name}")
-            # Skip "Skipped" messages as they indicate no changes
-            
-        return "\n".join(diff_lines) if diff_lines else "No changes"
+    @commands.command(name="reloadconfig")
+    @commands.has_permissions(administrator=True)
+    async def reloadconfig_prefix(self, ctx: commands.Context) -> None:
+        """Re-read performance settings without restarting the bot."""
+        try:
+            settings = await asyncio.to_thread(config.reload_performance)
+        except (OSError, ValueError) as e:
+            self.logger.error("Failed to reload performance settings: %s", e)
+            await self.send_error(ctx, "❌ Reload Failed", f"Kept the current settings: {e}")
+            return
+        self.logger.info("Reloaded performance settings: %s", settings)
+        embed = create_embed(
+            title="✅ Settings Reloaded",
+            description="\n".join(f"**{name}**: {value}" for name, value in asdict(settings).items()),
+            color=discord.Color.green(),
+            footer="Read from the settings file and .env. GITCORD_PERF_* variables set "
+            "in the bot's environment only change on restart.",
+        )
+        await ctx.send(embed=embed)
 
     @commands.command(name="git")
     @commands.has_permissions(administrator=True)
     async def git_command(self, ctx: commands.Context, *args):
-        """Handle !git clone <url> [-b branch], !git pull, and warn on others."""
+        """Handle !git clone <url> [-b branch|tag|commit], !git pull, and warn on others."""
         if not args:
             embed = create_error_embed(
                 "❌ Invalid Usage", 
-                "Usage: `!git clone <url> [-b branch]` or `!git pull`"
+                "Usage: `!git clone <url> [-b branch|tag|commit]` or `!git pull`"
             )
             await ctx.send(embed=embed)
             return
@@ -139,25 +176,46 @@ class Admin(BaseCog):
             if len(args) < 2:
                 embed = create_error_embed(
                     "❌ Missing Repository URL",
-                    "Usage: `!git clone <url> [-b branch]`"
+                    "Usage: `!git clone <url> [-b branch|tag|commit]`"
                 )
                 await ctx.send(embed=embed)
                 return
             
             url = args[1]
-            branch = "main"
+            ref = "main"
             if len(args) >= 4 and args[2] == "-b":
-                branch = args[3]
-            
-            # Remove existing repo if present
-            if os.path.exists(repo_dir):
-                shutil.rmtree(repo_dir)
-            os.makedirs(repo_dir, exist_ok=True)
+                ref = args[3]
             
             try:
-                result = subprocess.run([
-                    "git", "clone", "-b", branch, url, repo_dir
-                ], capture_output=True, text=True, timeout=60)
+                # One shared mirror per URL; this guild only gets a worktree of it
+                result = await git_mirrors.fetch(url)
+                resolved = None
+                reused = False
+                if result.returncode == 0:
+                    resolved = await git_mirrors.resolve_ref(url, ref)
+                    if resolved is None:
+                        # The ref may be newer than a recently reused fetch
+                        result = await git_mirrors.fetch(url, force=True)
+                        if result.returncode == 0:
+                            resolved = await git_mirrors.resolve_ref(url, ref)
+                if result.returncode == 0 and resolved is None:
+                    result = GitResult(1, "", f"No branch, tag or commit named '{ref}' in {url}")
+                if result.returncode == 0:
+                    old_meta = await asyncio.to_thread(template_metadata.load_metadata, guild_id)
+                    old_meta = old_meta or {}
+                    # Same remote: switch the existing worktree instead of recreating it
+                    reused = old_meta.get("mirror") == get_mirror_dir(url) and os.path.isdir(repo_dir)
+                    if reused:
+                        checkout = await git_mirrors.checkout(url, guild_id, repo_dir, resolved[1])
+                    else:
+                        await git_mirrors.remove_checkout(
+                            repo_dir, old_meta.get("url") if old_meta.get("mirror") else None
+                        )
+                        os.makedirs(os.path.dirname(repo_dir), exist_ok=True)
+                        checkout = await git_mirrors.add_worktree(url, guild_id, repo_dir, resolved[1])
+                    result = GitResult(
+                        checkout.returncode, checkout.stdout, result.stderr + checkout.stderr
+                    )
                 
                 if result.returncode != 0:
                     error_embed = create_error_embed(
@@ -168,32 +226,39 @@ class Admin(BaseCog):
                     return
                 
                 # Save metadata
-                template_metadata.save_metadata(guild_id, {
+                ref_type = resolved[0]
+                await asyncio.to_thread(template_metadata.save_metadata, guild_id, {
                     "url": url,
-                    "branch": branch,
-                    "local_path": repo_dir
+                    "branch": ref,
+                    "ref_type": ref_type,
+                    "local_path": repo_dir,
+                    "mirror": get_mirror_dir(url),
                 })
                 
-                # Always show success
-                success_embed = create_success_embed(
-                    "✅ Repository Cloned",
-                    f"Template repository cloned successfully\n`{url}` (branch: `{branch}`)"
-                )
-                await ctx.send(embed=success_embed)
-                
-                # Show warnings if any
+                # Success and any warnings go out as one message
+                if reused:
+                    success = create_success_embed(
+                        "✅ Checkout Switched",
+                        f"Existing checkout of `{url}` switched to {ref_type} `{ref}`"
+                    )
+                else:
+                    success = create_success_embed(
+                        "✅ Repository Cloned",
+                        f"Template repository cloned successfully\n`{url}` ({ref_type}: `{ref}`)"
+                    )
+                embeds = [success]
                 if result.stderr.strip():
-                    warning_embed = create_embed(
+                    embeds.append(create_embed(
                         title="⚠️ Clone Warnings",
-                        description=f"```\n{result.stderr}\n```",
+                        description=f"```\n{truncate_text(result.stderr, 4000)}\n```",
                         color=discord.Color.orange()
-                    )
-                    await ctx.send(embed=warning_embed)
+                    ))
+                await ctx.send(embeds=embeds)
                     
-            except subprocess.TimeoutExpired:
+            except GitTimeoutError:
                 timeout_embed = create_error_embed(
                     "⏰ Clone Timeout",
-                    "Git clone operation timed out after 60 seconds."
+                    f"Git clone operation timed out after {config.performance.git_timeout:g} seconds."
                 )
                 await ctx.send(embed=timeout_embed)
             except Exception as e:
@@ -204,7 +269,7 @@ class Admin(BaseCog):
                 await ctx.send(embed=error_embed)
                 
         elif cmd == "pull":
-            meta = template_metadata.load_metadata(guild_id)
+            meta = await asyncio.to_thread(template_metadata.load_metadata, guild_id)
             if not meta or not os.path.exists(meta.get("local_path", "")):
                 embed = create_error_embed(
                     "❌ No Template Repository",
@@ -214,9 +279,22 @@ class Admin(BaseCog):
                 return
             
             try:
-                result = subprocess.run([
-                    "git", "pull"
-                ], cwd=meta["local_path"], capture_output=True, text=True, timeout=60)
+                pinned = meta.get("ref_type", "branch") != "branch"
+                if meta.get("mirror") and pinned:
+                    # Tags and commits never move, there is nothing to fetch
+                    result = GitResult(0, "", "")
+                elif meta.get("mirror"):
+                    # A fetch of the shared mirror is reused by every guild pulling soon after
+                    fetch = await git_mirrors.fetch(meta["url"])
+                    result = fetch
+                    if fetch.returncode == 0:
+                        merge = await git_mirrors.fast_forward(
+                            meta["url"], meta["local_path"], meta["branch"]
+                        )
+                        result = GitResult(merge.returncode, merge.stdout, fetch.stderr + merge.stderr)
+                else:
+                    # Checkouts cloned before shared mirrors existed
+                    result = await run_git("pull", ["git", "pull"], cwd=meta["local_path"])
                 
                 if result.returncode != 0:
                     error_embed = create_error_embed(
@@ -226,86 +304,42 @@ class Admin(BaseCog):
                     await ctx.send(embed=error_embed)
                     return
                 
-                # Always show basic success
+                # Everything about this pull goes into a single report message,
+                # which replaces the live progress message once the apply is done
+                progress = await ApplyProgress.start(ctx=ctx)
+                report = ApplyReport()
                 git_output = result.stdout.strip()
                 if git_output and git_output != "Already up to date.":
-                    # Show changes
-                    success_embed = create_success_embed(
-                        "✅ Repository Updated",
-                        f"```\n{git_output}\n```"
-                    )
+                    report.notes.append("Repository updated:")
+                    report.git_output = git_output
+                elif pinned:
+                    report.notes.append(f"Template pinned to {meta['ref_type']} `{meta['branch']}`.")
                 else:
-                    # Show "already up to date"
-                    success_embed = create_success_embed(
-                        "✅ Repository Up To Date",
-                        "No changes found in remote repository"
-                    )
-                await ctx.send(embed=success_embed)
-                
-                # Show git warnings if any
-                if result.stderr.strip():
-                    warning_embed = create_embed(
-                        title="⚠️ Git Warnings",
-                        description=f"```\n{result.stderr}\n```",
-                        color=discord.Color.orange()
-                    )
-                    await ctx.send(embed=warning_embed)
+                    report.notes.append("Repository up to date, no changes found in remote repository.")
+                report.git_warnings = result.stderr.strip()
+                head = await run_git("rev_parse", ["git", "rev-parse", "HEAD"], cwd=meta["local_path"])
+                commit = head.stdout.strip() if head.returncode == 0 else None
                 
                 try:
                     # Always apply template to ensure Discord matches the template
                     # (Even if git says "up to date", Discord might not match the template)
-                    result_msgs = await self._apply_template_from_dir(ctx.guild, meta["local_path"], ctx=ctx)
-                    
-                    # Convert to git-style diff
-                    if result_msgs:
-                        # Check for warnings/errors first
-                        warnings = [msg for msg in result_msgs if "warning" in msg.lower() or "error" in msg.lower() or "failed" in msg.lower()]
-                        
-                        # Show warnings if any
-                        if warnings:
-                            template_warning_embed = create_embed(
-                                title="⚠️ Template Warnings",
-                                description=f"```\n{chr(10).join(warnings)}\n```",
-                                color=discord.Color.orange()
-                            )
-                            await ctx.send(embed=template_warning_embed)
-                        
-                        # Convert to git-style diff
-                        git_diff = self._convert_to_git_style_diff(result_msgs)
-                        
-                        if git_diff and git_diff != "No changes":
-                            template_changes_embed = create_success_embed(
-                                "✅ Template Applied",
-                                f"```\n{git_diff}\n```"
-                            )
-                            await ctx.send(embed=template_changes_embed)
-                        else:
-                            # No changes
-                            template_success_embed = create_success_embed(
-                                "✅ Template Applied",
-                                "No changes needed"
-                            )
-                            await ctx.send(embed=template_success_embed)
-                    else:
-                        # No template results
-                        template_success_embed = create_success_embed(
-                            "✅ Template Applied",
-                            "No output from template processing"
-                        )
-                        await ctx.send(embed=template_success_embed)
-                        
-                except Exception as e:
-                    self.logger.error(f"[git pull apply] Error: {e}", exc_info=True)
-                    error_embed = create_error_embed(
-                        "❌ Template Application Failed",
-                        f"```\n{str(e)}\n```"
+                    files = await asyncio.to_thread(load_template_files, meta["local_path"])
+                    await self._stream_apply(
+                        ctx.guild, files, report, progress,
+                        source=meta.get("url", ""), commit=commit,
                     )
-                    await ctx.send(embed=error_embed)
+                except Exception as e:
+                    self.logger.error("[git pull apply] Error: %s", e, exc_info=True)
+                    report.title = "❌ Template Application Failed"
+                    report.failed = True
+                    report.warnings.append(str(e))
+                
+                await ApplyReportView(report).send(ctx=ctx, message=progress.message)
                     
-            except subprocess.TimeoutExpired:
+            except GitTimeoutError:
                 timeout_embed = create_error_embed(
                     "⏰ Pull Timeout",
-                    "Git pull operation timed out after 60 seconds."
+                    f"Git pull operation timed out after {config.performance.git_timeout:g} seconds."
                 )
                 await ctx.send(embed=timeout_embed)
             except Exception as e:
@@ -323,6 +357,11 @@ class Admin(BaseCog):
 
     # Patch applytemplate to use local repo if present
     def _get_template_dir(self, folder=None, guild_id=None):
+        """
+        The guild's local template checkout, or ``folder`` in it.
+
+        Reads the template metadata and checks paths, so call it in a thread.
+        """
         meta = template_metadata.load_metadata(guild_id)
         if meta and os.path.exists(meta.get("local_path", "")):
             repo_root = meta["local_path"]
@@ -335,26 +374,104 @@ class Admin(BaseCog):
             return repo_root
         return None
 
+    async def _stream_apply(self, guild, files, report, progress, source="", commit=None):
+        """
+        Consume the apply event stream into a report while updating progress.
+
+        ``files`` maps template file paths to their contents, as returned by
+        ``load_template_files`` or a template archive download.
+
+        The apply is recorded in the guild's history whether or not it
+        succeeds, with status ``error`` if it raised or reported an error,
+        ``partial`` if it reported warnings and ``ok`` otherwise. Only an
+        ``ok`` apply stores its commit and fingerprint.
+        """
+        store = get_state_store()
+        fingerprint = fingerprint_template(files)
+        previous = await asyncio.to_thread(store.get_fingerprint, guild.id, "template")
+        if fingerprint and fingerprint == previous:
+            report.notes.append("Template files unchanged since the last apply, checking Discord for drift.")
+
+        # Bounded across guilds so many concurrent applies cannot starve the bot.
+        # With GITCORD_CASSETTE_DIR set, the apply's REST traffic is recorded.
+        async with self._apply_slots(), record_cassette(guild, files, source):
+            with log_context() as apply_id, tag_api_operation("apply"):
+                self.logger.info(
+                    "[apply_template] Applying %d template file(s) from %s to guild %s",
+                    len(files), source or "local repo", guild.id,
+                )
+                started_at = time.time()
+                started = planned_at = time.perf_counter()
+                journal = await ApplyJournal.open(store, guild.id, apply_id, fingerprint)
+                stored_ids = await asyncio.to_thread(store.get_object_ids, guild.id)
+                object_ids = dict(stored_ids)
+                if journal.resumed:
+                    report.notes.append(
+                        f"Resuming an interrupted apply, {journal.resumed} operations already done."
+                    )
+                status = "error"
+                problems = set()
+                try:
+                    async for event in self._apply_template_files(guild, files, journal, object_ids):
+                        if event.is_problem:
+                            problems.add(event.op)
+                        if event.op is OpKind.PLAN:
+                            planned_at = time.perf_counter()
+                            APPLY_PHASE_DURATION.observe(planned_at - started, "plan")
+                        elif event.is_change:
+                            APPLY_OPERATION_DURATION.observe(event.duration, event.op.value, event.kind.value)
+                        report.add_event(event)
+                        await progress.update(event)
+                    await journal.finish()
+                    if OpKind.ERROR in problems:
+                        status = "error"
+                    else:
+                        status = "partial" if problems else "ok"
+                finally:
+                    finished = time.perf_counter()
+                    APPLY_PHASE_DURATION.observe(finished - planned_at, "reconcile")
+                    APPLY_PHASE_DURATION.observe(finished - started, "total")
+                    await asyncio.to_thread(store.record_apply, ApplyRecord(
+                        guild_id=guild.id, started_at=started_at, finished_at=time.time(),
+                        status=status, source=source, commit=commit, fingerprint=fingerprint,
+                        changes=len(report.changes), warnings=len(report.warnings),
+                        api_calls=report.api_calls, correlation_id=apply_id,
+                    ))
+                    new_ids = {key: value for key, value in object_ids.items() if stored_ids.get(key) != value}
+                    if new_ids:
+                        await asyncio.to_thread(store.set_object_ids, guild.id, new_ids)
+                # A failed apply must not look up to date to the next one
+                if commit and status == "ok":
+                    await asyncio.to_thread(store.set_last_commit, guild.id, commit)
+                if fingerprint and status == "ok":
+                    await asyncio.to_thread(store.set_fingerprint, guild.id, "template", fingerprint)
+                self.logger.info("[apply_template] Finished apply %s", apply_id)
+
+    async def _apply_and_report(self, guild, files, ctx=None, interaction=None, source=""):
+        """Apply template files and send the outcome as one report message."""
+        progress = await ApplyProgress.start(ctx=ctx, interaction=interaction)
+        report = ApplyReport(
+            notes=["⚠️ `applytemplate` is deprecated. Please use `!git clone` and `!git pull` instead."]
+        )
+        await self._stream_apply(guild, files, report, progress, source=source)
+        await ApplyReportView(report).send(message=progress.message)
+
     @commands.command(name="applytemplate")
     @commands.has_permissions(administrator=True)
     async def applytemplate_prefix(self, ctx: commands.Context, url: str = None, folder: str = None, branch: str = "main"):
-        await ctx.send("⚠️ The !applytemplate command is deprecated. Please use !git clone and !git pull instead.")
         template_dir = None
         guild_id = ctx.guild.id
         if url is None:
-            template_dir = self._get_template_dir(folder, guild_id)
+            template_dir = await asyncio.to_thread(self._get_template_dir, folder, guild_id)
             if not template_dir:
                 await ctx.send("❌ No local template repo found for this server. Use !git clone or provide a URL.")
                 return
         if template_dir:
-            await ctx.send("🔄 Applying template from local repo...")
             try:
-                result_msgs = await self._apply_template_from_dir(ctx.guild, template_dir, ctx=ctx)
-                for msg in result_msgs:
-                    self.logger.info(f"[applytemplate_prefix] {msg}")
-                await ctx.send("\n".join(result_msgs))
+                files = await asyncio.to_thread(load_template_files, template_dir)
+                await self._apply_and_report(ctx.guild, files, ctx=ctx)
             except Exception as e:
-                self.logger.error(f"[applytemplate_prefix] Error: {e}", exc_info=True)
+                self.logger.error("[applytemplate_prefix] Error: %s", e, exc_info=True)
                 await self.send_error(ctx, "❌ Template Error", str(e))
             return
         # Fallback to old logic if URL is provided
@@ -362,22 +479,14 @@ class Admin(BaseCog):
             await ctx.send("❌ Only direct github.com repository URLs are supported.")
             return
         self.logger.info(
-            f"[applytemplate_prefix] User: {ctx.author}, URL: {url}, folder: {folder}, branch: {branch}"
+            "[applytemplate_prefix] User: %s, URL: %s, folder: %s, branch: %s",
+            ctx.author, url, folder, branch,
         )
-        await ctx.send("🔄 Downloading and extracting template from GitHub...")
         try:
-            temp_dir = self._download_and_extract_github(url, folder, branch)
-            self.logger.info(f"[applytemplate_prefix] Extracted to: {temp_dir}")
-            result_msgs = await self._apply_template_from_dir(
-                ctx.guild, temp_dir, ctx=ctx
-            )
-            for msg in result_msgs:
-                self.logger.info(f"[applytemplate_prefix] {msg}")
-            await ctx.send("\n".join(result_msgs))
-            shutil.rmtree(temp_dir)
-            self.logger.info(f"[applytemplate_prefix] Cleaned up temp dir: {temp_dir}")
+            files = await template_archives.fetch(url, folder, branch)
+            await self._apply_and_report(ctx.guild, files, ctx=ctx, source=url)
         except Exception as e:
-            self.logger.error(f"[applytemplate_prefix] Error: {e}", exc_info=True)
+            self.logger.error("[applytemplate_prefix] Error: %s", e, exc_info=True)
             await self.send_error(ctx, "❌ Template Error", str(e))
 
     @app_commands.command(
@@ -396,23 +505,20 @@ class Admin(BaseCog):
         folder: str = None,
         branch: str = "main",
     ) -> None:
-        await interaction.response.send_message("⚠️ The /applytemplate command is deprecated. Please use !git clone and !git pull instead.", ephemeral=True)
         template_dir = None
         guild_id = interaction.guild.id
         if url is None:
-            template_dir = self._get_template_dir(folder, guild_id)
+            template_dir = await asyncio.to_thread(self._get_template_dir, folder, guild_id)
             if not template_dir:
                 await interaction.response.send_message("❌ No local template repo found for this server. Use !git clone or provide a URL.", ephemeral=True)
                 return
         if template_dir:
             await interaction.response.defer()
             try:
-                result_msgs = await self._apply_template_from_dir(interaction.guild, template_dir, interaction=interaction)
-                for msg in result_msgs:
-                    self.logger.info(f"[applytemplate_slash] {msg}")
-                await interaction.followup.send("\n".join(result_msgs))
+                files = await asyncio.to_thread(load_template_files, template_dir)
+                await self._apply_and_report(interaction.guild, files, interaction=interaction)
             except Exception as e:
-                self.logger.error(f"[applytemplate_slash] Error: {e}", exc_info=True)
+                self.logger.error("[applytemplate_slash] Error: %s", e, exc_info=True)
                 await self.send_interaction_error(interaction, "❌ Template Error", str(e))
             return
         # Fallback to old logic if URL is provided
@@ -420,484 +526,599 @@ class Admin(BaseCog):
             await interaction.response.send_message("❌ Only direct github.com repository URLs are supported.", ephemeral=True)
             return
         self.logger.info(
-            f"[applytemplate_slash] User: {interaction.user}, URL: {url}, folder: {folder}, branch: {branch}"
+            "[applytemplate_slash] User: %s, URL: %s, folder: %s, branch: %s",
+            interaction.user, url, folder, branch,
         )
         await interaction.response.defer()
         try:
-            temp_dir = self._download_and_extract_github(url, folder, branch)
-            self.logger.info(f"[applytemplate_slash] Extracted to: {temp_dir}")
-            result_msgs = await self._apply_template_from_dir(
-                interaction.guild, temp_dir, interaction=interaction
+            files = await template_archives.fetch(url, folder, branch)
+            await self._apply_and_report(
+                interaction.guild, files, interaction=interaction, source=url
             )
-            for msg in result_msgs:
-                self.logger.info(f"[applytemplate_slash] {msg}")
-            await interaction.followup.send("\n".join(result_msgs))
-            shutil.rmtree(temp_dir)
-            self.logger.info(f"[applytemplate_slash] Cleaned up temp dir: {temp_dir}")
         except Exception as e:
-            self.logger.error(f"[applytemplate_slash] Error: {e}", exc_info=True)
+            self.logger.error("[applytemplate_slash] Error: %s", e, exc_info=True)
             await self.send_interaction_error(interaction, "❌ Template Error", str(e))
 
-    def _download_and_extract_github(
-        self, url: str, folder: str = None, branch: str = "main"
-    ) -> str:
-        """Download a GitHub repo/folder as zip, extract to temp dir, return path."""
-        # Parse the URL
-        parsed = urlparse(url)
-        if "github.com" not in parsed.netloc:
-            raise ValueError("Only GitHub URLs are supported.")
-        path_parts = parsed.path.strip("/").split("/")
-        if len(path_parts) < 2:
-            raise ValueError("Invalid GitHub URL.")
-        user, repo = path_parts[0], path_parts[1]
-        # Determine zip URL
-        zip_url = f"https://github.com/{user}/{repo}/archive/refs/heads/{branch}.zip"
-        # Download zip
-        resp = requests.get(zip_url, stream=True, timeout=30)
-        if resp.status_code != 200:
-            raise ValueError(
-                f"Failed to download zip from {zip_url} (status {resp.status_code})"
+    def _log_event(self, event: ApplyEvent) -> ApplyEvent:
+        """Log an apply event at a level matching its kind and return it."""
+        if event.op is OpKind.ERROR:
+            level = logging.ERROR
+        elif event.op in (OpKind.WARNING, OpKind.EXTRA):
+            level = logging.WARNING
+        else:
+            level = logging.INFO
+        self.logger.log(level, "[apply_template] %s", event)
+        return event
+
+    async def _apply_category(
+        self, guild, category_name, category_index, overwrites=None, existing=None, begin=None
+    ):
+        """
+        Create a category or update its name, position and overwrites to match the template.
+
+        ``overwrites`` are the resolved role overwrites it should have, or None
+        if the template leaves them alone. ``existing`` is the category its
+        template ID was last applied to; without one it is found by name.
+        ``begin`` is awaited right before the create or edit, if there is one.
+        """
+        existing_category = existing or discord.utils.get(guild.categories, name=category_name)
+        started = time.perf_counter()
+        if not existing_category:
+            category_kwargs = {"name": category_name, "position": category_index}
+            if overwrites is not None:
+                category_kwargs["overwrites"] = overwrites
+            if begin:
+                await begin()
+            with track_api_usage() as usage:
+                category = await guild.create_category(**category_kwargs)
+            return category, ApplyEvent(
+                OpKind.CREATE, ObjectKind.CATEGORY, category_name,
+                position=category_index, object_id=category.id,
+                duration=time.perf_counter() - started, api_calls=usage.calls,
+            )
+
+        update_kwargs = {}
+        if existing_category.name != category_name:
+            update_kwargs["name"] = category_name
+        # Check if category is in correct relative order (smart positioning)
+        guild_categories = sorted(guild.categories, key=lambda cat: cat.position)
+        if guild_categories.index(existing_category) != category_index:
+            update_kwargs["position"] = category_index
+        if overwrites is not None:
+            new_overwrites = overwrites_to_apply(existing_category, overwrites)
+            if new_overwrites is not None:
+                update_kwargs["overwrites"] = new_overwrites
+        if not update_kwargs:
+            return existing_category, ApplyEvent(
+                OpKind.SKIP, ObjectKind.CATEGORY, category_name,
+                object_id=existing_category.id,
+            )
+        if begin:
+            await begin()
+        with track_api_usage() as usage:
+            try:
+                await existing_category.edit(**update_kwargs)
+            except (discord.Forbidden, discord.HTTPException) as e:
+                return existing_category, ApplyEvent(
+                    OpKind.WARNING, ObjectKind.CATEGORY, category_name,
+                    object_id=existing_category.id, api_calls=usage.calls,
+                    detail=f"Failed to update category {category_name}: {e}",
+                )
+        return existing_category, ApplyEvent(
+            OpKind.UPDATE, ObjectKind.CATEGORY, category_name,
+            fields=tuple(update_kwargs), position=update_kwargs.get("position"),
+            object_id=existing_category.id,
+            duration=time.perf_counter() - started, api_calls=usage.calls,
+        )
+
+    async def _apply_channel(
+        self, guild, category, channel_config, channel_slot, overwrites=None, existing=None, begin=None
+    ):
+        """
+        Create a channel in its category or update it to match the template.
+
+        ``channel_slot`` is the channel's index among the template channels of
+        its category that Discord sorts with it: voice-like channels are
+        ordered separately from the rest and always listed after them.
+        ``overwrites`` are its resolved role overwrites, or None if the
+        template leaves them alone; they go out with the create or the one
+        edit of the channel's other fields. ``existing`` is the channel its
+        template ID was last applied to, which may be renamed or moved in from
+        another category by that edit; without one it is found by name.
+        ``begin`` is awaited right before the create or edit, if there is one.
+        """
+        channel_name = channel_config["name"]
+        channel_type = channel_config["type"].lower()
+        existing_channel = existing or discord.utils.get(category.channels, name=channel_name)
+        # discord.py lists forums after text channels, Discord sorts them together
+        siblings = sorted(
+            (ch for ch in category.channels if _sorts_with(ch, channel_type)),
+            key=lambda ch: (ch.position, ch.id),
+        )
+        started = time.perf_counter()
+
+        if existing_channel:
+            # Update the type's attributes, overwrites and position if needed
+            update_kwargs = channel_changes(existing_channel, channel_config)
+            if existing_channel.name != channel_name:
+                update_kwargs["name"] = channel_name
+            if overwrites is not None:
+                new_overwrites = overwrites_to_apply(existing_channel, overwrites)
+                if new_overwrites is not None:
+                    update_kwargs["overwrites"] = new_overwrites
+
+            moved_in = existing_channel.category_id != category.id
+            if moved_in:
+                update_kwargs["category"] = category
+            # Only move if the channel is not at the correct relative position
+            if moved_in or (
+                existing_channel in siblings and siblings.index(existing_channel) != channel_slot
+            ):
+                others = [ch for ch in siblings if ch != existing_channel]
+                # Positions are guild-wide, so move before whatever holds the slot now
+                if channel_slot < len(others):
+                    update_kwargs["position"] = others[channel_slot].position
+                elif others:
+                    update_kwargs["position"] = others[-1].position + 1
+
+            if not update_kwargs:
+                return ApplyEvent(
+                    OpKind.SKIP, ObjectKind.CHANNEL, channel_name,
+                    category=category.name, object_id=existing_channel.id,
+                )
+            if begin:
+                await begin()
+            # A position change is a bulk move plus the edit, so count the calls
+            with track_api_usage() as usage:
+                await existing_channel.edit(**update_kwargs)
+            return ApplyEvent(
+                OpKind.UPDATE, ObjectKind.CHANNEL, channel_name,
+                category=category.name, fields=tuple(update_kwargs),
+                position=channel_slot if "position" in update_kwargs else None,
+                object_id=existing_channel.id,
+                duration=time.perf_counter() - started, api_calls=usage.calls,
+            )
+
+        if channel_type not in CHANNEL_TYPES:
+            return ApplyEvent(
+                OpKind.ERROR, ObjectKind.CHANNEL, channel_name, category=category.name,
+                detail=f"Unknown channel type: {channel_type} for {channel_name}",
+            )
+        # New channels go last unless the template puts them before an existing one.
+        # Everything else the template sets goes out with the create.
+        position = siblings[channel_slot].position if channel_slot < len(siblings) else None
+        channel_kwargs = create_channel_kwargs(channel_config, category, position, overwrites)
+        if begin:
+            await begin()
+        with track_api_usage() as usage:
+            new_channel = await create_channel_by_type(guild, channel_config, channel_kwargs)
+        return ApplyEvent(
+            OpKind.CREATE, ObjectKind.CHANNEL, channel_name,
+            category=category.name, position=channel_slot, object_id=new_channel.id,
+            duration=time.perf_counter() - started, api_calls=usage.calls,
+        )
+
+    async def _apply_role(self, guild, role_config):
+        """
+        Create a role or edit the attributes the template sets in one call.
+
+        Returns:
+            The role, or None if it could not be created, and its event
+        """
+        role_name = role_config["name"]
+        existing_role = find_role(guild, role_name)
+        started = time.perf_counter()
+        if existing_role is None:
+            with track_api_usage() as usage:
+                try:
+                    role = await guild.create_role(name=role_name, **role_kwargs(role_config))
+                except (discord.Forbidden, discord.HTTPException) as e:
+                    return None, ApplyEvent(
+                        OpKind.WARNING, ObjectKind.ROLE, role_name, api_calls=usage.calls,
+                        detail=f"Failed to create role {role_name}: {e}",
+                    )
+            return role, ApplyEvent(
+                OpKind.CREATE, ObjectKind.ROLE, role_name, object_id=role.id,
+                duration=time.perf_counter() - started, api_calls=usage.calls,
+            )
+
+        update_kwargs = role_changes(existing_role, role_config)
+        if not update_kwargs:
+            return existing_role, ApplyEvent(
+                OpKind.SKIP, ObjectKind.ROLE, role_name, object_id=existing_role.id,
+            )
+        with track_api_usage() as usage:
+            try:
+                await existing_role.edit(**update_kwargs)
+            except (discord.Forbidden, discord.HTTPException) as e:
+                return existing_role, ApplyEvent(
+                    OpKind.WARNING, ObjectKind.ROLE, role_name,
+                    object_id=existing_role.id, api_calls=usage.calls,
+                    detail=f"Failed to update role {role_name}: {e}",
+                )
+        return existing_role, ApplyEvent(
+            OpKind.UPDATE, ObjectKind.ROLE, role_name,
+            fields=tuple(update_kwargs), object_id=existing_role.id,
+            duration=time.perf_counter() - started, api_calls=usage.calls,
+        )
+
+    async def _apply_role_order(self, guild, roles):
+        """Put template roles in template order with one bulk position update."""
+        # Prefer the cached roles, whose positions follow gateway updates
+        positions = role_positions(guild.get_role(role.id) or role for role in roles)
+        if not positions:
+            return ApplyEvent(OpKind.SKIP, ObjectKind.ROLE, "role order")
+        moved = ", ".join(role.name for role in positions)
+        started = time.perf_counter()
+        with track_api_usage() as usage:
+            try:
+                await guild.edit_role_positions(positions)
+            except (discord.Forbidden, discord.HTTPException) as e:
+                return ApplyEvent(
+                    OpKind.WARNING, ObjectKind.ROLE, moved, api_calls=usage.calls,
+                    detail=f"Failed to reorder roles {moved}: {e}",
+                )
+        return ApplyEvent(
+            OpKind.UPDATE, ObjectKind.ROLE, moved, fields=("position",),
+            duration=time.perf_counter() - started, api_calls=usage.calls,
+        )
+
+    async def _apply_roles(self, guild, role_configs, known):
+        """
+        Apply the template's roles, yielding an event per role and one for their order.
+
+        Fills ``known`` with the template roles by name, so permissions can
+        name roles created here before their gateway events arrive.
+        """
+        for role_config in role_configs:
+            role, event = await self._apply_role(guild, role_config)
+            if role is not None:
+                known[role_config["name"]] = role
+            yield self._log_event(event)
+        yield self._log_event(await self._apply_role_order(guild, list(known.values())))
+
+    async def _journaled_category(
+        self, guild, journal, category_name, category_index, overwrites=None, existing=None
+    ):
+        """Apply a category unless an interrupted run of this apply already did."""
+        if journal is None:
+            return await self._apply_category(guild, category_name, category_index, overwrites, existing)
+        key = category_key(category_name)
+        category = journal.resolve(guild, key)
+        if isinstance(category, discord.CategoryChannel):
+            return category, ApplyEvent(
+                OpKind.SKIP, ObjectKind.CATEGORY, category_name,
+                object_id=category.id, detail="Resumed from journal",
             )
-        temp_dir = tempfile.mkdtemp(prefix="gitcord-template-")
-        zip_path = os.path.join(temp_dir, "repo.zip")
-        with open(zip_path, "wb") as f:
-            for chunk in resp.iter_content(chunk_size=8192):
-                f.write(chunk)
-        # Extract zip
-        with zipfile.ZipFile(zip_path, "r") as zip_ref:
-            zip_ref.extractall(temp_dir)
-        os.remove(zip_path)
-        # Find the extracted folder
-        extracted_root = None
-        for name in os.listdir(temp_dir):
-            if name.startswith(f"{repo}-"):
-                extracted_root = os.path.join(temp_dir, name)
-                break
-        if not extracted_root:
-            raise ValueError("Could not find extracted repo root.")
-        # If a subfolder is specified, use it
-        if folder:
-            folder_path = os.path.join(extracted_root, folder)
-            if not os.path.isdir(folder_path):
-                raise ValueError(f"Subfolder '{folder}' not found in repo.")
-            return folder_path
-        return extracted_root
-
-    async def _apply_template_from_dir(
-        self, guild, template_dir, ctx=None, interaction=None
+        # Only operations that change something are journaled
+        category, event = await self._apply_category(
+            guild, category_name, category_index, overwrites, existing,
+            functools.partial(journal.begin, key),
+        )
+        await journal.complete(key, event)
+        return category, event
+
+    async def _journaled_channel(
+        self, guild, journal, category, channel_config, channel_slot, overwrites=None, existing=None
     ):
-        """Apply template from directory - now looks for monolithic template.yaml first, falls back to legacy format."""
+        """Apply a channel unless an interrupted run of this apply already did."""
+        if journal is None:
+            return await self._apply_channel(guild, category, channel_config, channel_slot, overwrites, existing)
+        key = channel_key(category.name, channel_config["name"])
+        channel = journal.resolve(guild, key)
+        if channel is not None and channel.category_id == category.id:
+            return ApplyEvent(
+                OpKind.SKIP, ObjectKind.CHANNEL, channel_config["name"],
+                category=category.name, object_id=channel.id, detail="Resumed from journal",
+            )
+        event = await self._apply_channel(
+            guild, category, channel_config, channel_slot, overwrites, existing,
+            functools.partial(journal.begin, key),
+        )
+        await journal.complete(key, event)
+        return event
+
+    def _missing_role_events(self, guild, permission_specs, warned, known=None):
+        """Warn once per apply about each role template permissions name but the guild lacks."""
+        events = []
+        for name in sorted(missing_roles(guild, permission_specs, known) - warned):
+            warned.add(name)
+            events.append(self._log_event(ApplyEvent(
+                OpKind.WARNING, ObjectKind.TEMPLATE, name,
+                detail=f"Role {name} used in template permissions does not exist, skipping its overwrites",
+            )))
+        return events
+
+    def _extra_channel_events(self, category, template_channel_names, applied_ids):
+        """Report channels in a category that are not in the template."""
+        return [
+            self._log_event(ApplyEvent(
+                OpKind.EXTRA, ObjectKind.CHANNEL, ch.name,
+                category=category.name, object_id=ch.id,
+            ))
+            for ch in category.channels
+            # The cache may still hold the old name of a channel renamed by ID
+            if ch.name not in template_channel_names and ch.id not in applied_ids
+        ]
+
+    def _extra_role_events(self, guild, template_role_names):
+        """Report roles that are not in the template, leaving out bot and integration roles."""
+        return [
+            self._log_event(ApplyEvent(
+                OpKind.EXTRA, ObjectKind.ROLE, role.name, object_id=role.id
+            ))
+            for role in reversed(guild.roles)
+            if not role.is_default() and not role.managed and role.name not in template_role_names
+        ]
+
+    def _extra_guild_events(self, guild, template_category_names, applied_ids):
+        """Report categories and uncategorized channels that are not in the template."""
+        events = [
+            self._log_event(ApplyEvent(
+                OpKind.EXTRA, ObjectKind.CATEGORY, cat.name, object_id=cat.id
+            ))
+            for cat in guild.categories
+            if cat.name not in template_category_names and cat.id not in applied_ids
+        ]
+        # Templates don't support uncategorized channels, so all orphans are extra
+        events.extend(
+            self._log_event(ApplyEvent(
+                OpKind.EXTRA, ObjectKind.CHANNEL, ch.name, object_id=ch.id
+            ))
+            for ch in guild.channels
+            if getattr(ch, "category", None) is None
+            and not isinstance(ch, discord.CategoryChannel)
+            and ch.id not in applied_ids
+        )
+        return events
+
+    async def _apply_template_files(self, guild, files, journal=None, object_ids=None):
+        """
+        Apply template files - a monolithic template.yaml if present, otherwise the legacy format.
+
+        This is an async generator: it yields a PLAN event with the number of
+        operations first, then one ApplyEvent per operation as it completes.
+        With a journal, operations finished by an interrupted run are skipped.
+
+        ``object_ids`` maps template IDs to the Discord objects they were last
+        applied to. Categories and channels with an ``id`` are matched through
+        it before falling back to their name, and it is updated in place.
+        """
+        if object_ids is None:
+            object_ids = {}
         # Try monolithic template format first
-        template_path = os.path.join(template_dir, "template.yaml")
-        if os.path.exists(template_path):
-            return await self._apply_monolithic_template(guild, template_path, ctx, interaction)
+        if "template.yaml" in files:
+            async for event in self._apply_monolithic_template(
+                guild, files["template.yaml"], journal, object_ids
+            ):
+                yield event
+            return
         
         # Fall back to legacy directory-based format
-        result_msgs = []
         template_category_names = set()
-        template_channel_names = set()
-        template_category_channel_pairs = set()
-        # If you ever support uncategorized channels in the template, collect them here
-        template_uncategorized_channel_names = set()
-        
-        # First, collect all categories to determine their order
-        category_paths = []
-        for root, dirs, files in os.walk(template_dir):
-            if "category.yaml" in files:
-                category_paths.append(root)
+        applied_ids = set()
+        applied_categories = []
         
         # Sort to ensure consistent ordering (alphabetical by directory name)
-        category_paths.sort()
+        category_roots = sorted(
+            posixpath.dirname(path) for path in files
+            if posixpath.basename(path) == "category.yaml"
+        )
         
-        for category_index, root in enumerate(category_paths):
-            cat_path = os.path.join(root, "category.yaml")
-            self.logger.info(
-                f"[apply_template_from_dir] Found category.yaml: {cat_path}"
-            )
-            with open(cat_path, "r", encoding="utf-8") as f:
-                cat_yaml = f.read()
+        categories = []
+        # Stable IDs must be unique across all the template's files
+        template_ids = set()
+        for category_index, root in enumerate(category_roots):
+            cat_path = posixpath.join(root, "category.yaml")
+            self.logger.info("[apply_template_files] Found category.yaml: %s", cat_path)
             try:
-                category_config = parse_category_config_from_str(cat_yaml)
+                category_config = parse_category_config_from_str(files[cat_path], template_ids)
+                categories.append((category_index, root, category_config))
             except Exception as e:
-                msg = f"❌ Failed to parse {cat_path}: {e}"
-                self.logger.error(f"[apply_template_from_dir] {msg}")
-                result_msgs.append(msg)
-                continue
+                yield self._log_event(ApplyEvent(
+                    OpKind.ERROR, ObjectKind.TEMPLATE,
+                    detail=f"Failed to parse {cat_path}: {e}",
+                ))
+        
+        if not category_roots:
+            yield self._log_event(ApplyEvent(
+                OpKind.WARNING, ObjectKind.TEMPLATE, detail="No categories found in template."
+            ))
+            return
+        
+        planned = sum(1 + len(category_config["channels"]) for _, _, category_config in categories)
+        yield self._log_event(ApplyEvent(
+            OpKind.PLAN, ObjectKind.TEMPLATE, planned=planned,
+            detail=f"Planned {planned} operations",
+        ))
+        warned_roles = set()
+        permission_specs = [category_config.get("permissions") for _, _, category_config in categories]
+        for event in self._missing_role_events(guild, permission_specs, warned_roles):
+            yield event
+        
+        for category_index, root, category_config in categories:
             category_name = category_config["name"]
+            category_permissions = category_config.get("permissions")
             template_category_names.add(category_name)
-            for ch_name in category_config["channels"]:
-                template_channel_names.add(ch_name)
-                template_category_channel_pairs.add((category_name, ch_name))
             # Create or update the category
-            existing_category = discord.utils.get(
-                guild.categories, name=category_name
+            category, event = await self._journaled_category(
+                guild, journal, category_name, category_index,
+                resolve_overwrites(guild, category_permissions),
+                _mapped_object(guild, object_ids, category_config, category=True),
             )
-            if existing_category:
-                category = existing_category
-                msg = f"ℹ️ Category '{category_name}' already exists. Will update channels."
-                
-                # Check if category is in correct relative order (smart positioning)
-                guild_categories = sorted(guild.categories, key=lambda cat: cat.position)
-                current_relative_index = guild_categories.index(category)
-                
-                if current_relative_index != category_index:
-                    try:
-                        await category.edit(position=category_index)
-                        msg += f" Moved to position {category_index}."
-                    except (discord.Forbidden, discord.HTTPException) as e:
-                        self.logger.warning(f"Failed to update category position: {e}")
-            else:
-                category = await guild.create_category(
-                    name=category_name, 
-                    position=category_index
-                )
-                msg = f"✅ Created category: {category_name} at position {category_index}"
-            self.logger.info(f"[apply_template_from_dir] {msg}")
-            result_msgs.append(msg)
+            _remember(object_ids, applied_ids, category_config, event)
+            yield self._log_event(event)
             # Create/update channels
-            created, updated, skipped = 0, 0, 0
-            for channel_index, ch_name in enumerate(category_config["channels"]):
-                ch_path = os.path.join(root, f"{ch_name}.yaml")
-                if not os.path.exists(ch_path):
-                    msg = f"⚠️ Channel YAML not found: {ch_path}"
-                    self.logger.warning(f"[apply_template_from_dir] {msg}")
-                    result_msgs.append(msg)
-                    skipped += 1
+            template_channel_names = set()
+            slots = {}
+            for ch_name in category_config["channels"]:
+                ch_path = posixpath.join(root, f"{ch_name}.yaml")
+                if ch_path not in files:
+                    yield self._log_event(ApplyEvent(
+                        OpKind.WARNING, ObjectKind.CHANNEL, ch_name, category=category_name,
+                        detail=f"Channel YAML not found: {ch_path}",
+                    ))
                     continue
-                with open(ch_path, "r", encoding="utf-8") as f:
-                    ch_yaml = f.read()
                 try:
-                    channel_config = parse_channel_config_from_str(ch_yaml)
+                    channel_config = parse_channel_config_from_str(files[ch_path], template_ids)
                 except Exception as e:
-                    msg = f"❌ Failed to parse {ch_path}: {e}"
-                    self.logger.error(f"[apply_template_from_dir] {msg}")
-                    result_msgs.append(msg)
-                    skipped += 1
+                    yield self._log_event(ApplyEvent(
+                        OpKind.ERROR, ObjectKind.CHANNEL, ch_name, category=category_name,
+                        detail=f"Failed to parse {ch_path}: {e}",
+                    ))
                     continue
-                # Check if channel exists
-                existing_channel = discord.utils.get(
-                    category.channels, name=channel_config["name"]
+                template_channel_names.add(channel_config["name"])
+                for event in self._missing_role_events(guild, [channel_config.get("permissions")], warned_roles):
+                    yield event
+                overwrites = resolve_overwrites(
+                    guild, merge_permissions(category_permissions, channel_config.get("permissions"))
                 )
-                channel_type = channel_config["type"].lower()
-                if existing_channel:
-                    # Update topic/nsfw and position if needed
-                    update_kwargs = {}
-                    if (
-                        channel_type == "text"
-                        and hasattr(existing_channel, "topic")
-                        and existing_channel.topic
-                        != channel_config.get("topic", "")
-                    ):
-                        update_kwargs["topic"] = channel_config.get("topic", "")
-                    if (
-                        channel_type in ("text", "voice")
-                        and hasattr(existing_channel, "nsfw")
-                        and existing_channel.nsfw
-                        != channel_config.get("nsfw", False)
-                    ):
-                        update_kwargs["nsfw"] = channel_config.get("nsfw", False)
-                    
-                    # Check if channel is in correct relative order (smart positioning)
-                    if hasattr(existing_channel, "position"):
-                        # Get all channels in category sorted by position
-                        category_channels = sorted(category.channels, key=lambda ch: ch.position)
-                        current_relative_index = category_channels.index(existing_channel)
-                        
-                        # Only move if the channel is not at the correct relative position
-                        if current_relative_index != channel_index:
-                            update_kwargs["position"] = channel_index
-                    
-                    if update_kwargs:
-                        await existing_channel.edit(**update_kwargs)
-                        updated += 1
-                        position_msg = f" (position {channel_index})" if "position" in update_kwargs else ""
-                        msg = f"🔄 Updated channel: {existing_channel.name} in {category_name}{position_msg}"
-                    else:
-                        skipped += 1
-                        msg = f"⏭️ Skipped channel (no changes): {existing_channel.name} in {category_name}"
-                    self.logger.info(f"[apply_template_from_dir] {msg}")
-                    result_msgs.append(msg)
-                else:
-                    # Create new channel with proper position
-                    channel_kwargs = {
-                        "name": channel_config["name"],
-                        "category": category,
-                        "position": channel_index,
-                    }
-                    if channel_type == "text":
-                        if "topic" in channel_config:
-                            channel_kwargs["topic"] = channel_config["topic"]
-                        if "nsfw" in channel_config:
-                            channel_kwargs["nsfw"] = channel_config["nsfw"]
-                        await guild.create_text_channel(**channel_kwargs)
-                    elif channel_type == "voice":
-                        # Voice channels don't support topic
-                        if "topic" in channel_kwargs:
-                            del channel_kwargs["topic"]
-                        if "nsfw" in channel_config:
-                            channel_kwargs["nsfw"] = channel_config["nsfw"]
-                        await guild.create_voice_channel(**channel_kwargs)
-                    else:
-                        msg = f"❌ Unknown channel type: {channel_type} for {channel_config['name']}"
-                        self.logger.error(f"[apply_template_from_dir] {msg}")
-                        result_msgs.append(msg)
-                        skipped += 1
-                        continue
-                    created += 1
-                    msg = f"✅ Created channel: {channel_config['name']} in {category_name} at position {channel_index}"
-                    self.logger.info(f"[apply_template_from_dir] {msg}")
-                    result_msgs.append(msg)
-            
-            # Check for extra channels in this category
-            extra_channels = [
-                ch for ch in category.channels if ch.name not in template_channel_names
-            ]
-            if extra_channels:
-                msg = f"⚠️ Extra channels not in template for category '{category_name}': {', '.join(ch.name for ch in extra_channels)}"
-                self.logger.warning(f"[apply_template_from_dir] {msg}")
-                result_msgs.append(msg)
-                view = DeleteExtraObjectsView(extra_channels, object_type_label="channel")
-                if interaction:
-                    await interaction.followup.send(msg, view=view)
-                elif ctx:
-                    await ctx.send(msg, view=view)
-            
-            summary = f"**{category_name}**: {created} created, {updated} updated, {skipped} skipped"
-            result_msgs.append(summary)
-        
-        # Check for extra categories
-        extra_categories = [
-            cat for cat in guild.categories if cat.name not in template_category_names
-        ]
-        if extra_categories:
-            msg = f"⚠️ Extra categories not in template: {', '.join(cat.name for cat in extra_categories)}"
-            self.logger.warning(f"[apply_template_from_dir] {msg}")
-            result_msgs.append(msg)
-            view = DeleteExtraObjectsView(extra_categories, object_type_label="category")
-            if interaction:
-                await interaction.followup.send(msg, view=view)
-            elif ctx:
-                await ctx.send(msg, view=view)
+                event = await self._journaled_channel(
+                    guild, journal, category, channel_config, _next_slot(slots, channel_config), overwrites,
+                    _mapped_object(guild, object_ids, channel_config, category=False),
+                )
+                _remember(object_ids, applied_ids, channel_config, event)
+                yield self._log_event(event)
+            applied_categories.append((category, template_channel_names))
         
-        # Check for orphan channels
-        orphan_channels = []
-        for ch in guild.channels:
-            if getattr(ch, "category", None) is None and isinstance(
-                ch, (discord.TextChannel, discord.VoiceChannel)
-            ):
-                # If template does not support uncategorized channels, all orphans are extra
-                # If template_uncategorized_channel_names is empty, all orphans are extra
-                if (
-                    not template_uncategorized_channel_names
-                    or ch.name not in template_uncategorized_channel_names
-                ):
-                    orphan_channels.append(ch)
-        if orphan_channels:
-            msg = f"⚠️ Uncategorized channels not in template: {', '.join(ch.name for ch in orphan_channels)}"
-            self.logger.warning(f"[apply_template_from_dir] {msg}")
-            result_msgs.append(msg)
-            view = DeleteExtraObjectsView(orphan_channels, object_type_label="channel")
-            if interaction:
-                await interaction.followup.send(msg, view=view)
-            elif ctx:
-                await ctx.send(msg, view=view)
-        if not result_msgs:
-            msg = "⚠️ No categories found in template."
-            self.logger.warning(f"[apply_template_from_dir] {msg}")
-            result_msgs.append(msg)
-        return result_msgs
-
-    async def _apply_monolithic_template(self, guild, template_path, ctx=None, interaction=None):
-        """Apply a monolithic template.yaml file to the guild."""
-        from ..utils.helpers import parse_monolithic_template
+        # Check for extra channels once channels moved between categories by ID have moved
+        for category, template_channel_names in applied_categories:
+            for event in self._extra_channel_events(category, template_channel_names, applied_ids):
+                yield event
         
-        result_msgs = []
+        # Check for extra categories and orphan channels
+        for event in self._extra_guild_events(guild, template_category_names, applied_ids):
+            yield event
+
+    async def _apply_monolithic_template(self, guild, template_yaml, journal=None, object_ids=None):
+        """Apply the contents of a monolithic template.yaml to the guild, yielding ApplyEvents."""
+        if object_ids is None:
+            object_ids = {}
         template_category_names = set()
+        applied_ids = set()
+        applied_categories = []
         
         try:
-            template_config = parse_monolithic_template(template_path)
+            template_config = parse_monolithic_template_from_str(template_yaml)
         except Exception as e:
-            msg = f"❌ Failed to parse template: {e}"
-            self.logger.error(f"[apply_monolithic_template] {msg}")
-            result_msgs.append(msg)
-            return result_msgs
+            yield self._log_event(ApplyEvent(
+                OpKind.ERROR, ObjectKind.TEMPLATE, detail=f"Failed to parse template: {e}"
+            ))
+            return
         
         # Log template info if available
-        if "server" in template_config:
-            server_info = template_config["server"]
-            if "name" in server_info:
-                msg = f"📋 Applying template: {server_info['name']}"
-                if "version" in server_info:
-                    msg += f" v{server_info['version']}"
-                self.logger.info(f"[apply_monolithic_template] {msg}")
-                result_msgs.append(msg)
+        server_info = template_config.get("server") or {}
+        if "name" in server_info:
+            detail = f"Applying template: {server_info['name']}"
+            if "version" in server_info:
+                detail += f" v{server_info['version']}"
+            yield self._log_event(ApplyEvent(
+                OpKind.INFO, ObjectKind.TEMPLATE, server_info["name"], detail=detail
+            ))
+        
+        role_configs = template_config.get("roles") or []
+        planned = sum(
+            1 + len(category.get("channels", [])) for category in template_config["categories"]
+        )
+        if role_configs:
+            # One operation per role plus the bulk position update
+            planned += len(role_configs) + 1
+        yield self._log_event(ApplyEvent(
+            OpKind.PLAN, ObjectKind.TEMPLATE, planned=planned,
+            detail=f"Planned {planned} operations",
+        ))
+
+        # Roles first, so channel permissions can name roles the template creates
+        known_roles = {}
+        if role_configs:
+            async for event in self._apply_roles(guild, role_configs, known_roles):
+                yield event
+
+        permission_specs = [
+            spec
+            for category in template_config["categories"]
+            for spec in [category.get("permissions")]
+            + [channel.get("permissions") for channel in category.get("channels", [])]
+        ]
+        for event in self._missing_role_events(guild, permission_specs, set(), known_roles):
+            yield event
         
         # Process each category
         for category_index, category_config in enumerate(template_config["categories"]):
             category_name = category_config["name"]
+            category_permissions = category_config.get("permissions")
             template_category_names.add(category_name)
             
             # Create or update the category
-            existing_category = discord.utils.get(guild.categories, name=category_name)
-            if existing_category:
-                category = existing_category
-                msg = f"ℹ️ Category '{category_name}' already exists. Will update channels."
-                
-                # Check if category is in correct relative order
-                desired_yaml_index = category_index
-                guild_categories = sorted(guild.categories, key=lambda cat: cat.position)
-                current_relative_index = guild_categories.index(category)
-                
-                if current_relative_index != desired_yaml_index:
-                    try:
-                        await category.edit(position=desired_yaml_index)
-                        msg += f" Moved to position {desired_yaml_index}."
-                    except (discord.Forbidden, discord.HTTPException) as e:
-                        self.logger.warning(f"Failed to update category position: {e}")
-            else:
-                category = await guild.create_category(
-                    name=category_name, 
-                    position=category_index
-                )
-                msg = f"✅ Created category: {category_name} at position {category_index}"
-            
-            self.logger.info(f"[apply_monolithic_template] {msg}")
-            result_msgs.append(msg)
+            category, event = await self._journaled_category(
+                guild, journal, category_name, category_index,
+                resolve_overwrites(guild, category_permissions, known_roles),
+                _mapped_object(guild, object_ids, category_config, category=True),
+            )
+            _remember(object_ids, applied_ids, category_config, event)
+            yield self._log_event(event)
             
             # Process channels in this category
-            created, updated, skipped = 0, 0, 0
             template_channel_names = set()
-            
-            channels = category_config.get("channels", [])
-            for channel_index, channel_config in enumerate(channels):
-                channel_name = channel_config["name"]
-                template_channel_names.add(channel_name)
-                
-                # Check if channel exists
-                existing_channel = discord.utils.get(category.channels, name=channel_name)
-                channel_type = channel_config["type"].lower()
-                
-                if existing_channel:
-                    # Update topic/nsfw and position if needed
-                    update_kwargs = {}
-                    if (
-                        channel_type == "text"
-                        and hasattr(existing_channel, "topic")
-                        and existing_channel.topic != channel_config.get("topic", "")
-                    ):
-                        update_kwargs["topic"] = channel_config.get("topic", "")
-                    if (
-                        channel_type in ("text", "voice")
-                        and hasattr(existing_channel, "nsfw")
-                        and existing_channel.nsfw != channel_config.get("nsfw", False)
-                    ):
-                        update_kwargs["nsfw"] = channel_config.get("nsfw", False)
-                    
-                    # Check if channel is in correct relative order (smart positioning)
-                    desired_yaml_index = channel_index
-                    if hasattr(existing_channel, "position"):
-                        # Get all channels in category sorted by position
-                        category_channels = sorted(category.channels, key=lambda ch: ch.position)
-                        current_relative_index = category_channels.index(existing_channel)
-                        
-                        # Only move if the channel is not at the correct relative position
-                        if current_relative_index != desired_yaml_index:
-                            update_kwargs["position"] = desired_yaml_index
-                    
-                    if update_kwargs:
-                        await existing_channel.edit(**update_kwargs)
-                        updated += 1
-                        position_msg = f" (position {desired_yaml_index})" if "position" in update_kwargs else ""
-                        msg = f"🔄 Updated channel: {existing_channel.name} in {category_name}{position_msg}"
-                    else:
-                        skipped += 1
-                        msg = f"⏭️ Skipped channel (no changes): {existing_channel.name} in {category_name}"
-                    
-                    self.logger.info(f"[apply_monolithic_template] {msg}")
-                    result_msgs.append(msg)
-                else:
-                    # Create new channel with proper position
-                    channel_kwargs = {
-                        "name": channel_config["name"],
-                        "category": category,
-                        "position": channel_index,
-                    }
-                    
-                    if channel_type == "text":
-                        if "topic" in channel_config:
-                            channel_kwargs["topic"] = channel_config["topic"]
-                        if "nsfw" in channel_config:
-                            channel_kwargs["nsfw"] = channel_config["nsfw"]
-                        await guild.create_text_channel(**channel_kwargs)
-                    elif channel_type == "voice":
-                        # Voice channels don't support topic, so remove it if present
-                        if "topic" in channel_kwargs:
-                            del channel_kwargs["topic"]
-                        if "nsfw" in channel_config:
-                            channel_kwargs["nsfw"] = channel_config["nsfw"]
-                        await guild.create_voice_channel(**channel_kwargs)
-                    else:
-                        msg = f"❌ Unknown channel type: {channel_type} for {channel_config['name']}"
-                        self.logger.error(f"[apply_monolithic_template] {msg}")
-                        result_msgs.append(msg)
-                        skipped += 1
-                        continue
-                    
-                    created += 1
-                    msg = f"✅ Created channel: {channel_config['name']} in {category_name} at position {channel_index}"
-                    self.logger.info(f"[apply_monolithic_template] {msg}")
-                    result_msgs.append(msg)
-            
-            # Check for extra channels in this category
-            extra_channels = [
-                ch for ch in category.channels if ch.name not in template_channel_names
-            ]
-            if extra_channels:
-                msg = f"⚠️ Extra channels not in template for category '{category_name}': {', '.join(ch.name for ch in extra_channels)}"
-                self.logger.warning(f"[apply_monolithic_template] {msg}")
-                result_msgs.append(msg)
-                view = DeleteExtraObjectsView(extra_channels, object_type_label="channel")
-                if interaction:
-                    await interaction.followup.send(msg, view=view)
-                elif ctx:
-                    await ctx.send(msg, view=view)
-            
-            summary = f"**{category_name}**: {created} created, {updated} updated, {skipped} skipped"
-            result_msgs.append(summary)
-        
-        # Check for extra categories
-        extra_categories = [
-            cat for cat in guild.categories if cat.name not in template_category_names
-        ]
-        if extra_categories:
-            msg = f"⚠️ Extra categories not in template: {', '.join(cat.name for cat in extra_categories)}"
-            self.logger.warning(f"[apply_monolithic_template] {msg}")
-            result_msgs.append(msg)
-            view = DeleteExtraObjectsView(extra_categories, object_type_label="category")
-            if interaction:
-                await interaction.followup.send(msg, view=view)
-            elif ctx:
-                await ctx.send(msg, view=view)
-        
-        # Check for orphan channels
-        orphan_channels = []
-        for ch in guild.channels:
-            if getattr(ch, "category", None) is None and isinstance(
-                ch, (discord.TextChannel, discord.VoiceChannel)
-            ):
-                orphan_channels.append(ch)
+            slots = {}
+            for channel_config in category_config.get("channels", []):
+                template_channel_names.add(channel_config["name"])
+                overwrites = resolve_overwrites(
+                    guild, merge_permissions(category_permissions, channel_config.get("permissions")),
+                    known_roles,
+                )
+                event = await self._journaled_channel(
+                    guild, journal, category, channel_config, _next_slot(slots, channel_config), overwrites,
+                    _mapped_object(guild, object_ids, channel_config, category=False),
+                )
+                _remember(object_ids, applied_ids, channel_config, event)
+                yield self._log_event(event)
+            applied_categories.append((category, template_channel_names))
         
-        if orphan_channels:
-            msg = f"⚠️ Uncategorized channels not in template: {', '.join(ch.name for ch in orphan_channels)}"
-            self.logger.warning(f"[apply_monolithic_template] {msg}")
-            result_msgs.append(msg)
-            view = DeleteExtraObjectsView(orphan_channels, object_type_label="channel")
-            if interaction:
-                await interaction.followup.send(msg, view=view)
-            elif ctx:
-                await ctx.send(msg, view=view)
+        # Check for extra channels once channels moved between categories by ID have moved
+        for category, template_channel_names in applied_categories:
+            for event in self._extra_channel_events(category, template_channel_names, applied_ids):
+                yield event
         
-        return result_msgs
+        # Check for extra categories and orphan channels
+        for event in self._extra_guild_events(guild, template_category_names, applied_ids):
+            yield event
+        if role_configs:
+            for event in self._extra_role_events(guild, {role["name"] for role in role_configs}):
+                yield event
+
+
+def _mapped_object(guild, object_ids: dict, object_config: dict, category: bool):
+    """The category or channel a template ID was last applied to, if it still exists."""
+    key = template_id(object_config)
+    obj = guild.get_channel(object_ids[key]) if key in object_ids else None
+    if obj is None or isinstance(obj, discord.CategoryChannel) != category:
+        return None
+    return obj
+
+
+def _remember(object_ids: dict, applied_ids: set, object_config: dict, event: ApplyEvent) -> None:
+    """Record the object a template category or channel was applied to."""
+    if event.object_id is None or event.is_problem:
+        return
+    applied_ids.add(event.object_id)
+    key = template_id(object_config)
+    if key is not None:
+        object_ids[key] = event.object_id
+
+
+def _sorts_with(channel, channel_type: str) -> bool:
+    """Whether Discord orders ``channel`` together with channels of ``channel_type``."""
+    voice_like = channel_type in ("voice", "stage")
+    return isinstance(channel, (discord.VoiceChannel, discord.StageChannel)) == voice_like
+
+
+def _next_slot(slots: dict, channel_config: dict) -> int:
+    """Claim the next slot for a template channel among those sorted with it."""
+    group = "voice" if channel_config["type"].lower() in ("voice", "stage") else "text"
+    slot = slots.get(group, 0)
+    slots[group] = slot + 1
+    return slot
 
 
 async def setup(bot: commands.Bot) -> None:
@@ -3,6 +3,7 @@ Base cog class with common functionality.
 """
 
 import logging
+import time
 
 import discord
 from discord.ext import commands
@@ -13,6 +14,7 @@ from ..utils.helpers import (
     handle_command_error,
     handle_interaction_error,
 )
+from ..utils.metrics import COMMAND_DURATION, api_operation
 
 
 class BaseCog(commands.Cog):
@@ -22,6 +24,24 @@ class BaseCog(commands.Cog):
         self.bot = bot
         self.logger = logging.getLogger(f"gitcord.{self.__class__.__name__.lower()}")
 
+    async def cog_before_invoke(self, ctx: commands.Context) -> None:
+        """Remember when the command started and tag its REST calls."""
+        ctx.invoked_at = time.perf_counter()
+        ctx.api_operation_token = api_operation.set(f"command:{ctx.command.qualified_name}")
+
+    async def cog_after_invoke(self, ctx: commands.Context) -> None:
+        """Record command latency; runs whether or not the command failed."""
+        token = getattr(ctx, "api_operation_token", None)
+        if token is not None:
+            api_operation.reset(token)
+        started = getattr(ctx, "invoked_at", None)
+        if started is not None and ctx.command:
+            COMMAND_DURATION.observe(
+                time.perf_counter() - started,
+                ctx.command.qualified_name,
+                "error" if ctx.command_failed else "ok",
+            )
+
     async def cog_command_error(self, ctx: commands.Context, error: Exception) -> None:
         """Handle errors for all commands in this cog."""
         if isinstance(error, commands.CommandError):
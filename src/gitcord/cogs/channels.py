@@ -20,11 +20,10 @@ from ..utils.helpers import (
     create_channel_kwargs,
     create_channel_by_type,
     check_channel_exists,
-    get_template_path,
 )
 from ..utils import template_metadata
 from ..constants.paths import get_template_repo_dir
-from ..views import DeleteExtraChannelsView
+from ..views import DeleteExtraChannelsView, add_object_list_fields
 
 
 @dataclass
@@ -49,19 +48,19 @@ class Channels(BaseCog):
 
     def _get_template_path(self, guild_id: int, file_name: str = None, folder: str = None) -> Optional[str]:
         """Get the template path for a guild, now looking for monolithic template.yaml first."""
-        
-        # Try the new monolithic template format first
-        template_path = get_template_path(guild_id)
-        if template_path:
-            return template_path
-        
-        # Fall back to legacy format if requested
         meta = template_metadata.load_metadata(guild_id)
         if not meta or not os.path.exists(meta.get("local_path", "")):
             return None
         
         base_path = meta["local_path"]
         
+        # Try the new monolithic template format first
+        template_path = os.path.join(base_path, "template.yaml")
+        if os.path.exists(template_path):
+            return template_path
+        
+        # Fall back to legacy format if requested
+        
         if folder:
             base_path = os.path.join(base_path, folder)
             if not os.path.isdir(base_path):
@@ -122,7 +121,7 @@ class Channels(BaseCog):
                 ctx,
                 "❌ Invalid Channel Type",
                 f"Channel type '{channel_config['type']}' is not supported. "
-                "Use 'text' or 'voice'.",
+                "Use 'text', 'announcement', 'voice', 'stage' or 'forum'.",
             )
             return
 
@@ -438,14 +437,10 @@ class Channels(BaseCog):
         self._add_channel_list_field(embed, result.updated_channels, "Updated")
 
         if result.extra_channels:
-            channel_list = "\n".join(
-                [
-                    f"• {channel.mention} (not in YAML)"
-                    for channel in result.extra_channels
-                ]
-            )
-            embed.add_field(
-                name="Extra Channels (Not in YAML)", value=channel_list, inline=False
+            add_object_list_fields(
+                embed,
+                "Extra Channels (Not in YAML)",
+                [channel.id for channel in result.extra_channels],
             )
 
         return embed
@@ -509,7 +504,7 @@ class Channels(BaseCog):
                     value="Use the button below to delete extra channels if needed.",
                     inline=False,
                 )
-                view = DeleteExtraChannelsView(result.extra_channels, self.logger)
+                view = DeleteExtraChannelsView(result.category)
                 await ctx.send(embed=embed, view=view)
             else:
                 await ctx.send(embed=embed)
@@ -602,9 +597,7 @@ class Channels(BaseCog):
 
             # Add delete button if there are extra channels
             if result.extra_channels:
-                delete_view = DeleteExtraChannelsView(
-                    result.extra_channels, self.logger
-                )
+                delete_view = DeleteExtraChannelsView(result.category)
                 await interaction.followup.send(embed=embed, view=delete_view)
             else:
                 await interaction.followup.send(embed=embed)
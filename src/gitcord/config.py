@@ -4,19 +4,122 @@ Handles environment variables and bot settings.
 """
 
 import os
-from typing import Optional
-from dotenv import load_dotenv
+import threading
+from dataclasses import dataclass, fields, replace
+from typing import Dict, Mapping, Optional, Set
+from dotenv import dotenv_values, find_dotenv, load_dotenv
 
+PERF_ENV_PREFIX = "GITCORD_PERF_"
 
-class Config:
+
+@dataclass(frozen=True)
+class PerformanceConfig:
+    """
+    Throughput and latency tuning knobs.
+
+    Each field can be set in the file named by ``GITCORD_PERF_CONFIG`` (a YAML
+    or JSON mapping of field names) and overridden by a ``GITCORD_PERF_<FIELD>``
+    environment variable, e.g. ``GITCORD_PERF_GIT_TIMEOUT=120``.
+    """
+
+    # Template applies running at once across all guilds
+    apply_concurrency: int = 4
+    # Requests left in a rate limit bucket at which a caller waits for it to reset,
+    # keeping room for interactive commands during bulk applies (0 to disable)
+    ratelimit_headroom: int = 0
+    # Seconds before a git command is killed
+    git_timeout: float = 60.0
+    # Seconds allowed for a template archive download
+    http_timeout: float = 30.0
+    # Seconds during which a repeated fetch of a mirror reuses the last one
+    fetch_reuse_seconds: float = 10.0
+    # Template archives kept in memory in front of the on-disk cache
+    archive_cache_size: int = 32
+    # Seconds before buttons of confirmation views stop responding
+    view_timeout: float = 60.0
+    # Seconds the page buttons of an apply report keep working
+    report_view_timeout: float = 600.0
+    # Minimum seconds between edits of an apply progress message
+    progress_interval: float = 2.0
+
+    def __post_init__(self):
+        for f in fields(self):
+            value = getattr(self, f.name)
+            if value < 0 or (value == 0 and f.name != "ratelimit_headroom"):
+                raise ValueError(f"Performance setting {f.name} must be positive, got {value}")
+
+    @classmethod
+    def load(
+        cls, path: Optional[str] = None, environ: Optional[Mapping[str, str]] = None
+    ) -> "PerformanceConfig":
+        """
+        Build the settings from defaults, the settings file and the environment.
+
+        Raises:
+            ValueError: If a setting is unknown, malformed or out of range
+        """
+        environ = os.environ if environ is None else environ
+        path = path or environ.get("GITCORD_PERF_CONFIG")
+        values = {}
+        if path:
+            import yaml  # Only needed when a settings file is used
+
+            with open(path, "r", encoding="utf-8") as f:
+                data = yaml.safe_load(f) or {}
+            if not isinstance(data, dict):
+                raise ValueError(f"Performance settings file {path} must hold a mapping")
+            values.update(data)
+        for f in fields(cls):
+            env_value = environ.get(f"{PERF_ENV_PREFIX}{f.name.upper()}")
+            if env_value is not None:
+                values[f.name] = env_value
+
+        types = {f.name: f.type for f in fields(cls)}
+        unknown = sorted(set(values) - set(types))
+        if unknown:
+            raise ValueError(f"Unknown performance setting(s): {', '.join(unknown)}")
+        converted = {}
+        for name, value in values.items():
+            try:
+                converted[name] = _convert_setting(types[name], value)
+            except (TypeError, ValueError) as e:
+                raise ValueError(
+                    f"Performance setting {name} must be {types[name].__name__}, got {value!r}"
+                ) from e
+        return replace(cls(), **converted)
+
+
+def _convert_setting(setting_type: type, value):
+    """
+    ``value`` as ``setting_type``, without the truncation and coercion of the bare type.
+
+    Raises:
+        ValueError: If ``value`` is a bool, or not integral for an int setting
+    """
+    if isinstance(value, bool):
+        raise ValueError(f"{value!r} is a bool")
+    converted = setting_type(value)
+    if setting_type is int and isinstance(value, float) and value != converted:
+        raise ValueError(f"{value!r} is not integral")
+    return converted
+
+
+class Config:  # pylint: disable=too-many-instance-attributes
     """Configuration class for GitCord bot settings."""
 
     def __init__(self):
         """Initialize configuration by loading environment variables."""
-        load_dotenv()
+        # Performance variables set outside .env win over it, on reloads too
+        self._process_perf_keys: Set[str] = set()
+        self._dotenv_perf: Dict[str, str] = {}
+        self._dotenv_path = find_dotenv()
+        self._reload_dotenv_performance()
+        load_dotenv(self._dotenv_path or None)
         self._token: Optional[str] = None
         self._prefix: str = "!"
         self._activity_name: str = "!hello"
+        self._performance: Optional[PerformanceConfig] = None
+        self._performance_lock = threading.Lock()
 
     @property
     def token(self) -> str:
@@ -27,6 +130,52 @@ class Config:
                 raise ValueError("DISCORD_TOKEN not found in environment variables!")
         return self._token
 
+    @property
+    def performance(self) -> PerformanceConfig:
+        """Get performance settings, loading them on first use."""
+        if self._performance is None:
+            with self._performance_lock:
+                if self._performance is None:
+                    self._performance = PerformanceConfig.load()
+        return self._performance
+
+    def _reload_dotenv_performance(self) -> None:
+        """Copy the ``GITCORD_PERF_*`` variables in ``.env`` to the environment."""
+        # Variables that .env did not set, or that changed since, were set by something else
+        self._process_perf_keys.update(
+            key for key, value in os.environ.items()
+            if key.startswith(PERF_ENV_PREFIX) and self._dotenv_perf.get(key) != value
+        )
+        values = dotenv_values(self._dotenv_path) if self._dotenv_path else {}
+        dotenv_perf = {
+            key: value for key, value in values.items()
+            if key.startswith(PERF_ENV_PREFIX)
+            and key not in self._process_perf_keys
+            and value is not None
+        }
+        for key in set(self._dotenv_perf) - set(dotenv_perf) - self._process_perf_keys:
+            os.environ.pop(key, None)
+        os.environ.update(dotenv_perf)
+        self._dotenv_perf = dotenv_perf
+
+    def reload_performance(self) -> PerformanceConfig:
+        """
+        Re-read performance settings from the settings file, ``.env`` and environment.
+
+        Code reads ``config.performance`` when it needs a value, so new settings
+        apply from the next operation without a restart. ``GITCORD_PERF_*``
+        variables set in the process environment rather than ``.env`` cannot
+        change until a restart. Invalid settings leave the current ones in place.
+
+        Raises:
+            ValueError: If the new settings are invalid
+        """
+        self._reload_dotenv_performance()
+        settings = PerformanceConfig.load()
+        with self._performance_lock:
+            self._performance = settings
+        return settings
+
     @property
     def prefix(self) -> str:
         """Get command prefix."""
@@ -2,11 +2,12 @@
 File path constants for GitCord bot.
 """
 
+import hashlib
 import os
 
-# GitCord data directory for storing per-guild template repositories and metadata
+# GitCord data directory for storing per-guild template repositories and metadata.
+# It is created on first write rather than on import.
 GITCORD_DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), ".gitcord_data")
-os.makedirs(GITCORD_DATA_DIR, exist_ok=True)
 
 def get_template_repo_dir(guild_id):
     """Get the template repository directory for a specific guild."""
@@ -15,3 +16,14 @@ def get_template_repo_dir(guild_id):
 def get_metadata_file(guild_id):
     """Get the metadata file path for a specific guild."""
     return os.path.join(GITCORD_DATA_DIR, f"template_source_{guild_id}.json")
+
+def get_mirror_dir(url):
+    """Get the shared bare mirror directory for a template repository URL."""
+    digest = hashlib.sha256(url.strip().encode("utf-8")).hexdigest()[:16]
+    return os.path.join(GITCORD_DATA_DIR, "mirrors", f"{digest}.git")
+
+
+def get_archive_cache_file(archive_url):
+    """Get the cache file for a downloaded template archive URL."""
+    digest = hashlib.sha256(archive_url.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(GITCORD_DATA_DIR, "archive_cache", f"{digest}.json")
@@ -7,6 +7,7 @@ import discord
 from discord.ext import commands
 
 from .utils.logger import main_logger as logger
+from .utils.metrics import tag_api_operation
 from .config import config
 
 
@@ -67,11 +68,13 @@ class EventHandler:  # pylint: disable=too-few-public-methods
             # Sync to all guilds the bot is in
             for guild in self.bot.guilds:
                 logger.info("Syncing commands to guild: %s", guild.name)
-                synced = await self.bot.tree.sync(guild=guild)
+                with tag_api_operation("command_sync"):
+                    synced = await self.bot.tree.sync(guild=guild)
                 logger.info("Synced %d command(s) to %s", len(synced), guild.name)
 
             # Also sync globally (takes up to 1 hour to propagate)
-            synced_global = await self.bot.tree.sync()
+            with tag_api_operation("command_sync"):
+                synced_global = await self.bot.tree.sync()
             logger.info("Synced %d command(s) globally", len(synced_global))
 
         except discord.DiscordException as e:
@@ -0,0 +1,103 @@
+"""
+Typed apply events for GitCord bot.
+Template applies emit these records; diffs, embeds and logs render from them.
+"""
+
+from dataclasses import dataclass
+from enum import Enum
+from typing import Optional, Tuple
+
+
+class OpKind(Enum):
+    """What happened to an object during an apply."""
+
+    PLAN = "plan"
+    CREATE = "create"
+    UPDATE = "update"
+    DELETE = "delete"
+    SKIP = "skip"
+    EXTRA = "extra"
+    INFO = "info"
+    WARNING = "warning"
+    ERROR = "error"
+
+
+class ObjectKind(Enum):
+    """The kind of object an apply event is about."""
+
+    TEMPLATE = "template"
+    CATEGORY = "category"
+    CHANNEL = "channel"
+    ROLE = "role"
+
+
+_DIFF_MARKERS = {OpKind.CREATE: "A", OpKind.UPDATE: "M", OpKind.DELETE: "D"}
+
+
+@dataclass(frozen=True)
+class ApplyEvent:  # pylint: disable=too-many-instance-attributes
+    """A single outcome of a template apply."""
+
+    op: OpKind
+    kind: ObjectKind
+    name: str = ""
+    category: Optional[str] = None
+    fields: Tuple[str, ...] = ()
+    position: Optional[int] = None
+    object_id: Optional[int] = None
+    duration: float = 0.0
+    api_calls: int = 0
+    planned: int = 0
+    detail: str = ""
+
+    @property
+    def is_change(self) -> bool:
+        """Whether the event changed something in Discord."""
+        return self.op in _DIFF_MARKERS
+
+    @property
+    def is_step(self) -> bool:
+        """Whether the event completes one of the planned operations."""
+        return self.kind is not ObjectKind.TEMPLATE and self.op not in (
+            OpKind.PLAN,
+            OpKind.EXTRA,
+        )
+
+    @property
+    def is_problem(self) -> bool:
+        """Whether the event should be surfaced as a template warning."""
+        return self.op in (OpKind.WARNING, OpKind.ERROR)
+
+    def __str__(self) -> str:
+        return render_message(self)
+
+
+def render_message(event: ApplyEvent) -> str:
+    """Render an event as a human readable log line."""
+    where = f" in {event.category}" if event.category else ""
+    kind = event.kind.value
+    if event.op is OpKind.CREATE:
+        at = f" at position {event.position}" if event.position is not None else ""
+        return f"✅ Created {kind}: {event.name}{where}{at}"
+    if event.op is OpKind.UPDATE:
+        return f"🔄 Updated {kind}: {event.name}{where} ({', '.join(event.fields)})"
+    if event.op is OpKind.DELETE:
+        return f"🗑️ Deleted {kind}: {event.name}{where}"
+    if event.op is OpKind.SKIP:
+        return f"⏭️ Skipped {kind} (no changes): {event.name}{where}"
+    if event.op is OpKind.EXTRA:
+        return f"⚠️ Extra {kind} not in template: {event.name}{where}"
+    if event.op in (OpKind.PLAN, OpKind.INFO):
+        return f"📋 {event.detail}"
+    if event.op is OpKind.WARNING:
+        return f"⚠️ {event.detail}"
+    return f"❌ {event.detail}"
+
+
+def render_diff_line(event: ApplyEvent) -> Optional[str]:
+    """Render a changing event as a git-style diff line, or None for other events."""
+    marker = _DIFF_MARKERS.get(event.op)
+    if not marker:
+        return None
+    fields = f" ({', '.join(event.fields)})" if event.fields else ""
+    return f"{marker}  {event.name}{fields}"
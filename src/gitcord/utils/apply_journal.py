@@ -0,0 +1,99 @@
+"""
+Crash-resumable journal for GitCord template applies.
+
+Every operation that changes something is recorded as ``started`` right
+before its create or edit and ``done`` (with the object it produced)
+afterwards; operations with nothing to change are not journaled, since
+repeating them costs no API calls. If the bot stops part way through, the
+next apply of the same template picks up the finished operations from the
+journal instead of repeating them.
+"""
+
+import asyncio
+from typing import Dict, Optional, Set, Tuple
+
+import discord
+
+from .apply_events import ApplyEvent
+from .state_store import JournalState, StateStore
+
+STARTED = "started"
+DONE = "done"
+
+
+def category_key(name: str) -> str:
+    """Journal key of a template category."""
+    return f"category:{name}"
+
+
+def channel_key(category: str, name: str) -> str:
+    """Journal key of a template channel."""
+    return f"channel:{category}/{name}"
+
+
+class ApplyJournal:
+    """Journal of the operations of one apply."""
+
+    def __init__(
+        self,
+        store: StateStore,
+        guild_id: int,
+        apply_id: str,
+        completed: Dict[str, Tuple[str, Optional[int]]],
+    ):
+        self.store = store
+        self.guild_id = guild_id
+        self.apply_id = apply_id
+        self.completed = completed
+        self._started: Set[str] = set()
+
+    @classmethod
+    async def open(
+        cls, store: StateStore, guild_id: int, apply_id: str, fingerprint: Optional[str]
+    ) -> "ApplyJournal":
+        """
+        Start journaling an apply, resuming an interrupted one if it can.
+
+        Finished operations are only carried over when the interrupted apply
+        was for the same template fingerprint.
+        """
+        previous = await asyncio.to_thread(store.load_journal, guild_id)
+        completed = {}
+        if previous and fingerprint and previous.fingerprint == fingerprint:
+            completed = {
+                key: entry for key, entry in previous.ops.items() if entry[0] == DONE
+            }
+        await asyncio.to_thread(
+            store.start_journal, guild_id, JournalState(apply_id, fingerprint, dict(completed))
+        )
+        return cls(store, guild_id, apply_id, completed)
+
+    @property
+    def resumed(self) -> int:
+        """Number of operations carried over from an interrupted apply."""
+        return len(self.completed)
+
+    def resolve(self, guild: discord.Guild, key: str) -> Optional[discord.abc.GuildChannel]:
+        """Get the object a carried-over operation produced, if it still exists."""
+        entry = self.completed.get(key)
+        if not entry or entry[1] is None:
+            return None
+        return guild.get_channel(entry[1])
+
+    async def begin(self, key: str) -> None:
+        """Record that an operation is about to change something."""
+        self._started.add(key)
+        await asyncio.to_thread(self.store.journal_op, self.guild_id, key, STARTED)
+
+    async def complete(self, key: str, event: ApplyEvent) -> None:
+        """Record that an operation finished with ``event``, if it was begun."""
+        if key not in self._started or event.is_problem:
+            # Leave failed operations as started so a resume retries them
+            return
+        await asyncio.to_thread(
+            self.store.journal_op, self.guild_id, key, DONE, event.object_id
+        )
+
+    async def finish(self) -> None:
+        """Drop the journal once the whole apply has run."""
+        await asyncio.to_thread(self.store.clear_journal, self.guild_id)
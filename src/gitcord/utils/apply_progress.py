@@ -0,0 +1,92 @@
+"""
+Live progress reporting for GitCord template applies.
+"""
+
+import time
+from typing import Optional
+
+import discord
+
+from ..config import config
+from .apply_events import ApplyEvent, OpKind
+from .helpers import create_embed, format_time_delta
+from .metrics import tag_api_operation
+
+_BAR_WIDTH = 20
+
+
+class ApplyProgress:
+    """
+    Throttled progress message for a running apply.
+
+    Events are counted as they stream in; the message is edited at most once
+    per ``interval`` seconds so long applies stay visible without spending
+    their rate limit on status updates.
+    """
+
+    def __init__(self, message: discord.Message, interval: Optional[float] = None):
+        self.message = message
+        self.interval = config.performance.progress_interval if interval is None else interval
+        self.planned = 0
+        self.done = 0
+        self.changed = 0
+        self.started = time.monotonic()
+        self._last_edit = self.started
+
+    @classmethod
+    async def start(cls, ctx=None, interaction=None, interval: Optional[float] = None):
+        """Send the initial progress message and return the tracker."""
+        embed = cls._render(0, 0, 0, None)
+        if interaction:
+            message = await interaction.followup.send(embed=embed, wait=True)
+        else:
+            message = await ctx.send(embed=embed)
+        return cls(message, interval)
+
+    @staticmethod
+    def _render(done: int, planned: int, changed: int, eta: Optional[float]) -> discord.Embed:
+        """Render the progress embed."""
+        if not planned:
+            return create_embed(
+                title="⏳ Applying Template", description="Planning changes..."
+            )
+        ratio = min(done / planned, 1.0)
+        filled = round(ratio * _BAR_WIDTH)
+        description = (
+            f"`{'█' * filled}{'░' * (_BAR_WIDTH - filled)}` **{ratio:.0%}**\n"
+            f"{done}/{planned} operations · {max(planned - done, 0)} remaining · "
+            f"{changed} changed"
+        )
+        if eta is not None:
+            description += f"\nETA: {format_time_delta(eta)}"
+        return create_embed(title="⏳ Applying Template", description=description)
+
+    @property
+    def eta(self) -> Optional[float]:
+        """Estimated seconds left, from the average time per finished operation."""
+        if not self.done or self.done >= self.planned:
+            return None
+        elapsed = time.monotonic() - self.started
+        return elapsed / self.done * (self.planned - self.done)
+
+    async def update(self, event: ApplyEvent) -> None:
+        """Count an event and edit the message if the throttle interval has passed."""
+        if event.op is OpKind.PLAN:
+            self.planned = event.planned
+        elif event.is_step:
+            self.done += 1
+            if event.is_change:
+                self.changed += 1
+
+        now = time.monotonic()
+        if now - self._last_edit < self.interval:
+            return
+        self._last_edit = now
+        try:
+            with tag_api_operation("apply_progress"):
+                await self.message.edit(
+                    embed=self._render(self.done, self.planned, self.changed, self.eta)
+                )
+        except discord.HTTPException:
+            # Progress is best effort, the final report replaces this message
+            pass
@@ -0,0 +1,192 @@
+"""
+Apply report utilities for GitCord bot.
+Collects the outcome of a template apply so it can be sent as one message.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+import discord
+
+from .apply_events import (
+    ApplyEvent,
+    ObjectKind,
+    OpKind,
+    render_diff_line,
+    render_message,
+)
+from .helpers import create_embed, truncate_text
+from ..views.base_views import add_object_list_fields
+
+# Discord allows at most 10 embeds and 6000 embed characters per message.
+# Four code blocks, the summary field and two mention fields stay below that.
+# A page of changes holds up to CHANGES_PER_PAGE lines that fit in one block.
+MAX_EMBEDS = 10
+CHANGES_PER_PAGE = 20
+_BLOCK_LIMIT = 650
+_EXTRA_LIST_FIELDS = 2
+
+
+def _code_block(text: str) -> str:
+    """Wrap text in a code block that fits the report budget."""
+    return f"```\n{truncate_text(text, _BLOCK_LIMIT)}\n```"
+
+
+@dataclass
+class ApplyReport:  # pylint: disable=too-many-instance-attributes
+    """Outcome of a template apply, rendered as a single paginated message."""
+
+    title: str = "✅ Template Applied"
+    git_output: str = ""
+    git_warnings: str = ""
+    notes: List[str] = field(default_factory=list)
+    warnings: List[str] = field(default_factory=list)
+    changes: List[str] = field(default_factory=list)
+    category_counts: Dict[str, Dict[OpKind, int]] = field(default_factory=dict)
+    extra_channel_ids: List[int] = field(default_factory=list)
+    extra_category_ids: List[int] = field(default_factory=list)
+    api_calls: int = 0
+    failed: bool = False
+
+    @property
+    def extra_ids(self) -> List[int]:
+        """IDs offered for cleanup, channels before the categories holding them."""
+        return self.extra_channel_ids + self.extra_category_ids
+
+    @property
+    def pages(self) -> List[List[str]]:
+        """The change list split into pages whose code block is never truncated."""
+        pages: List[List[str]] = []
+        size = 0
+        for line in self.changes:
+            line = truncate_text(line, _BLOCK_LIMIT)
+            if (
+                not pages
+                or len(pages[-1]) == CHANGES_PER_PAGE
+                or size + 1 + len(line) > _BLOCK_LIMIT
+            ):
+                pages.append([])
+                size = -1
+            pages[-1].append(line)
+            size += 1 + len(line)
+        return pages
+
+    @property
+    def page_count(self) -> int:
+        """Number of pages needed for the change list."""
+        return max(1, len(self.pages))
+
+    def add_event(self, event: ApplyEvent) -> None:
+        """Fold one apply event into the report without keeping the event."""
+        self.api_calls += event.api_calls
+        if event.is_problem:
+            self.warnings.append(render_message(event))
+        elif (
+            event.op is OpKind.EXTRA
+            and event.object_id is not None
+            # Extra roles are only logged, never offered for cleanup
+            and event.kind is not ObjectKind.ROLE
+        ):
+            ids = (
+                self.extra_category_ids
+                if event.kind is ObjectKind.CATEGORY
+                else self.extra_channel_ids
+            )
+            if event.object_id not in ids:
+                ids.append(event.object_id)
+
+        diff_line = render_diff_line(event)
+        if diff_line:
+            self.changes.append(diff_line)
+
+        if event.kind is ObjectKind.CATEGORY and event.op in (
+            OpKind.CREATE,
+            OpKind.UPDATE,
+            OpKind.SKIP,
+        ):
+            self.category_counts.setdefault(event.name, {})
+        elif event.kind is ObjectKind.CHANNEL and event.category is not None:
+            counts = self.category_counts.setdefault(event.category, {})
+            counts[event.op] = counts.get(event.op, 0) + 1
+
+    @property
+    def summaries(self) -> List[str]:
+        """Per-category channel counts, in template order."""
+        return [
+            f"**{name}**: {counts.get(OpKind.CREATE, 0)} created, "
+            f"{counts.get(OpKind.UPDATE, 0)} updated, {counts.get(OpKind.SKIP, 0)} skipped"
+            for name, counts in self.category_counts.items()
+        ]
+
+    def build_embeds(self, page: int = 0) -> List[discord.Embed]:
+        """
+        Render the report for the given page of the change list.
+
+        Args:
+            page: Zero-based page of the change list to show
+
+        Returns:
+            Up to ``MAX_EMBEDS`` embeds for one message
+        """
+        description = "\n".join(self.notes)
+        if self.git_output:
+            description += f"\n{_code_block(self.git_output)}"
+        if not self.changes and not self.failed:
+            description += "\nNo changes needed"
+        summary = create_embed(
+            title=self.title,
+            description=description.strip() or "Template processed",
+            color=discord.Color.red() if self.failed else discord.Color.green(),
+        )
+        if self.summaries:
+            summary.add_field(
+                name="Summary",
+                value=truncate_text("\n".join(self.summaries), _BLOCK_LIMIT),
+                inline=False,
+            )
+        embeds = [summary]
+
+        if self.git_warnings:
+            embeds.append(
+                create_embed(
+                    title="⚠️ Git Warnings",
+                    description=_code_block(self.git_warnings),
+                    color=discord.Color.orange(),
+                )
+            )
+
+        if self.warnings:
+            embeds.append(
+                create_embed(
+                    title="⚠️ Template Warnings",
+                    description=_code_block("\n".join(self.warnings)),
+                    color=discord.Color.orange(),
+                )
+            )
+
+        if self.changes:
+            pages = self.pages
+            page = min(max(page, 0), len(pages) - 1)
+            changes = create_embed(
+                title="📝 Changes",
+                description=_code_block("\n".join(pages[page])),
+                footer=(
+                    f"Page {page + 1}/{len(pages)} · {len(self.changes)} changes"
+                    if len(pages) > 1
+                    else None
+                ),
+            )
+            embeds.append(changes)
+
+        if self.extra_ids:
+            extras = create_embed(
+                title="🗑️ Not in Template",
+                description="These objects exist in Discord but not in the template.",
+                color=discord.Color.orange(),
+            )
+            add_object_list_fields(
+                extras, "Extra Objects", self.extra_ids, max_fields=_EXTRA_LIST_FIELDS
+            )
+            embeds.append(extras)
+
+        return embeds[:MAX_EMBEDS]
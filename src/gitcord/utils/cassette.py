@@ -0,0 +1,275 @@
+"""
+Record Discord REST traffic of template applies into cassette files.
+
+When ``GITCORD_CASSETTE_DIR`` is set, every apply writes a cassette to that
+directory. A cassette holds:
+
+- the guild's channels and roles as cached when the apply started
+- the template files that were applied
+- every REST request the apply made, with its response, start offset and
+  duration
+
+The benchmark harness replays cassettes offline (``benchmarks/replay.py``),
+so an apply from a large production guild can be reproduced and profiled
+with the same call sequence and timing.
+
+Edits of the apply's progress message are not recorded. Request and
+response bodies are stored as sent, so cassettes contain channel names,
+topics and permission overwrites. Auth headers are never recorded.
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import json
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import discord
+from discord.http import Route
+
+from .logger import main_logger as logger
+from .metrics import api_operation, current_response
+from .state_store import atomic_write_json
+
+CASSETTE_VERSION = 1
+
+# Calls made during an apply that are not part of it: progress message edits
+# depend on the invoking message, which a replay does not have
+_UNRECORDED_OPERATIONS = ("apply_progress",)
+
+
+@dataclass
+class Interaction:  # pylint: disable=too-many-instance-attributes
+    """One REST call: what was sent, what came back and how long it took."""
+
+    method: str
+    # discord.py route template, e.g. /channels/{channel_id}
+    route: str
+    # Request path with parameters filled in, relative to the API base URL
+    path: str
+    status: int
+    body: Any = None
+    response: Any = None
+    # Seconds from the start of the recording
+    started: float = 0.0
+    # Seconds until the response, including discord.py's rate limit waits
+    duration: float = 0.0
+    # HTTP requests sent, more than one when discord.py retried after a 429
+    attempts: int = 1
+
+
+@dataclass
+class Cassette:
+    """The REST traffic of one apply and the guild it ran against."""
+
+    guild: dict
+    files: Dict[str, str] = field(default_factory=dict)
+    interactions: List[Interaction] = field(default_factory=list)
+    source: str = ""
+    recorded_at: float = 0.0
+    version: int = CASSETTE_VERSION
+
+    def __post_init__(self):
+        self._clock = time.perf_counter()
+
+    def record(self, interaction: Interaction) -> None:
+        """Append a finished REST call."""
+        self.interactions.append(interaction)
+
+    def elapsed(self) -> float:
+        """Seconds since the recording started."""
+        return time.perf_counter() - self._clock
+
+    def to_dict(self) -> dict:
+        """The cassette as JSON-serialisable data."""
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Cassette":
+        """
+        Build a cassette from its JSON form.
+
+        Raises:
+            ValueError: If the cassette was written by an unsupported version
+        """
+        version = data.get("version")
+        if version != CASSETTE_VERSION:
+            raise ValueError(f"Unsupported cassette version {version}, expected {CASSETTE_VERSION}")
+        return cls(
+            guild=data["guild"],
+            files=data.get("files", {}),
+            interactions=[Interaction(**item) for item in data.get("interactions", [])],
+            source=data.get("source", ""),
+            recorded_at=data.get("recorded_at", 0.0),
+        )
+
+    def save(self, path: str) -> None:
+        """Write the cassette to ``path`` atomically."""
+        atomic_write_json(path, self.to_dict())
+
+    @classmethod
+    def load(cls, path: str) -> "Cassette":
+        """
+        Read a cassette written by ``save``.
+
+        Raises:
+            ValueError: If the cassette was written by an unsupported version
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+
+def _overwrite_payload(target, overwrite: discord.PermissionOverwrite) -> dict:
+    allow, deny = overwrite.pair()
+    return {
+        "id": str(target.id),
+        "type": 0 if isinstance(target, discord.Role) else 1,
+        "allow": str(allow.value),
+        "deny": str(deny.value),
+    }
+
+
+def channel_payload(channel: discord.abc.GuildChannel) -> dict:
+    """A cached channel in the shape of a Discord channel object."""
+    payload = {
+        "id": str(channel.id),
+        "guild_id": str(channel.guild.id),
+        "type": channel.type.value,
+        "name": channel.name,
+        "position": channel.position,
+        "parent_id": str(channel.category_id) if channel.category_id else None,
+        "permission_overwrites": [
+            _overwrite_payload(target, overwrite)
+            for target, overwrite in channel.overwrites.items()
+        ],
+        "nsfw": getattr(channel, "nsfw", False),
+    }
+    if isinstance(channel, (discord.VoiceChannel, discord.StageChannel)):
+        payload.update(
+            bitrate=channel.bitrate, user_limit=channel.user_limit, rtc_region=channel.rtc_region,
+        )
+    elif not isinstance(channel, discord.CategoryChannel):
+        payload.update(
+            topic=getattr(channel, "topic", None),
+            rate_limit_per_user=getattr(channel, "slowmode_delay", 0),
+        )
+    if isinstance(channel, discord.ForumChannel):
+        reaction = channel.default_reaction_emoji
+        payload.update(
+            available_tags=[tag.to_dict() for tag in channel.available_tags],
+            default_forum_layout=channel.default_layout.value,
+            default_reaction_emoji=reaction and {
+                "emoji_id": str(reaction.id) if reaction.id else None,
+                "emoji_name": None if reaction.id else reaction.name,
+            },
+            default_thread_rate_limit_per_user=channel.default_thread_slowmode_delay,
+        )
+    return payload
+
+
+def guild_snapshot(guild: discord.Guild) -> dict:
+    """The parts of a cached guild an apply reads, as a GUILD_CREATE style payload."""
+    return {
+        "id": str(guild.id),
+        "name": guild.name,
+        "roles": [
+            {
+                "id": str(role.id),
+                "name": role.name,
+                "permissions": str(role.permissions.value),
+                "position": role.position,
+                "color": role.color.value,
+                "colors": {"primary_color": role.color.value},
+                "hoist": role.hoist,
+                "managed": role.managed,
+                "mentionable": role.mentionable,
+                "flags": 0,
+            }
+            for role in guild.roles
+        ],
+        "channels": [channel_payload(channel) for channel in guild.channels],
+    }
+
+
+# The cassette REST calls of the current task are recorded into
+_recording: contextvars.ContextVar[Optional[Cassette]] = contextvars.ContextVar(
+    "gitcord_cassette", default=None
+)
+
+
+def instrument_cassettes(http) -> None:
+    """
+    Wrap ``HTTPClient.request`` so calls made inside ``record_cassette`` are recorded.
+
+    Install it before ``instrument_http_client`` so response statuses are known.
+    """
+    original = http.request
+    if getattr(original, "__gitcord_cassette__", False):
+        return
+
+    async def request(route, **kwargs):
+        cassette = _recording.get()
+        if cassette is None or api_operation.get() in _UNRECORDED_OPERATIONS:
+            return await original(route, **kwargs)
+        interaction = Interaction(
+            method=route.method,
+            route=route.path,
+            path=route.url[len(Route.BASE):],
+            status=200,
+            body=kwargs.get("json"),
+            started=cassette.elapsed(),
+        )
+        try:
+            interaction.response = await original(route, **kwargs)
+        except discord.HTTPException as e:
+            interaction.status = e.status
+            interaction.response = {"message": e.text, "code": e.code}
+            raise
+        finally:
+            interaction.duration = cassette.elapsed() - interaction.started
+            status, attempts = current_response()
+            interaction.status = status or interaction.status
+            interaction.attempts = attempts or 1
+            cassette.record(interaction)
+        return interaction.response
+
+    request.__gitcord_cassette__ = True
+    http.request = request
+
+
+@contextlib.asynccontextmanager
+async def record_cassette(
+    guild: discord.Guild,
+    files: Dict[str, str],
+    source: str = "",
+    directory: Optional[str] = None,
+) -> AsyncIterator[Optional[Cassette]]:
+    """
+    Record the REST calls made inside the block into a cassette file.
+
+    Does nothing, and yields None, unless ``directory`` or
+    ``GITCORD_CASSETTE_DIR`` names where to write cassettes. The file is
+    written when the block exits, even if it raised.
+    """
+    directory = directory or os.getenv("GITCORD_CASSETTE_DIR")
+    if not directory:
+        yield None
+        return
+    cassette = Cassette(
+        guild=guild_snapshot(guild), files=dict(files), source=source, recorded_at=time.time(),
+    )
+    token = _recording.set(cassette)
+    try:
+        yield cassette
+    finally:
+        _recording.reset(token)
+        recorded = time.strftime("%Y%m%dT%H%M%S", time.gmtime(cassette.recorded_at))
+        path = os.path.join(directory, f"{guild.id}-{recorded}.json")
+        try:
+            await asyncio.to_thread(cassette.save, path)
+            logger.info("Recorded %d REST calls to %s", len(cassette.interactions), path)
+        except OSError as e:
+            logger.error("Failed to write cassette %s: %s", path, e)
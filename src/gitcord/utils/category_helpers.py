@@ -7,10 +7,15 @@ from typing import List, Optional
 
 import discord
 
-from .helpers import create_embed, parse_channel_config
+from .helpers import (
+    create_channel_by_type,
+    create_channel_kwargs,
+    create_embed,
+    parse_channel_config,
+)
 from .logger import main_logger as logger
-
-import requests
+from ..views.base_views import add_object_list_fields
+from ..views.channel_views import DeleteExtraChannelsView
 
 
 @dataclass
@@ -235,33 +240,10 @@ async def _create_channel_in_category(
 ) -> Optional[discord.abc.GuildChannel]:
     """Create a new channel in the specified category."""
     try:
-        channel_kwargs = {
-            "name": channel_config["name"],
-            "category": category,
-        }
-
-        # Add topic if specified
-        if "topic" in channel_config:
-            channel_kwargs["topic"] = channel_config["topic"]
-
-        # Add NSFW setting if specified
-        if "nsfw" in channel_config:
-            channel_kwargs["nsfw"] = channel_config["nsfw"]
-        
-        # Add position if specified (for YAML order-based positioning)
-        if channel_position is not None:
-            channel_kwargs["position"] = channel_position
-
+        channel_kwargs = create_channel_kwargs(channel_config, category, channel_position)
         channel_type = channel_config["type"].lower()
-
-        if channel_type == "text":
-            new_channel = await guild.create_text_channel(**channel_kwargs)
-        elif channel_type == "voice":
-            # Voice channels don't support topic, so remove it if present
-            if "topic" in channel_kwargs:
-                del channel_kwargs["topic"]
-            new_channel = await guild.create_voice_channel(**channel_kwargs)
-        else:
+        new_channel = await create_channel_by_type(guild, channel_config, channel_kwargs)
+        if new_channel is None:
             logger.error("Unknown channel type: %s", channel_type)
             return None
 
@@ -335,13 +317,10 @@ def create_category_result_embed(
         embed.add_field(name="Updated Channels", value=channel_list, inline=False)
 
     if result.extra_channels:
-        channel_list = "\n".join(
-            [f"• {channel.mention} (not in YAML)" for channel in result.extra_channels]
-        )
-        embed.add_field(
-            name="Extra Channels (Not in YAML)",
-            value=channel_list,
-            inline=False,
+        add_object_list_fields(
+            embed,
+            "Extra Channels (Not in YAML)",
+            [channel.id for channel in result.extra_channels],
         )
 
     return embed
@@ -355,7 +334,12 @@ async def handle_category_response(
 ) -> None:
     """Handle the response for category processing."""
     if extra_channels:
-        delete_view = DeleteExtraChannelsView(extra_channels, category_name)
+        logger.info(
+            "Offering deletion of %d extra channel(s) in '%s'",
+            len(extra_channels),
+            category_name,
+        )
+        delete_view = DeleteExtraChannelsView(extra_channels[0].category)
         await interaction.followup.send(embed=embed, view=delete_view)
     else:
         await interaction.followup.send(embed=embed)
@@ -0,0 +1,224 @@
+"""
+Shared git mirrors for GitCord template repositories.
+
+Every distinct remote URL is fetched into a single bare mirror under
+``GITCORD_DATA_DIR/mirrors``. Each guild tracking that URL gets its own
+worktree of the mirror, on its own ``gitcord/<guild_id>`` branch. A fetch
+therefore updates every guild sharing the mirror, and disk, network and
+clone time scale with the number of distinct repositories rather than guilds.
+
+Git runs in subprocesses driven by asyncio, so it never blocks the event loop.
+"""
+
+import asyncio
+import os
+import shutil
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from ..config import config
+from ..constants.paths import get_mirror_dir
+from .metrics import GIT_OPERATION_DURATION
+
+
+class GitTimeoutError(TimeoutError):
+    """A git command did not finish within its timeout and was killed."""
+
+    def __init__(self, args: List[str], timeout: float):
+        super().__init__(f"{' '.join(args)} timed out after {timeout:g} seconds")
+        self.command = args
+        self.timeout = timeout
+
+
+@dataclass
+class GitResult:
+    """Outcome of a git command."""
+
+    returncode: int
+    stdout: str
+    stderr: str
+
+
+async def run_git(
+    operation: str, args: List[str], cwd: Optional[str] = None, timeout: Optional[float] = None
+) -> GitResult:
+    """
+    Run git without blocking the event loop.
+
+    Args:
+        operation: Name recorded in the git duration metric
+        args: Command line, starting with ``git``
+        cwd: Working directory
+        timeout: Seconds before the process is killed, ``git_timeout`` if omitted
+
+    Returns:
+        The exit code and decoded output
+
+    Raises:
+        GitTimeoutError: If git did not finish in time
+    """
+    if timeout is None:
+        timeout = config.performance.git_timeout
+    started = time.perf_counter()
+    status = "error"
+    process = await asyncio.create_subprocess_exec(
+        *args,
+        cwd=cwd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        env={**os.environ, "GIT_TERMINAL_PROMPT": "0"},
+    )
+    try:
+        stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+    except asyncio.TimeoutError as e:
+        process.kill()
+        await process.wait()
+        status = "timeout"
+        raise GitTimeoutError(args, timeout) from e
+    else:
+        status = "ok" if process.returncode == 0 else "error"
+    finally:
+        GIT_OPERATION_DURATION.observe(time.perf_counter() - started, operation, status)
+    return GitResult(
+        process.returncode,
+        stdout.decode("utf-8", errors="replace"),
+        stderr.decode("utf-8", errors="replace"),
+    )
+
+
+def guild_branch(guild_id: int) -> str:
+    """Local branch a guild's worktree is checked out on."""
+    return f"gitcord/{guild_id}"
+
+
+class GitMirrors:
+    """Bare mirrors keyed by remote URL and the worktrees checked out from them."""
+
+    def __init__(self):
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._last_fetch: Dict[str, float] = {}
+
+    def _lock(self, url: str) -> asyncio.Lock:
+        # Git takes lock files in the mirror, so operations on it are serialised
+        return self._locks.setdefault(url, asyncio.Lock())
+
+    async def fetch(self, url: str, force: bool = False) -> GitResult:
+        """
+        Create the mirror for ``url`` or fetch into it.
+
+        Fetches that arrive within ``fetch_reuse_seconds`` of the last one
+        reuse it, so a burst of pulls costs one network round trip. They
+        succeed with no output, since nothing was fetched for their caller.
+        """
+        mirror = get_mirror_dir(url)
+        async with self._lock(url):
+            last = self._last_fetch.get(url)
+            reuse_seconds = config.performance.fetch_reuse_seconds
+            if not force and last is not None and time.monotonic() - last < reuse_seconds:
+                return GitResult(0, "", "")
+            if not os.path.isdir(mirror):
+                os.makedirs(os.path.dirname(mirror), exist_ok=True)
+                result = await run_git("mirror_init", ["git", "init", "--bare", mirror])
+                if result.returncode == 0:
+                    result = await run_git(
+                        "mirror_init", ["git", "remote", "add", "origin", url], cwd=mirror
+                    )
+                if result.returncode != 0:
+                    shutil.rmtree(mirror, ignore_errors=True)
+                    return result
+            result = await run_git(
+                "fetch", ["git", "fetch", "--prune", "--tags", "origin"], cwd=mirror
+            )
+            if result.returncode == 0:
+                self._last_fetch[url] = time.monotonic()
+            return result
+
+    async def resolve_ref(self, url: str, ref: str) -> Optional[Tuple[str, str]]:
+        """
+        Resolve a branch, tag or commit in the mirror of ``url``.
+
+        Returns:
+            ``(kind, commit)`` with kind ``branch``, ``tag`` or ``commit``,
+            or None if the mirror has no such ref
+        """
+        mirror = get_mirror_dir(url)
+        candidates = (
+            ("branch", f"refs/remotes/origin/{ref}"),
+            ("tag", f"refs/tags/{ref}"),
+            ("commit", ref),
+        )
+        for kind, candidate in candidates:
+            result = await run_git(
+                "rev_parse",
+                ["git", "rev-parse", "--verify", "--quiet", f"{candidate}^{{commit}}"],
+                cwd=mirror,
+            )
+            if result.returncode == 0:
+                return kind, result.stdout.strip()
+        return None
+
+    async def add_worktree(self, url: str, guild_id: int, path: str, rev: str) -> GitResult:
+        """Check out ``rev`` of the mirror as a new worktree at ``path`` for a guild."""
+        mirror = get_mirror_dir(url)
+        async with self._lock(url):
+            return await run_git(
+                "worktree_add",
+                ["git", "worktree", "add", "--force", "-B", guild_branch(guild_id), path, rev],
+                cwd=mirror,
+            )
+
+    async def checkout(self, url: str, guild_id: int, path: str, rev: str) -> GitResult:
+        """Point a guild's existing worktree at ``rev``, discarding local edits."""
+        async with self._lock(url):
+            return await run_git(
+                "checkout",
+                ["git", "checkout", "--force", "-B", guild_branch(guild_id), rev],
+                cwd=path,
+            )
+
+    async def remove_checkout(self, path: str, url: Optional[str] = None) -> None:
+        """
+        Remove a guild checkout, whether a worktree of ``url``'s mirror or a plain clone.
+
+        The mirror is deleted with its last worktree, unless it was fetched
+        within ``fetch_reuse_seconds`` and so may be about to get a new one.
+        """
+        mirror = get_mirror_dir(url) if url else None
+        if mirror and os.path.isdir(mirror):
+            async with self._lock(url):
+                await run_git(
+                    "worktree_remove", ["git", "worktree", "remove", "--force", path], cwd=mirror
+                )
+                if os.path.exists(path):
+                    shutil.rmtree(path)
+                await run_git("worktree_prune", ["git", "worktree", "prune"], cwd=mirror)
+                if await self._unused(url, mirror):
+                    shutil.rmtree(mirror, ignore_errors=True)
+                    self._last_fetch.pop(url, None)
+        elif os.path.exists(path):
+            shutil.rmtree(path)
+
+    async def _unused(self, url: str, mirror: str) -> bool:
+        """Whether ``url``'s mirror has no worktrees left and was not fetched just now."""
+        last = self._last_fetch.get(url)
+        if last is not None and time.monotonic() - last < config.performance.fetch_reuse_seconds:
+            return False
+        result = await run_git(
+            "worktree_list", ["git", "worktree", "list", "--porcelain"], cwd=mirror
+        )
+        # The bare mirror lists itself as a worktree marked "bare"
+        lines = result.stdout.splitlines()
+        worktrees = sum(line.startswith("worktree ") for line in lines)
+        return result.returncode == 0 and worktrees == lines.count("bare")
+
+    async def fast_forward(self, url: str, path: str, branch: str) -> GitResult:
+        """Move a worktree of ``url``'s mirror to ``origin/<branch>``, like ``git pull``."""
+        async with self._lock(url):
+            return await run_git(
+                "merge", ["git", "merge", "--ff-only", f"origin/{branch}"], cwd=path
+            )
+
+
+# Shared by every cog so fetch coalescing and locks cover the whole bot
+git_mirrors = GitMirrors()
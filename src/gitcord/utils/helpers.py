@@ -4,13 +4,18 @@ Helper utilities for GitCord bot.
 
 import os
 import re
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional, Union, List
+from typing import Any, Dict, Optional, Tuple, Union, List
 
 import discord
 import yaml
 from discord.ext import commands
 
+from .metrics import TEMPLATE_PARSE_DURATION
+from .permissions import validate_permissions
+from .roles import validate_roles
+
 
 def format_latency(latency: float) -> str:
     """
@@ -100,13 +105,70 @@ def format_time_delta(seconds: float) -> str:
     return f"{hours:.1f}h"
 
 
+def template_id(config: dict) -> Optional[str]:
+    """The stable ``id`` of a template category or channel, if it has one."""
+    return str(config["id"]) if "id" in config else None
+
+
+def validate_template_id(config: dict, where: str, seen: Optional[set] = None) -> None:
+    """
+    Check the optional stable ``id`` of a template category or channel.
+
+    Raises:
+        ValueError: If it is not a non-empty string or a number, or already in ``seen``
+    """
+    if "id" not in config:
+        return
+    value = config["id"]
+    if isinstance(value, bool) or not isinstance(value, (str, int)) or value == "":
+        raise ValueError(f"{where} id must be a string or a number")
+    if seen is not None:
+        if str(value) in seen:
+            raise ValueError(f"{where} id {value} is used more than once")
+        seen.add(str(value))
+
+
+# Template forum layouts to Discord's
+FORUM_LAYOUTS = {
+    "none": discord.ForumLayoutType.not_set,
+    "list": discord.ForumLayoutType.list_view,
+    "gallery": discord.ForumLayoutType.gallery_view,
+}
+
+# Discord's limit on the tags of a forum
+MAX_FORUM_TAGS = 20
+
+
+def validate_forum_fields(config: dict, where: str) -> None:
+    """
+    Check the forum settings of a template channel.
+
+    Raises:
+        ValueError: If its layout is unknown or its tags are not a list of unique names
+    """
+    if "layout" in config and config["layout"] not in FORUM_LAYOUTS:
+        raise ValueError(f"{where} layout must be one of: {', '.join(FORUM_LAYOUTS)}")
+    if "tags" not in config:
+        return
+    tags = config["tags"]
+    if not isinstance(tags, list):
+        raise ValueError(f"{where} tags must be a list")
+    if len(tags) > MAX_FORUM_TAGS:
+        raise ValueError(f"{where} has more than {MAX_FORUM_TAGS} tags")
+    names = [tag.get("name") if isinstance(tag, dict) else tag for tag in tags]
+    if not all(isinstance(name, str) and name for name in names):
+        raise ValueError(f"{where} tags must be names or mappings with a name")
+    if len(set(names)) != len(names):
+        raise ValueError(f"{where} tag names must be unique")
+
+
 def parse_monolithic_template(yaml_path: str) -> dict:
     """Parse and validate the monolithic YAML template file."""
     if not os.path.exists(yaml_path):
         raise FileNotFoundError(f"Template file not found at: {yaml_path}")
 
     try:
-        with open(yaml_path, "r", encoding="utf-8") as file:
+        with open(yaml_path, "r", encoding="utf-8") as file, TEMPLATE_PARSE_DURATION.time("monolithic"):
             template_config = yaml.safe_load(file)
     except yaml.YAMLError as e:
         raise ValueError(f"Invalid YAML format: {e}") from e
@@ -121,7 +183,11 @@ def parse_monolithic_template(yaml_path: str) -> dict:
     if not isinstance(template_config["categories"], list):
         raise ValueError("categories must be a list")
 
+    if "roles" in template_config:
+        validate_roles(template_config["roles"])
+
     # Validate each category
+    template_ids = set()
     for i, category in enumerate(template_config["categories"]):
         if not isinstance(category, dict):
             raise ValueError(f"Category {i} must be a dictionary")
@@ -130,6 +196,9 @@ def parse_monolithic_template(yaml_path: str) -> dict:
         for field in required_category_fields:
             if field not in category:
                 raise ValueError(f"Category {i} missing required field: {field}")
+        if "permissions" in category:
+            validate_permissions(category["permissions"], f"Category {i}")
+        validate_template_id(category, f"Category {i}", template_ids)
         
         if "channels" in category:
             if not isinstance(category["channels"], list):
@@ -144,6 +213,10 @@ def parse_monolithic_template(yaml_path: str) -> dict:
                 for field in required_channel_fields:
                     if field not in channel:
                         raise ValueError(f"Category {i}, channel {j} missing required field: {field}")
+                if "permissions" in channel:
+                    validate_permissions(channel["permissions"], f"Category {i}, channel {j}")
+                validate_forum_fields(channel, f"Category {i}, channel {j}")
+                validate_template_id(channel, f"Category {i}, channel {j}", template_ids)
 
     return template_config
 
@@ -151,7 +224,8 @@ def parse_monolithic_template(yaml_path: str) -> dict:
 def parse_monolithic_template_from_str(yaml_str: str) -> dict:
     """Parse and validate monolithic YAML template from a string."""
     try:
-        template_config = yaml.safe_load(yaml_str)
+        with TEMPLATE_PARSE_DURATION.time("monolithic"):
+            template_config = yaml.safe_load(yaml_str)
     except yaml.YAMLError as e:
         raise ValueError(f"Invalid YAML format: {e}") from e
 
@@ -165,7 +239,11 @@ def parse_monolithic_template_from_str(yaml_str: str) -> dict:
     if not isinstance(template_config["categories"], list):
         raise ValueError("categories must be a list")
 
+    if "roles" in template_config:
+        validate_roles(template_config["roles"])
+
     # Validate each category
+    template_ids = set()
     for i, category in enumerate(template_config["categories"]):
         if not isinstance(category, dict):
             raise ValueError(f"Category {i} must be a dictionary")
@@ -174,6 +252,9 @@ def parse_monolithic_template_from_str(yaml_str: str) -> dict:
         for field in required_category_fields:
             if field not in category:
                 raise ValueError(f"Category {i} missing required field: {field}")
+        if "permissions" in category:
+            validate_permissions(category["permissions"], f"Category {i}")
+        validate_template_id(category, f"Category {i}", template_ids)
         
         if "channels" in category:
             if not isinstance(category["channels"], list):
@@ -188,6 +269,10 @@ def parse_monolithic_template_from_str(yaml_str: str) -> dict:
                 for field in required_channel_fields:
                     if field not in channel:
                         raise ValueError(f"Category {i}, channel {j} missing required field: {field}")
+                if "permissions" in channel:
+                    validate_permissions(channel["permissions"], f"Category {i}, channel {j}")
+                validate_forum_fields(channel, f"Category {i}, channel {j}")
+                validate_template_id(channel, f"Category {i}, channel {j}", template_ids)
 
     return template_config
 
@@ -207,13 +292,39 @@ def get_template_path(guild_id: int) -> Optional[str]:
     return None
 
 
+def load_template_files(template_dir: str) -> Dict[str, str]:
+    """
+    Read a template's YAML files from a directory.
+
+    Args:
+        template_dir: Template root, holding template.yaml or legacy category folders
+
+    Returns:
+        File contents keyed by "/"-separated path relative to ``template_dir``
+    """
+    template_path = os.path.join(template_dir, "template.yaml")
+    if os.path.exists(template_path):
+        with open(template_path, "r", encoding="utf-8") as file:
+            return {"template.yaml": file.read()}
+
+    files = {}
+    for root, dirs, names in os.walk(template_dir):
+        dirs[:] = [name for name in dirs if not name.startswith(".")]
+        for name in names:
+            if name.endswith((".yaml", ".yml")):
+                path = os.path.join(root, name)
+                with open(path, "r", encoding="utf-8") as file:
+                    files[os.path.relpath(path, template_dir).replace(os.sep, "/")] = file.read()
+    return files
+
+
 # Legacy functions - kept for backward compatibility during transition
 def parse_channel_config(yaml_path: str) -> dict:
     """Parse and validate the YAML configuration file."""
     if not os.path.exists(yaml_path):
         raise ValueError(f"YAML file not found at: {yaml_path}")
 
-    with open(yaml_path, "r", encoding="utf-8") as file:
+    with open(yaml_path, "r", encoding="utf-8") as file, TEMPLATE_PARSE_DURATION.time("legacy"):
         channel_config = yaml.safe_load(file)
 
     # Validate required fields
@@ -231,7 +342,7 @@ def parse_category_config(yaml_path: str) -> dict:
         raise FileNotFoundError(f"YAML file not found at: {yaml_path}")
 
     try:
-        with open(yaml_path, "r", encoding="utf-8") as file:
+        with open(yaml_path, "r", encoding="utf-8") as file, TEMPLATE_PARSE_DURATION.time("legacy"):
             category_config = yaml.safe_load(file)
     except yaml.YAMLError as e:
         raise ValueError(f"Invalid YAML format: {e}") from e
@@ -245,12 +356,18 @@ def parse_category_config(yaml_path: str) -> dict:
     return category_config
 
 
-def parse_category_config_from_str(yaml_str: str) -> dict:
-    """Parse and validate category YAML configuration from a string."""
+def parse_category_config_from_str(yaml_str: str, template_ids: Optional[set] = None) -> dict:
+    """
+    Parse and validate category YAML configuration from a string.
+
+    ``template_ids`` collects the IDs of a template's files parsed so far, so
+    an ID used by two of them is rejected.
+    """
     import yaml
 
     try:
-        category_config = yaml.safe_load(yaml_str)
+        with TEMPLATE_PARSE_DURATION.time("legacy"):
+            category_config = yaml.safe_load(yaml_str)
     except yaml.YAMLError as e:
         raise ValueError(f"Invalid YAML format: {e}") from e
     if category_config is None:
@@ -259,41 +376,147 @@ def parse_category_config_from_str(yaml_str: str) -> dict:
     for field in required_fields:
         if field not in category_config:
             raise ValueError(f"Missing required field: {field}")
+    if "permissions" in category_config:
+        validate_permissions(category_config["permissions"], "Category")
+    validate_template_id(category_config, "Category", template_ids)
     return category_config
 
 
-def parse_channel_config_from_str(yaml_str: str) -> dict:
-    """Parse and validate channel YAML configuration from a string."""
+def parse_channel_config_from_str(yaml_str: str, template_ids: Optional[set] = None) -> dict:
+    """
+    Parse and validate channel YAML configuration from a string.
+
+    ``template_ids`` is shared with the other files of the template, as for
+    ``parse_category_config_from_str``.
+    """
     import yaml
 
-    channel_config = yaml.safe_load(yaml_str)
+    with TEMPLATE_PARSE_DURATION.time("legacy"):
+        channel_config = yaml.safe_load(yaml_str)
     if channel_config is None:
         raise ValueError("YAML is empty or invalid.")
     required_fields = ["name", "type"]
     for field in required_fields:
         if field not in channel_config:
             raise ValueError(f"Missing required field: {field}")
+    if "permissions" in channel_config:
+        validate_permissions(channel_config["permissions"], "Channel")
+    validate_forum_fields(channel_config, "Channel")
+    validate_template_id(channel_config, "Channel", template_ids)
     return channel_config
 
 
+@dataclass(frozen=True)
+class ChannelType:
+    """How a template channel type is created and which template keys it supports."""
+
+    # discord.Guild method creating the channel
+    create: str
+    # Template keys besides name, position and permissions
+    keys: Tuple[str, ...]
+    # Fixed keyword arguments for ``create``
+    options: Optional[Dict[str, Any]] = None
+
+
+_ANNOUNCEMENT = ChannelType("create_text_channel", ("topic", "nsfw"), {"news": True})
+
+CHANNEL_TYPES = {
+    "text": ChannelType("create_text_channel", ("topic", "nsfw", "slowmode")),
+    "announcement": _ANNOUNCEMENT,
+    "news": _ANNOUNCEMENT,
+    "voice": ChannelType("create_voice_channel", ("nsfw", "bitrate", "user_limit")),
+    "stage": ChannelType("create_stage_channel", ("nsfw", "bitrate", "user_limit")),
+    "forum": ChannelType(
+        "create_forum",
+        ("topic", "nsfw", "slowmode", "tags", "layout", "default_reaction", "thread_slowmode"),
+    ),
+}
+
+# Template keys to the discord.py keyword argument and attribute holding them
+CHANNEL_ATTRIBUTES = {
+    "topic": "topic",
+    "nsfw": "nsfw",
+    "slowmode": "slowmode_delay",
+    "bitrate": "bitrate",
+    "user_limit": "user_limit",
+    "tags": "available_tags",
+    "layout": "default_layout",
+    "default_reaction": "default_reaction_emoji",
+    "thread_slowmode": "default_thread_slowmode_delay",
+}
+
+
+def forum_tags(specs: list, existing=()) -> List[discord.ForumTag]:
+    """
+    The forum tags a template lists, as names or mappings with a name.
+
+    Tags keep the ID of the ``existing`` tag with their name, so editing a
+    forum's tags does not remove them from its posts.
+    """
+    existing_ids = {tag.name: tag.id for tag in existing}
+    tags = []
+    for spec in specs:
+        if isinstance(spec, dict):
+            tag = discord.ForumTag(
+                name=spec["name"], emoji=spec.get("emoji"), moderated=spec.get("moderated", False)
+            )
+        else:
+            tag = discord.ForumTag(name=spec)
+        tag.id = existing_ids.get(tag.name, 0)
+        tags.append(tag)
+    return tags
+
+
+def _attribute_value(
+    key: str, value: Any, channel: Optional[discord.abc.GuildChannel] = None
+) -> Any:
+    """The discord.py value for template ``value`` of ``key``, reusing ``channel``'s forum tags."""
+    if key == "tags":
+        return forum_tags(value, getattr(channel, "available_tags", ()))
+    if key == "layout":
+        return FORUM_LAYOUTS[value]
+    return value
+
+
+def _comparable(key: str, value: Any) -> Any:
+    """``value`` of ``key`` in a form equal for the same attribute as sent and as read back."""
+    if key == "tags":
+        return [(tag.name, str(tag.emoji) if tag.emoji else None, tag.moderated) for tag in value]
+    if key == "default_reaction":
+        return str(value) if value else None
+    return value
+
+
 def create_channel_kwargs(
-    channel_config: dict, category: Optional[discord.CategoryChannel] = None, position: Optional[int] = None
+    channel_config: dict,
+    category: Optional[discord.CategoryChannel] = None,
+    position: Optional[int] = None,
+    overwrites: Optional[dict] = None,
 ) -> dict:
-    """Create channel creation parameters from config."""
+    """
+    Create channel creation parameters from config.
+
+    Every attribute the template sets for the channel's type is included, so
+    the create call needs no follow-up edits.
+    """
     channel_kwargs = {
         "name": channel_config["name"],
         "category": category,
     }
 
-    # Add optional parameters if they exist
-    if "topic" in channel_config:
-        channel_kwargs["topic"] = channel_config["topic"]
-    if "nsfw" in channel_config:
-        channel_kwargs["nsfw"] = channel_config["nsfw"]
-    
+    channel_type = CHANNEL_TYPES.get(channel_config["type"].lower())
+    if channel_type:
+        channel_kwargs.update(channel_type.options or {})
+        for key in channel_type.keys:
+            # discord.py rejects a None reaction emoji on create, and None is the default
+            if channel_config.get(key) is not None:
+                channel_kwargs[CHANNEL_ATTRIBUTES[key]] = _attribute_value(key, channel_config[key])
+
     # Add position if specified (for YAML order-based positioning)
     if position is not None:
         channel_kwargs["position"] = position
+    if overwrites is not None:
+        channel_kwargs["overwrites"] = overwrites
 
     return channel_kwargs
 
@@ -301,17 +524,45 @@ def create_channel_kwargs(
 async def create_channel_by_type(
     guild: Optional[discord.Guild], channel_config: dict, channel_kwargs: dict
 ) -> Optional[discord.abc.GuildChannel]:
-    """Create a channel based on its type."""
+    """Create a channel based on its type, or return None for unknown types."""
     if not guild:
         return None
 
-    channel_type = channel_config["type"].lower()
+    channel_type = CHANNEL_TYPES.get(channel_config["type"].lower())
+    if channel_type is None:
+        return None
+    return await getattr(guild, channel_type.create)(**channel_kwargs)
 
-    if channel_type == "text":
-        return await guild.create_text_channel(**channel_kwargs)
-    if channel_type == "voice":
-        return await guild.create_voice_channel(**channel_kwargs)
-    return None
+
+def channel_changes(channel: discord.abc.GuildChannel, channel_config: dict) -> dict:
+    """
+    Edit parameters for the template attributes ``channel`` does not match.
+
+    Topic and NSFW are always managed, an unset topic meaning none. Other
+    attributes are only managed when the template sets them.
+    """
+    channel_type = CHANNEL_TYPES.get(channel_config["type"].lower())
+    if channel_type is None:
+        return {}
+    changes = {}
+    for key in channel_type.keys:
+        attribute = CHANNEL_ATTRIBUTES[key]
+        if not hasattr(channel, attribute):
+            continue
+        current = getattr(channel, attribute)
+        if key == "topic":
+            # Discord reports an unset topic as None
+            desired = channel_config.get("topic") or ""
+            current = current or ""
+        elif key == "nsfw":
+            desired = channel_config.get("nsfw", False)
+        elif key in channel_config:
+            desired = _attribute_value(key, channel_config[key], channel)
+        else:
+            continue
+        if _comparable(key, current) != _comparable(key, desired):
+            changes[attribute] = desired
+    return changes
 
 
 def check_channel_exists(
@@ -381,13 +632,13 @@ async def handle_command_error(
             "❌ Discord Error", f"A Discord error occurred: {error}"
         )
         await ctx.send(embed=embed)
-        logger.error(f"Discord HTTP error in command: {error}")
+        logger.error("Discord HTTP error in command: %s", error)
     else:
         embed = create_error_embed(
             "❌ Unexpected Error", f"An unexpected error occurred: {error}"
         )
         await ctx.send(embed=embed)
-        logger.error(f"Unexpected error in command: {error}")
+        logger.error("Unexpected error in command: %s", error)
 
 
 async def handle_interaction_error(
@@ -406,13 +657,13 @@ async def handle_interaction_error(
             "❌ Discord Error", f"A Discord error occurred: {error}"
         )
         await interaction.followup.send(embed=embed)
-        logger.error(f"Discord HTTP error in interaction: {error}")
+        logger.error("Discord HTTP error in interaction: %s", error)
     else:
         embed = create_error_embed(
             "❌ Unexpected Error", f"An unexpected error occurred: {str(error)}"
         )
         await interaction.followup.send(embed=embed)
-        logger.error(f"Unexpected error in interaction: {error}")
+        logger.error("Unexpected error in interaction: %s", error)
 
 
 def clean_webpage_text(text: str, max_length: int = 1900) -> str:
@@ -1,9 +1,95 @@
 """
 Logging utilities for GitCord bot.
+
+Records are handed to a queue on the calling thread and formatted and written
+by a ``QueueListener`` thread, so logging never blocks the event loop.
+Set ``GITCORD_LOG_FORMAT=json`` to emit one JSON object per line.
 """
 
+import atexit
+import contextlib
+import contextvars
+import json
 import logging
-from typing import Optional
+import logging.handlers
+import os
+import queue
+import uuid
+from typing import Iterator, Optional
+
+# Correlation ID of the apply (or other operation) the current task is running
+correlation_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "gitcord_correlation_id", default=None
+)
+
+
+@contextlib.contextmanager
+def log_context(cid: Optional[str] = None) -> Iterator[str]:
+    """
+    Tag every record logged inside the block with a correlation ID.
+
+    Args:
+        cid: Correlation ID to use, a short random one if omitted
+
+    Yields:
+        The correlation ID
+    """
+    cid = cid or uuid.uuid4().hex[:8]
+    token = correlation_id.set(cid)
+    try:
+        yield cid
+    finally:
+        correlation_id.reset(token)
+
+
+class _ContextQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that defers message formatting to the listener thread."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The correlation ID lives in a context variable, so it has to be
+        # captured here rather than in the listener thread.
+        record.correlation_id = correlation_id.get()
+        if record.exc_info and not record.exc_text:
+            # Tracebacks hold frames alive, render them before queueing
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class _TextFormatter(logging.Formatter):
+    """Plain text formatter that shows the correlation ID when there is one."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        cid = getattr(record, "correlation_id", None)
+        record.context = f" [{cid}]" if cid else ""
+        return super().format(record)
+
+
+class JsonFormatter(logging.Formatter):
+    """Formatter that renders each record as a single JSON object."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        cid = getattr(record, "correlation_id", None)
+        if cid:
+            payload["correlation_id"] = cid
+        if record.exc_text:
+            payload["exception"] = record.exc_text
+        return json.dumps(payload, ensure_ascii=False)
+
+
+def _create_formatter() -> logging.Formatter:
+    """Create the formatter selected by ``GITCORD_LOG_FORMAT``."""
+    if os.getenv("GITCORD_LOG_FORMAT", "text").lower() == "json":
+        return JsonFormatter()
+    return _TextFormatter(
+        "%(asctime)s - %(name)s - %(levelname)s%(context)s - %(message)s"
+    )
 
 
 def setup_logger(name: str = "gitcord", level: int = logging.INFO) -> logging.Logger:
@@ -22,12 +108,15 @@ def setup_logger(name: str = "gitcord", level: int = logging.INFO) -> logging.Lo
 
     # Avoid adding handlers if they already exist
     if not logger.handlers:
-        handler = logging.StreamHandler()
-        formatter = logging.Formatter(
-            "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        stream_handler = logging.StreamHandler()
+        stream_handler.setFormatter(_create_formatter())
+        listener = logging.handlers.QueueListener(
+            log_queue, stream_handler, respect_handler_level=True
         )
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
+        listener.start()
+        atexit.register(listener.stop)
+        logger.addHandler(_ContextQueueHandler(log_queue))
 
     return logger
 
@@ -43,10 +132,10 @@ def log_error(
         error: Exception to log
         context: Optional context string
     """
-    message = f"Error: {error}"
     if context:
-        message = f"{context} - {message}"
-    log_instance.error(message, exc_info=True)  # pylint: disable=line-too-long
+        log_instance.error("%s - Error: %s", context, error, exc_info=True)
+    else:
+        log_instance.error("Error: %s", error, exc_info=True)
 
 
 # Default logger instance
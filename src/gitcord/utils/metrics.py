@@ -0,0 +1,505 @@
+"""
+Prometheus-style metrics for GitCord bot.
+
+Metrics are always collected in memory. Set ``GITCORD_METRICS_PORT`` to serve
+them in the Prometheus text format on ``http://127.0.0.1:<port>/metrics``
+(``GITCORD_METRICS_HOST`` changes the bind address).
+
+REST requests are tagged with the gitcord operation that caused them
+(``api_operation``), so per-route latency can be broken down by apply,
+delete view, command sync and so on.
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import os
+import re
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import discord
+from aiohttp import TraceConfig
+
+from ..config import config
+from .logger import main_logger as logger
+
+if TYPE_CHECKING:
+    from aiohttp import web
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value: str) -> str:
+    """Escape a label value for the Prometheus text format."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    """Render a Prometheus label set."""
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    """Common state of labelled metrics."""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        REGISTRY.register(self)
+
+    def _key(self, labels: Sequence[str]) -> Tuple[str, ...]:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        return tuple(str(label) for label in labels)
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        """Render the metric in the Prometheus text format."""
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Monotonically increasing counter."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        """Increase the counter for the given label values."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        """Current value for the given label values."""
+        return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {value}"
+            for key, value in items
+        ]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, reporting the last one set."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, *labels: str) -> None:
+        """Set the gauge for the given label values."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {value}"
+            for key, value in items
+        ]
+
+
+class Histogram(_Metric):
+    """Histogram of observed values with cumulative buckets."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        """Record one observation for the given label values."""
+        key = self._key(labels)
+        with self._lock:
+            # One slot per bucket, then +Inf, sum
+            state = self._values.setdefault(key, [0.0] * (len(self.buckets) + 2))
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[index] += 1
+            state[-2] += 1
+            state[-1] += value
+
+    @contextlib.contextmanager
+    def time(self, *labels: str) -> Iterator[None]:
+        """Observe the wall-clock duration of the block in seconds."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labels)
+
+    def count(self, *labels: str) -> int:
+        """Number of observations for the given label values."""
+        state = self._values.get(self._key(labels))
+        return int(state[-2]) if state else 0
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, list(state)) for key, state in self._values.items())
+        lines = []
+        for key, state in items:
+            for index, bound in enumerate(self.buckets):
+                labels = _format_labels(self.labelnames, key, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{labels} {state[index]}")
+            labels = _format_labels(self.labelnames, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{labels} {state[-2]}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {state[-1]}")
+            lines.append(f"{self.name}_count{labels} {state[-2]}")
+        return lines
+
+
+class Registry:
+    """Collection of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> None:
+        """Add a metric, rejecting duplicate names."""
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+
+    def render(self) -> str:
+        """Render every registered metric in the Prometheus text format."""
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+REGISTRY = Registry()
+
+COMMAND_DURATION = Histogram(
+    "gitcord_command_duration_seconds",
+    "Time from command invocation to completion.",
+    ["command", "status"],
+)
+APPLY_PHASE_DURATION = Histogram(
+    "gitcord_apply_phase_duration_seconds",
+    "Time spent in each phase of a template apply.",
+    ["phase"],
+)
+APPLY_OPERATION_DURATION = Histogram(
+    "gitcord_apply_operation_duration_seconds",
+    "Time spent on a single apply operation.",
+    ["op", "kind"],
+)
+TEMPLATE_PARSE_DURATION = Histogram(
+    "gitcord_template_parse_duration_seconds",
+    "Time spent parsing template YAML.",
+    ["format"],
+)
+GIT_OPERATION_DURATION = Histogram(
+    "gitcord_git_operation_duration_seconds",
+    "Time spent running git commands.",
+    ["operation", "status"],
+)
+TEMPLATE_DOWNLOADS = Counter(
+    "gitcord_template_downloads_total",
+    "Template archive requests by cache outcome (hit on 304, miss on 200).",
+    ["result"],
+)
+DISCORD_API_REQUESTS = Counter(
+    "gitcord_discord_api_requests_total",
+    "REST requests sent to Discord.",
+    ["method", "route", "status"],
+)
+DISCORD_RATE_LIMITED = Counter(
+    "gitcord_discord_rate_limited_total",
+    "REST responses with status 429.",
+    ["method", "route", "scope"],
+)
+DISCORD_RETRY_AFTER = Counter(
+    "gitcord_discord_retry_after_seconds_total",
+    "Total Retry-After seconds requested by Discord.",
+    ["method", "route"],
+)
+DISCORD_REQUEST_DURATION = Histogram(
+    "gitcord_discord_request_duration_seconds",
+    "Time for a Discord REST call, including rate limit waits and retries.",
+    ["operation", "method", "route", "status"],
+)
+DISCORD_RATELIMIT_REMAINING = Gauge(
+    "gitcord_discord_ratelimit_remaining",
+    "Requests left in the rate limit bucket after the last response on a route.",
+    ["method", "route"],
+)
+
+_SNOWFLAKE_RE = re.compile(r"/\d{15,21}")
+_API_PREFIX_RE = re.compile(r"^/api/v\d+")
+
+
+def normalize_route(path: str) -> str:
+    """Turn a request path into a route with snowflakes replaced by ``{id}``."""
+    return _SNOWFLAKE_RE.sub("/{id}", _API_PREFIX_RE.sub("", path))
+
+
+# The gitcord operation the current task is making REST calls for
+api_operation: contextvars.ContextVar[str] = contextvars.ContextVar(
+    "gitcord_api_operation", default="other"
+)
+
+
+@contextlib.contextmanager
+def tag_api_operation(operation: str) -> Iterator[None]:
+    """Attribute REST calls made inside the block to ``operation``."""
+    token = api_operation.set(operation)
+    try:
+        yield
+    finally:
+        api_operation.reset(token)
+
+
+class ApiUsage:
+    """REST calls made inside a ``track_api_usage`` block."""
+
+    def __init__(self, parent: Optional["ApiUsage"] = None):
+        self.parent = parent
+        self.calls = 0
+        self.duration = 0.0
+
+    def record(self, duration: float) -> None:
+        """Count one call here and in every enclosing block."""
+        usage: Optional[ApiUsage] = self
+        while usage:
+            usage.calls += 1
+            usage.duration += duration
+            usage = usage.parent
+
+
+_api_usage: contextvars.ContextVar[Optional[ApiUsage]] = contextvars.ContextVar(
+    "gitcord_api_usage", default=None
+)
+
+
+@contextlib.contextmanager
+def track_api_usage() -> Iterator[ApiUsage]:
+    """Count the REST calls made inside the block."""
+    usage = ApiUsage(_api_usage.get())
+    token = _api_usage.set(usage)
+    try:
+        yield usage
+    finally:
+        _api_usage.reset(token)
+
+
+class _ResponseInfo:
+    """Details of the last HTTP response seen for an in-flight request."""
+
+    __slots__ = ("status", "attempts", "bucket", "remaining", "reset_after")
+
+    def __init__(self):
+        self.status: Optional[int] = None
+        self.attempts = 0
+        self.bucket: Optional[str] = None
+        self.remaining: Optional[str] = None
+        self.reset_after: Optional[str] = None
+
+
+# Set by the instrumented HTTPClient.request, filled in by the trace config.
+# aiohttp runs trace callbacks in the requesting task, so the value is shared.
+_response_info: contextvars.ContextVar[Optional[_ResponseInfo]] = contextvars.ContextVar(
+    "gitcord_response_info", default=None
+)
+
+
+def current_response() -> Tuple[Optional[int], int]:
+    """
+    Status of the last response to the in-flight REST call, and the attempts made.
+
+    Only known inside an instrumented ``HTTPClient.request``; ``(None, 0)`` elsewhere.
+    """
+    info = _response_info.get()
+    return (info.status, info.attempts) if info else (None, 0)
+
+
+async def _keep_headroom(route, info: _ResponseInfo) -> None:
+    """
+    Wait for a bucket to reset once it is down to ``ratelimit_headroom`` requests.
+
+    discord.py only waits when a bucket is empty; stopping bulk work a few
+    requests earlier leaves room for commands sharing the bucket.
+    """
+    headroom = config.performance.ratelimit_headroom
+    if not headroom or info.remaining is None or info.reset_after is None:
+        return
+    try:
+        remaining, reset_after = int(info.remaining), float(info.reset_after)
+    except ValueError:
+        return
+    if 0 < remaining <= headroom:
+        logger.debug(
+            "[http] %s %s has %d request(s) left, waiting %.2fs for the bucket to reset",
+            route.method, route.path, remaining, reset_after,
+        )
+        await asyncio.sleep(reset_after)
+
+
+def instrument_http_client(http) -> None:
+    """
+    Wrap ``HTTPClient.request`` to time every REST call per route.
+
+    Records one observation per logical call, so discord.py's own rate limit
+    waits and retries count towards its latency. The route label is the
+    discord.py route template (``/channels/{channel_id}``) and the operation
+    label comes from ``tag_api_operation``.
+    """
+    original = http.request
+    if getattr(original, "__gitcord_instrumented__", False):
+        return
+
+    async def request(route, **kwargs):
+        info = _ResponseInfo()
+        token = _response_info.set(info)
+        started = time.perf_counter()
+        status = "error"
+        try:
+            result = await original(route, **kwargs)
+            status = str(info.status or 200)
+        except discord.HTTPException as e:
+            status = str(e.status)
+            raise
+        finally:
+            _response_info.reset(token)
+            elapsed = time.perf_counter() - started
+            DISCORD_REQUEST_DURATION.observe(
+                elapsed, api_operation.get(), route.method, route.path, status
+            )
+            if info.remaining is not None:
+                try:
+                    DISCORD_RATELIMIT_REMAINING.set(
+                        float(info.remaining), route.method, route.path
+                    )
+                except ValueError:
+                    pass
+            usage = _api_usage.get()
+            if usage:
+                usage.record(elapsed)
+            logger.debug(
+                "[http] %s %s -> %s in %.3fs (operation=%s, attempts=%d, "
+                "bucket=%s, remaining=%s, reset_after=%s)",
+                route.method, route.path, status, elapsed, api_operation.get(),
+                info.attempts, info.bucket, info.remaining, info.reset_after,
+            )
+        await _keep_headroom(route, info)
+        return result
+
+    request.__gitcord_instrumented__ = True
+    http.request = request
+
+
+def create_trace_config() -> TraceConfig:
+    """
+    Create an aiohttp trace config that counts Discord REST responses.
+
+    Passed to ``discord.Client`` as ``http_trace`` so every request discord.py
+    makes, including its own 429 retries, is counted.
+    """
+
+    async def on_request_end(_session, _context, params) -> None:
+        if not params.url.path.startswith("/api/"):
+            # Gateway and CDN traffic share the session
+            return
+        route = normalize_route(params.url.path)
+        status = params.response.status
+        headers = params.response.headers
+        DISCORD_API_REQUESTS.inc(params.method, route, str(status))
+        info = _response_info.get()
+        if info:
+            info.status = status
+            info.attempts += 1
+            info.bucket = headers.get("X-RateLimit-Bucket", info.bucket)
+            info.remaining = headers.get("X-RateLimit-Remaining", info.remaining)
+            info.reset_after = headers.get("X-RateLimit-Reset-After", info.reset_after)
+        if status == 429:
+            scope = headers.get("X-RateLimit-Scope", "global" if headers.get("X-RateLimit-Global") else "user")
+            DISCORD_RATE_LIMITED.inc(params.method, route, scope)
+            try:
+                retry_after = float(headers.get("Retry-After", 0))
+            except ValueError:
+                retry_after = 0.0
+            DISCORD_RETRY_AFTER.inc(params.method, route, amount=retry_after)
+
+    trace_config = TraceConfig()
+    trace_config.on_request_end.append(on_request_end)
+    return trace_config
+
+
+class MetricsServer:
+    """Local HTTP server exposing ``/metrics``."""
+
+    def __init__(self, host: str, port: int, registry: Registry = REGISTRY):
+        self.host = host
+        self.port = port
+        self.registry = registry
+        self._runner: Optional["web.AppRunner"] = None
+
+    async def _handle_metrics(self, _request: "web.Request") -> "web.Response":
+        from aiohttp import web
+
+        return web.Response(
+            text=self.registry.render(),
+            content_type="text/plain",
+            charset="utf-8",
+            headers={"X-Content-Type-Options": "nosniff"},
+        )
+
+    async def start(self) -> None:
+        """Start serving metrics."""
+        # aiohttp.web is only needed when metrics are enabled
+        from aiohttp import web
+
+        app = web.Application()
+        app.router.add_get("/metrics", self._handle_metrics)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        logger.info("Serving metrics on http://%s:%d/metrics", self.host, self.port)
+
+    async def stop(self) -> None:
+        """Stop serving metrics."""
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+def metrics_server_from_env() -> Optional[MetricsServer]:
+    """Create a metrics server if ``GITCORD_METRICS_PORT`` is set."""
+    port = os.getenv("GITCORD_METRICS_PORT")
+    if not port:
+        return None
+    return MetricsServer(os.getenv("GITCORD_METRICS_HOST", "127.0.0.1"), int(port))
@@ -0,0 +1,139 @@
+"""
+Permission overwrites declared in templates.
+
+Categories and channels may set overwrites by role name::
+
+    permissions:
+      "@everyone":
+        deny: [view_channel]
+      Moderators:
+        allow: [view_channel, manage_messages]
+
+A category's overwrites also apply to its channels, and a channel's own
+entry for a role replaces the category's. Once declared, overwrites are
+authoritative for roles: overwrites for roles the template does not list are
+removed, while member overwrites are left alone.
+"""
+
+from typing import Dict, Iterable, List, Optional, Set
+
+import discord
+
+EVERYONE = "@everyone"
+
+# A permissions spec: role name to {"allow": [...], "deny": [...]}
+PermissionSpec = Dict[str, Dict[str, List[str]]]
+
+
+def validate_permissions(spec, where: str) -> None:
+    """
+    Check a ``permissions`` value from a template.
+
+    Raises:
+        ValueError: If it is not a mapping of role names to allow/deny lists of
+            known permission names
+    """
+    if not isinstance(spec, dict):
+        raise ValueError(f"{where} permissions must be a mapping of role names")
+    for role, entry in spec.items():
+        if not isinstance(entry, dict) or not set(entry) <= {"allow", "deny"}:
+            raise ValueError(f"{where} permissions for {role} must only have allow and deny lists")
+        for key in ("allow", "deny"):
+            names = entry.get(key, [])
+            if not isinstance(names, list):
+                raise ValueError(f"{where} permissions {key} for {role} must be a list")
+            unknown = [name for name in names if name not in discord.Permissions.VALID_FLAGS]
+            if unknown:
+                raise ValueError(
+                    f"{where} permissions for {role} has unknown permissions: {', '.join(unknown)}"
+                )
+        both = set(entry.get("allow", [])) & set(entry.get("deny", []))
+        if both:
+            raise ValueError(
+                f"{where} permissions for {role} both allow and deny: {', '.join(sorted(both))}"
+            )
+
+
+def merge_permissions(
+    category_spec: Optional[PermissionSpec], channel_spec: Optional[PermissionSpec]
+) -> Optional[PermissionSpec]:
+    """A channel's effective spec, or None if neither it nor its category declares one."""
+    if category_spec is None and channel_spec is None:
+        return None
+    return {**(category_spec or {}), **(channel_spec or {})}
+
+
+def find_role(
+    guild: discord.Guild, name: str, known: Optional[Dict[str, discord.Role]] = None
+) -> Optional[discord.Role]:
+    """
+    The guild's role called ``name``; ``@everyone`` is the default role.
+
+    ``known`` maps names to roles created by this apply, which may not have
+    reached the cache yet.
+    """
+    if name == EVERYONE:
+        return guild.default_role
+    if known and name in known:
+        return known[name]
+    return discord.utils.get(guild.roles, name=name)
+
+
+def missing_roles(
+    guild: discord.Guild,
+    specs: Iterable[Optional[PermissionSpec]],
+    known: Optional[Dict[str, discord.Role]] = None,
+) -> Set[str]:
+    """Role names used in ``specs`` that the guild does not have."""
+    return {
+        name for spec in specs if spec
+        for name in spec if find_role(guild, name, known) is None
+    }
+
+
+def resolve_overwrites(
+    guild: discord.Guild,
+    spec: Optional[PermissionSpec],
+    known: Optional[Dict[str, discord.Role]] = None,
+) -> Optional[Dict[discord.Role, discord.PermissionOverwrite]]:
+    """
+    Turn a spec into discord.py overwrites, or None if there is no spec.
+
+    Roles the guild does not have and entries that neither allow nor deny
+    anything are left out.
+    """
+    if spec is None:
+        return None
+    overwrites = {}
+    for name, entry in spec.items():
+        role = find_role(guild, name, known)
+        values = {perm: True for perm in entry.get("allow", [])}
+        values.update({perm: False for perm in entry.get("deny", [])})
+        if role is not None and values:
+            overwrites[role] = discord.PermissionOverwrite(**values)
+    return overwrites
+
+
+def overwrites_to_apply(
+    channel: discord.abc.GuildChannel,
+    desired: Dict[discord.Role, discord.PermissionOverwrite],
+) -> Optional[Dict[object, discord.PermissionOverwrite]]:
+    """
+    The full overwrites to send so the channel's role overwrites match ``desired``.
+
+    Returns:
+        None if they already match, otherwise ``desired`` plus the channel's
+        member overwrites, ready for a single ``edit(overwrites=...)``
+    """
+    current = channel.overwrites
+    roles = {
+        target: overwrite for target, overwrite in current.items()
+        if isinstance(target, discord.Role)
+    }
+    if roles == desired:
+        return None
+    members = {
+        target: overwrite for target, overwrite in current.items()
+        if not isinstance(target, discord.Role)
+    }
+    return {**members, **desired}
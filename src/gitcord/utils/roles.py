@@ -0,0 +1,123 @@
+"""
+Roles declared in templates.
+
+A monolithic ``template.yaml`` may list roles in the order Discord should
+show them, highest first::
+
+    roles:
+      - name: Moderators
+        color: "#e67e22"
+        permissions: [manage_messages, kick_members]
+        hoist: true
+      - name: Members
+        mentionable: true
+
+Roles are matched by name. Only the attributes a role entry sets are
+managed, so a role listed by name alone is ordered but otherwise left
+alone. Listed roles are reordered among the positions they already hold,
+leaving every other role where it is, with a single bulk position update.
+"""
+
+import re
+from typing import Dict, Iterable, List
+
+import discord
+
+ROLE_FIELDS = ("name", "color", "permissions", "hoist", "mentionable")
+
+_HEX_COLOR = re.compile(r"^#?[0-9a-fA-F]{6}$")
+
+
+def parse_color(value) -> int:
+    """A template color, ``"#rrggbb"`` or an integer, as an integer."""
+    if isinstance(value, str):
+        return int(value.lstrip("#"), 16)
+    return value
+
+
+def validate_roles(roles) -> None:
+    """
+    Check the ``roles`` section of a template.
+
+    Raises:
+        ValueError: If it is not a list of role entries with known fields and
+            valid values, or a role is listed twice
+    """
+    if not isinstance(roles, list):
+        raise ValueError("roles must be a list")
+    seen = set()
+    for i, role in enumerate(roles):
+        if not isinstance(role, dict):
+            raise ValueError(f"Role {i} must be a dictionary")
+        if not isinstance(role.get("name"), str) or not role["name"]:
+            raise ValueError(f"Role {i} missing required field: name")
+        name = role["name"]
+        if name in seen:
+            raise ValueError(f"Role {name} is listed more than once")
+        seen.add(name)
+        _validate_role_fields(name, role)
+
+
+def _validate_role_fields(name: str, role: dict) -> None:
+    """Check the attributes of one role entry, raising ValueError like ``validate_roles``."""
+    unknown = set(role) - set(ROLE_FIELDS)
+    if unknown:
+        raise ValueError(f"Role {name} has unknown fields: {', '.join(sorted(unknown))}")
+    if "color" in role:
+        color = role["color"]
+        valid = _HEX_COLOR.match(color) if isinstance(color, str) else (
+            isinstance(color, int) and not isinstance(color, bool) and 0 <= color <= 0xFFFFFF
+        )
+        if not valid:
+            raise ValueError(f"Role {name} color must be #rrggbb or an integer")
+    if "permissions" in role:
+        names = role["permissions"]
+        if not isinstance(names, list):
+            raise ValueError(f"Role {name} permissions must be a list")
+        unknown = [perm for perm in names if perm not in discord.Permissions.VALID_FLAGS]
+        if unknown:
+            raise ValueError(f"Role {name} has unknown permissions: {', '.join(unknown)}")
+    for flag in ("hoist", "mentionable"):
+        if flag in role and not isinstance(role[flag], bool):
+            raise ValueError(f"Role {name} {flag} must be true or false")
+
+
+def role_kwargs(role_config: dict) -> Dict[str, object]:
+    """The attributes a template role sets, as ``create_role``/``Role.edit`` keyword arguments."""
+    kwargs: Dict[str, object] = {}
+    if "color" in role_config:
+        kwargs["color"] = parse_color(role_config["color"])
+    if "permissions" in role_config:
+        kwargs["permissions"] = discord.Permissions(
+            **{perm: True for perm in role_config["permissions"]}
+        )
+    for flag in ("hoist", "mentionable"):
+        if flag in role_config:
+            kwargs[flag] = role_config[flag]
+    return kwargs
+
+
+def role_changes(role: discord.Role, role_config: dict) -> Dict[str, object]:
+    """The ``Role.edit`` keyword arguments that make the role match the template, if any."""
+    current = {
+        "color": role.colour.value,
+        "permissions": role.permissions,
+        "hoist": role.hoist,
+        "mentionable": role.mentionable,
+    }
+    return {key: value for key, value in role_kwargs(role_config).items() if current[key] != value}
+
+
+def role_positions(ordered: Iterable[discord.Role]) -> Dict[discord.Role, int]:
+    """
+    Positions that put ``ordered`` roles in that order, highest first.
+
+    The roles swap the positions they already hold, so roles outside the
+    template keep theirs.
+
+    Returns:
+        Only the roles whose position changes, for ``Guild.edit_role_positions``
+    """
+    roles: List[discord.Role] = [role for role in ordered if not role.is_default()]
+    slots = sorted((role.position for role in roles), reverse=True)
+    return {role: slot for role, slot in zip(roles, slots) if role.position != slot}
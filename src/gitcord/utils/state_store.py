@@ -0,0 +1,678 @@
+"""
+Persistent per-guild state for GitCord bot.
+
+Holds template source metadata, the last applied commit, template
+fingerprints, the Discord objects behind template IDs, apply history and the
+journal of the running apply behind one ``StateStore`` interface. Two
+backends are available, selected with ``GITCORD_STATE_BACKEND``:
+
+- ``json`` (default): one file per guild in ``GITCORD_DATA_DIR``
+- ``sqlite``: a single WAL-mode database with indexed lookups, for bots in
+  many guilds. Existing JSON metadata and state are imported on first use.
+
+Store methods are blocking and thread-safe. Async code should call writes
+through ``asyncio.to_thread`` so disk I/O stays off the event loop.
+"""
+
+import contextlib
+import glob
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass, field
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple
+
+from ..constants.paths import GITCORD_DATA_DIR, get_metadata_file
+from .logger import main_logger as logger
+
+if TYPE_CHECKING:
+    import sqlite3
+
+# How many apply records the JSON backend keeps per guild
+JSON_HISTORY_LIMIT = 50
+
+_METADATA_FILE_RE = re.compile(r"template_source_(\d+)\.json$")
+_STATE_FILE_RE = re.compile(r"guild_state_(\d+)\.json$")
+_JOURNAL_FILE_RE = re.compile(r"apply_journal_(\d+)\.jsonl?$")
+
+# Bumped when the SQLite backend starts importing more of the JSON state
+_JSON_MIGRATION_VERSION = "3"
+
+
+@dataclass
+class ApplyRecord:  # pylint: disable=too-many-instance-attributes
+    """Outcome of one template apply."""
+
+    guild_id: int
+    started_at: float
+    finished_at: float
+    status: str
+    source: str = ""
+    commit: Optional[str] = None
+    fingerprint: Optional[str] = None
+    changes: int = 0
+    warnings: int = 0
+    api_calls: int = 0
+    correlation_id: Optional[str] = None
+
+
+@dataclass
+class JournalState:
+    """Journal of a guild's unfinished apply: op key -> (status, object ID)."""
+
+    apply_id: str
+    fingerprint: Optional[str] = None
+    ops: Dict[str, Tuple[str, Optional[int]]] = field(default_factory=dict)
+
+
+def fingerprint_template(files: Dict[str, str]) -> Optional[str]:
+    """
+    Hash a template's files.
+
+    Args:
+        files: Template file contents keyed by relative path
+
+    Returns:
+        A hex SHA-256 digest, or None if there are no template files
+    """
+    if not files:
+        return None
+    digest = hashlib.sha256()
+    for path in sorted(files):
+        digest.update(path.encode("utf-8") + b"\0")
+        digest.update(files[path].encode("utf-8") + b"\0")
+    return digest.hexdigest()
+
+
+def atomic_write_json(path: str, data) -> None:
+    """Replace a JSON file via temp file plus rename."""
+    atomic_write_text(path, json.dumps(data))
+
+
+def atomic_write_text(path: str, text: str) -> None:
+    """Replace a text file via temp file plus rename."""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".json")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class StateStore(ABC):
+    """Storage for per-guild template state."""
+
+    @abstractmethod
+    def get_metadata(self, guild_id: int) -> Optional[dict]:
+        """Get a guild's template source metadata."""
+
+    @abstractmethod
+    def set_metadata(self, guild_id: int, data: dict) -> None:
+        """Replace a guild's template source metadata."""
+
+    @abstractmethod
+    def delete_metadata(self, guild_id: int) -> None:
+        """Remove a guild's template source metadata."""
+
+    @abstractmethod
+    def guilds_for_url(self, url: str) -> List[int]:
+        """Get the IDs of guilds whose template comes from ``url``."""
+
+    @abstractmethod
+    def get_last_commit(self, guild_id: int) -> Optional[str]:
+        """Get the commit a guild's template was last applied from."""
+
+    @abstractmethod
+    def set_last_commit(self, guild_id: int, commit: str) -> None:
+        """Remember the commit a guild's template was applied from."""
+
+    @abstractmethod
+    def get_fingerprint(self, guild_id: int, key: str) -> Optional[str]:
+        """Get a stored fingerprint."""
+
+    @abstractmethod
+    def set_fingerprint(self, guild_id: int, key: str, fingerprint: str) -> None:
+        """Store a fingerprint."""
+
+    @abstractmethod
+    def get_object_ids(self, guild_id: int) -> Dict[str, int]:
+        """Get the Discord IDs of the objects behind a guild's template IDs."""
+
+    @abstractmethod
+    def set_object_ids(self, guild_id: int, object_ids: Dict[str, int]) -> None:
+        """Remember the Discord IDs of template objects, keeping other entries."""
+
+    @abstractmethod
+    def record_apply(self, record: ApplyRecord) -> None:
+        """Append an apply to the guild's history."""
+
+    @abstractmethod
+    def apply_history(self, guild_id: int, limit: int = 10) -> List[ApplyRecord]:
+        """Get a guild's most recent applies, newest first."""
+
+    @abstractmethod
+    def load_journal(self, guild_id: int) -> Optional[JournalState]:
+        """Get the journal of a guild's unfinished apply, if any."""
+
+    @abstractmethod
+    def start_journal(self, guild_id: int, state: JournalState) -> None:
+        """Replace a guild's journal, keeping the ops already in ``state``."""
+
+    @abstractmethod
+    def journal_op(
+        self, guild_id: int, key: str, status: str, object_id: Optional[int] = None
+    ) -> None:
+        """Record the status of one planned operation."""
+
+    @abstractmethod
+    def clear_journal(self, guild_id: int) -> None:
+        """Drop a guild's journal once its apply has finished."""
+
+    def close(self) -> None:
+        """Release any resources held by the store."""
+
+
+class JsonStateStore(StateStore):
+    """
+    One JSON file per guild, the original storage layout.
+
+    Metadata stays in ``template_source_<id>.json``; commits, fingerprints
+    and history go to ``guild_state_<id>.json`` and the apply journal to
+    ``apply_journal_<id>.jsonl``. The journal is append-only: a header line,
+    then one line per operation, so journaling an operation never rewrites
+    the file.
+    """
+
+    def __init__(self, data_dir: str = GITCORD_DATA_DIR):
+        self.data_dir = data_dir
+        self._lock = threading.Lock()
+
+    def _metadata_path(self, guild_id: int) -> str:
+        return os.path.join(self.data_dir, os.path.basename(get_metadata_file(guild_id)))
+
+    def _state_path(self, guild_id: int) -> str:
+        return os.path.join(self.data_dir, f"guild_state_{guild_id}.json")
+
+    def _journal_path(self, guild_id: int) -> str:
+        return os.path.join(self.data_dir, f"apply_journal_{guild_id}.jsonl")
+
+    def _legacy_journal_path(self, guild_id: int) -> str:
+        # Journals written before it became append-only
+        return os.path.join(self.data_dir, f"apply_journal_{guild_id}.json")
+
+    @staticmethod
+    def _load(path: str) -> Optional[dict]:
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _update_state(self, guild_id: int, key: str, update) -> None:
+        with self._lock:
+            path = self._state_path(guild_id)
+            state = self._load(path) or {}
+            state[key] = update(state.get(key))
+            atomic_write_json(path, state)
+
+    def get_metadata(self, guild_id: int) -> Optional[dict]:
+        return self._load(self._metadata_path(guild_id))
+
+    def set_metadata(self, guild_id: int, data: dict) -> None:
+        atomic_write_json(self._metadata_path(guild_id), data)
+
+    def delete_metadata(self, guild_id: int) -> None:
+        path = self._metadata_path(guild_id)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def guilds_for_url(self, url: str) -> List[int]:
+        # No index: every metadata file has to be read
+        guild_ids = []
+        for path in glob.glob(os.path.join(self.data_dir, "template_source_*.json")):
+            match = _METADATA_FILE_RE.search(path)
+            data = self._load(path) if match else None
+            if data and data.get("url") == url:
+                guild_ids.append(int(match.group(1)))
+        return sorted(guild_ids)
+
+    def guild_state(self, guild_id: int) -> dict:
+        """Everything in the guild's state file, empty if it has none."""
+        return self._load(self._state_path(guild_id)) or {}
+
+    def get_last_commit(self, guild_id: int) -> Optional[str]:
+        return (self._load(self._state_path(guild_id)) or {}).get("last_commit")
+
+    def set_last_commit(self, guild_id: int, commit: str) -> None:
+        self._update_state(guild_id, "last_commit", lambda _old: commit)
+
+    def get_fingerprint(self, guild_id: int, key: str) -> Optional[str]:
+        state = self._load(self._state_path(guild_id)) or {}
+        return state.get("fingerprints", {}).get(key)
+
+    def set_fingerprint(self, guild_id: int, key: str, fingerprint: str) -> None:
+        self._update_state(
+            guild_id, "fingerprints", lambda old: {**(old or {}), key: fingerprint}
+        )
+
+    def get_object_ids(self, guild_id: int) -> Dict[str, int]:
+        state = self._load(self._state_path(guild_id)) or {}
+        return dict(state.get("object_ids", {}))
+
+    def set_object_ids(self, guild_id: int, object_ids: Dict[str, int]) -> None:
+        self._update_state(
+            guild_id, "object_ids", lambda old: {**(old or {}), **object_ids}
+        )
+
+    def record_apply(self, record: ApplyRecord) -> None:
+        self._update_state(
+            record.guild_id,
+            "history",
+            lambda old: ((old or []) + [asdict(record)])[-JSON_HISTORY_LIMIT:],
+        )
+
+    def apply_history(self, guild_id: int, limit: int = 10) -> List[ApplyRecord]:
+        history = (self._load(self._state_path(guild_id)) or {}).get("history", [])
+        return [ApplyRecord(**entry) for entry in reversed(history[-limit:])]
+
+    def load_journal(self, guild_id: int) -> Optional[JournalState]:
+        path = self._journal_path(guild_id)
+        if not os.path.exists(path):
+            data = self._load(self._legacy_journal_path(guild_id))
+            if not data:
+                return None
+            ops = {key: (status, object_id) for key, (status, object_id) in data["ops"].items()}
+            return JournalState(data["apply_id"], data.get("fingerprint"), ops)
+        with open(path, "r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        if not lines:
+            return None
+        header = json.loads(lines[0])
+        ops = {}
+        for line in lines[1:]:
+            try:
+                key, status, object_id = json.loads(line)
+            except ValueError:
+                # A crash can leave the last line half written
+                break
+            ops[key] = (status, object_id)
+        return JournalState(header["apply_id"], header.get("fingerprint"), ops)
+
+    def start_journal(self, guild_id: int, state: JournalState) -> None:
+        lines = [json.dumps({"apply_id": state.apply_id, "fingerprint": state.fingerprint})]
+        lines.extend(
+            json.dumps([key, status, object_id]) for key, (status, object_id) in state.ops.items()
+        )
+        with self._lock:
+            atomic_write_text(self._journal_path(guild_id), "\n".join(lines) + "\n")
+            legacy = self._legacy_journal_path(guild_id)
+            if os.path.exists(legacy):
+                os.remove(legacy)
+
+    def journal_op(
+        self, guild_id: int, key: str, status: str, object_id: Optional[int] = None
+    ) -> None:
+        with self._lock:
+            path = self._journal_path(guild_id)
+            if not os.path.exists(path):
+                return
+            # Appended and flushed without fsync: a lost tail only repeats
+            # operations, which find their objects again by ID or name
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(json.dumps([key, status, object_id]) + "\n")
+
+    def clear_journal(self, guild_id: int) -> None:
+        with self._lock:
+            for path in (self._journal_path(guild_id), self._legacy_journal_path(guild_id)):
+                if os.path.exists(path):
+                    os.remove(path)
+
+
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS guild_metadata (
+    guild_id INTEGER PRIMARY KEY,
+    url TEXT,
+    branch TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_guild_metadata_url ON guild_metadata (url);
+CREATE TABLE IF NOT EXISTS guild_state (
+    guild_id INTEGER PRIMARY KEY,
+    last_commit TEXT
+);
+CREATE TABLE IF NOT EXISTS fingerprints (
+    guild_id INTEGER NOT NULL,
+    key TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    PRIMARY KEY (guild_id, key)
+);
+CREATE TABLE IF NOT EXISTS template_objects (
+    guild_id INTEGER NOT NULL,
+    template_id TEXT NOT NULL,
+    object_id INTEGER NOT NULL,
+    PRIMARY KEY (guild_id, template_id)
+);
+CREATE TABLE IF NOT EXISTS apply_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    guild_id INTEGER NOT NULL,
+    started_at REAL NOT NULL,
+    finished_at REAL NOT NULL,
+    status TEXT NOT NULL,
+    source TEXT NOT NULL DEFAULT '',
+    commit_sha TEXT,
+    fingerprint TEXT,
+    changes INTEGER NOT NULL DEFAULT 0,
+    warnings INTEGER NOT NULL DEFAULT 0,
+    api_calls INTEGER NOT NULL DEFAULT 0,
+    correlation_id TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_apply_history_guild ON apply_history (guild_id, id);
+CREATE TABLE IF NOT EXISTS apply_journal (
+    guild_id INTEGER PRIMARY KEY,
+    apply_id TEXT NOT NULL,
+    fingerprint TEXT
+);
+CREATE TABLE IF NOT EXISTS apply_journal_ops (
+    guild_id INTEGER NOT NULL,
+    op_key TEXT NOT NULL,
+    status TEXT NOT NULL,
+    object_id INTEGER,
+    PRIMARY KEY (guild_id, op_key)
+);
+CREATE TABLE IF NOT EXISTS store_settings (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def _history_row(record: ApplyRecord) -> tuple:
+    """An apply record as apply_history column values."""
+    return (
+        record.guild_id, record.started_at, record.finished_at, record.status,
+        record.source, record.commit, record.fingerprint, record.changes,
+        record.warnings, record.api_calls, record.correlation_id,
+    )
+
+
+class SqliteStateStore(StateStore):
+    """Single SQLite database in WAL mode, shared by every guild."""
+
+    def __init__(self, path: str, json_dir: Optional[str] = GITCORD_DATA_DIR):
+        import sqlite3  # Only the SQLite backend pays for the import
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SQLITE_SCHEMA)
+        if json_dir:
+            self._migrate_json(json_dir)
+
+    def _execute(self, sql: str, params=()) -> List["sqlite3.Row"]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    @contextlib.contextmanager
+    def _transaction(self) -> Iterator[None]:
+        """Run the block's statements as one transaction, rolled back if it raises."""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                yield
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def _migrate_json(self, json_dir: str) -> None:
+        """
+        Import JSON metadata, guild state and apply journal files once.
+
+        Databases that imported an earlier version, which carried less of
+        the JSON state, import the rest of it once more.
+        Apply history is only imported into a new database, where it cannot
+        end up listed after applies made with SQLite.
+        """
+        rows = self._execute("SELECT value FROM store_settings WHERE key = 'json_migrated'")
+        if rows and rows[0][0] == _JSON_MIGRATION_VERSION:
+            return
+        json_store = JsonStateStore(json_dir)
+        guild_ids = set()
+        for pattern, file_re in (
+            ("template_source_*.json", _METADATA_FILE_RE),
+            ("guild_state_*.json", _STATE_FILE_RE),
+            ("apply_journal_*.json*", _JOURNAL_FILE_RE),
+        ):
+            for path in glob.glob(os.path.join(json_dir, pattern)):
+                match = file_re.search(path)
+                if match:
+                    guild_ids.add(int(match.group(1)))
+        imported = 0
+        with self._transaction():
+            for guild_id in sorted(guild_ids):
+                imported += self._import_json_guild(json_store, guild_id, history=not rows)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO store_settings (key, value) "
+                "VALUES ('json_migrated', ?)",
+                (_JSON_MIGRATION_VERSION,),
+            )
+        if imported:
+            logger.info("Imported state for %d guild(s) from JSON into %s", imported, self.path)
+
+    def _import_json_guild(self, json_store: "JsonStateStore", guild_id: int, history: bool) -> int:
+        """
+        Copy one guild's JSON state into the open transaction, keeping rows already here.
+
+        Returns:
+            1 if the guild had anything to import, otherwise 0
+        """
+        data = json_store.get_metadata(guild_id)
+        state = json_store.guild_state(guild_id)
+        journal = json_store.load_journal(guild_id)
+        if data is None and not state and journal is None:
+            return 0
+        # An apply interrupted on the JSON backend resumes on SQLite
+        if journal is not None and not self._conn.execute(
+            "SELECT 1 FROM apply_journal WHERE guild_id = ?", (guild_id,)
+        ).fetchall():
+            self._write_journal(guild_id, journal)
+        if data is not None:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO guild_metadata (guild_id, url, branch, data) "
+                "VALUES (?, ?, ?, ?)",
+                (guild_id, data.get("url"), data.get("branch"), json.dumps(data)),
+            )
+        if state.get("last_commit"):
+            self._conn.execute(
+                "INSERT OR IGNORE INTO guild_state (guild_id, last_commit) VALUES (?, ?)",
+                (guild_id, state["last_commit"]),
+            )
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO fingerprints (guild_id, key, fingerprint) VALUES (?, ?, ?)",
+            [(guild_id, key, value) for key, value in state.get("fingerprints", {}).items()],
+        )
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO template_objects (guild_id, template_id, object_id) "
+            "VALUES (?, ?, ?)",
+            [(guild_id, key, value) for key, value in state.get("object_ids", {}).items()],
+        )
+        if history:
+            self._conn.executemany(
+                "INSERT INTO apply_history (guild_id, started_at, finished_at, status, source, "
+                "commit_sha, fingerprint, changes, warnings, api_calls, correlation_id) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [_history_row(ApplyRecord(**entry)) for entry in state.get("history", [])],
+            )
+        return 1
+
+    def get_metadata(self, guild_id: int) -> Optional[dict]:
+        rows = self._execute("SELECT data FROM guild_metadata WHERE guild_id = ?", (guild_id,))
+        return json.loads(rows[0][0]) if rows else None
+
+    def set_metadata(self, guild_id: int, data: dict) -> None:
+        self._execute(
+            "INSERT OR REPLACE INTO guild_metadata (guild_id, url, branch, data) "
+            "VALUES (?, ?, ?, ?)",
+            (guild_id, data.get("url"), data.get("branch"), json.dumps(data)),
+        )
+
+    def delete_metadata(self, guild_id: int) -> None:
+        self._execute("DELETE FROM guild_metadata WHERE guild_id = ?", (guild_id,))
+
+    def guilds_for_url(self, url: str) -> List[int]:
+        rows = self._execute(
+            "SELECT guild_id FROM guild_metadata WHERE url = ? ORDER BY guild_id", (url,)
+        )
+        return [row[0] for row in rows]
+
+    def get_last_commit(self, guild_id: int) -> Optional[str]:
+        rows = self._execute("SELECT last_commit FROM guild_state WHERE guild_id = ?", (guild_id,))
+        return rows[0][0] if rows else None
+
+    def set_last_commit(self, guild_id: int, commit: str) -> None:
+        self._execute(
+            "INSERT OR REPLACE INTO guild_state (guild_id, last_commit) VALUES (?, ?)",
+            (guild_id, commit),
+        )
+
+    def get_fingerprint(self, guild_id: int, key: str) -> Optional[str]:
+        rows = self._execute(
+            "SELECT fingerprint FROM fingerprints WHERE guild_id = ? AND key = ?",
+            (guild_id, key),
+        )
+        return rows[0][0] if rows else None
+
+    def set_fingerprint(self, guild_id: int, key: str, fingerprint: str) -> None:
+        self._execute(
+            "INSERT OR REPLACE INTO fingerprints (guild_id, key, fingerprint) VALUES (?, ?, ?)",
+            (guild_id, key, fingerprint),
+        )
+
+    def get_object_ids(self, guild_id: int) -> Dict[str, int]:
+        rows = self._execute(
+            "SELECT template_id, object_id FROM template_objects WHERE guild_id = ?", (guild_id,)
+        )
+        return dict(rows)
+
+    def set_object_ids(self, guild_id: int, object_ids: Dict[str, int]) -> None:
+        with self._transaction():
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO template_objects (guild_id, template_id, object_id) "
+                "VALUES (?, ?, ?)",
+                [(guild_id, key, object_id) for key, object_id in object_ids.items()],
+            )
+
+    def record_apply(self, record: ApplyRecord) -> None:
+        self._execute(
+            "INSERT INTO apply_history (guild_id, started_at, finished_at, status, source, "
+            "commit_sha, fingerprint, changes, warnings, api_calls, correlation_id) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            _history_row(record),
+        )
+
+    def apply_history(self, guild_id: int, limit: int = 10) -> List[ApplyRecord]:
+        rows = self._execute(
+            "SELECT guild_id, started_at, finished_at, status, source, commit_sha, fingerprint, "
+            "changes, warnings, api_calls, correlation_id FROM apply_history "
+            "WHERE guild_id = ? ORDER BY id DESC LIMIT ?",
+            (guild_id, limit),
+        )
+        return [ApplyRecord(*row) for row in rows]
+
+    def load_journal(self, guild_id: int) -> Optional[JournalState]:
+        rows = self._execute(
+            "SELECT apply_id, fingerprint FROM apply_journal WHERE guild_id = ?", (guild_id,)
+        )
+        if not rows:
+            return None
+        ops = self._execute(
+            "SELECT op_key, status, object_id FROM apply_journal_ops WHERE guild_id = ?",
+            (guild_id,),
+        )
+        return JournalState(
+            rows[0][0], rows[0][1], {key: (status, object_id) for key, status, object_id in ops}
+        )
+
+    def start_journal(self, guild_id: int, state: JournalState) -> None:
+        with self._transaction():
+            self._write_journal(guild_id, state)
+
+    def _write_journal(self, guild_id: int, state: JournalState) -> None:
+        """Replace a guild's journal inside the open transaction."""
+        self._conn.execute("DELETE FROM apply_journal_ops WHERE guild_id = ?", (guild_id,))
+        self._conn.execute(
+            "INSERT OR REPLACE INTO apply_journal (guild_id, apply_id, fingerprint) "
+            "VALUES (?, ?, ?)",
+            (guild_id, state.apply_id, state.fingerprint),
+        )
+        self._conn.executemany(
+            "INSERT INTO apply_journal_ops (guild_id, op_key, status, object_id) "
+            "VALUES (?, ?, ?, ?)",
+            [
+                (guild_id, key, status, object_id)
+                for key, (status, object_id) in state.ops.items()
+            ],
+        )
+
+    def journal_op(
+        self, guild_id: int, key: str, status: str, object_id: Optional[int] = None
+    ) -> None:
+        self._execute(
+            "INSERT OR REPLACE INTO apply_journal_ops (guild_id, op_key, status, object_id) "
+            "VALUES (?, ?, ?, ?)",
+            (guild_id, key, status, object_id),
+        )
+
+    def clear_journal(self, guild_id: int) -> None:
+        with self._transaction():
+            self._conn.execute("DELETE FROM apply_journal_ops WHERE guild_id = ?", (guild_id,))
+            self._conn.execute("DELETE FROM apply_journal WHERE guild_id = ?", (guild_id,))
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_store: Optional[StateStore] = None
+_store_lock = threading.Lock()
+
+
+def create_state_store() -> StateStore:
+    """Create the backend selected by ``GITCORD_STATE_BACKEND``."""
+    backend = os.getenv("GITCORD_STATE_BACKEND", "json").lower()
+    if backend == "sqlite":
+        path = os.getenv("GITCORD_STATE_DB") or os.path.join(GITCORD_DATA_DIR, "gitcord.db")
+        return SqliteStateStore(path)
+    if backend != "json":
+        raise ValueError(f"Unknown GITCORD_STATE_BACKEND: {backend}")
+    return JsonStateStore()
+
+
+def get_state_store() -> StateStore:
+    """Get the process-wide state store, creating it on first use."""
+    global _store  # pylint: disable=global-statement
+    with _store_lock:
+        if _store is None:
+            _store = create_state_store()
+        return _store
+
+
+def set_state_store(store: Optional[StateStore]) -> Optional[StateStore]:
+    """Replace the process-wide state store, returning the previous one."""
+    global _store  # pylint: disable=global-statement
+    with _store_lock:
+        previous, _store = _store, store
+    return previous
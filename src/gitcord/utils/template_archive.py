@@ -0,0 +1,297 @@
+"""
+Template archive downloads for GitCord bot.
+
+URL-based templates are fetched as a tar.gz archive over a pooled aiohttp
+session. The archive is decompressed as it streams in, on a worker thread,
+and only the YAML files of the template are kept, in memory. Nothing is
+written to disk.
+
+Downloads are cached per archive URL (repository and ref) together with
+their ``ETag``/``Last-Modified`` validators. Later downloads are conditional,
+and a ``304 Not Modified`` answer is served from the cache, so re-applying an
+unchanged remote template costs one tiny request.
+
+``GITCORD_ARCHIVE_BASE_URL`` changes where archives are downloaded from
+(``https://codeload.github.com`` by default), e.g. to a local stand-in.
+"""
+
+import asyncio
+import contextlib
+import json
+import os
+import posixpath
+import queue
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+import aiohttp
+
+from ..config import config
+from ..constants.paths import get_archive_cache_file
+from .logger import main_logger as logger
+from .metrics import TEMPLATE_DOWNLOADS
+from .state_store import atomic_write_json
+
+DEFAULT_ARCHIVE_BASE_URL = "https://codeload.github.com"
+CHUNK_SIZE = 64 * 1024
+
+# Templates are small; anything bigger than this is not a template
+MAX_TEMPLATE_BYTES = 5 * 1024 * 1024
+
+_YAML_SUFFIXES = (".yaml", ".yml")
+
+
+@dataclass
+class CachedArchive:
+    """YAML files of a downloaded archive and the validators to revalidate it."""
+
+    files: Dict[str, str]
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    @property
+    def validators(self) -> Dict[str, str]:
+        """Headers making a request conditional on this copy."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+def parse_github_url(url: str) -> Tuple[str, str]:
+    """
+    Get the owner and repository name from a GitHub URL.
+
+    Raises:
+        ValueError: If the URL is not a GitHub repository URL
+    """
+    parsed = urlparse(url)
+    if "github.com" not in parsed.netloc:
+        raise ValueError("Only GitHub URLs are supported.")
+    path_parts = parsed.path.strip("/").split("/")
+    if len(path_parts) < 2:
+        raise ValueError("Invalid GitHub URL.")
+    repo = path_parts[1]
+    if repo.endswith(".git"):
+        repo = repo[:-4]
+    return path_parts[0], repo
+
+
+class _ChunkStream:
+    """Blocking file-like reader over chunks pushed from the event loop."""
+
+    def __init__(self, max_chunks: int = 16):
+        self._chunks: queue.Queue = queue.Queue(max_chunks)
+        self._buffer = b""
+        self._eof = False
+
+    def feed(self, chunk: bytes) -> None:
+        """Queue a chunk; an empty chunk marks the end of the stream."""
+        self._chunks.put(chunk)
+
+    def try_feed(self, chunk: bytes) -> bool:
+        """Queue a chunk if there is room, without blocking."""
+        try:
+            self._chunks.put_nowait(chunk)
+        except queue.Full:
+            return False
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        """Read up to ``size`` bytes, or all of them if negative, blocking until they arrive."""
+        while not self._eof and (size < 0 or len(self._buffer) < size):
+            chunk = self._chunks.get()
+            if not chunk:
+                self._eof = True
+                break
+            self._buffer += chunk
+        if size < 0:
+            data, self._buffer = self._buffer, b""
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+    def drain(self) -> None:
+        """Discard whatever is still queued so the producer never blocks."""
+        while not self._eof:
+            if not self._chunks.get():
+                self._eof = True
+
+
+def _extract_yaml(stream: _ChunkStream) -> Dict[str, str]:
+    """
+    Read the YAML members of a streamed tar.gz, keyed by path from the repo root.
+
+    Raises:
+        ValueError: If the archive is truncated, corrupt or holds too much YAML
+    """
+    # Only needed by URL applies, so kept off the startup path
+    import gzip
+    import tarfile
+    import zlib
+
+    files: Dict[str, str] = {}
+    total = 0
+    try:
+        # gzip rather than tarfile's "r|gz" checks the trailer's CRC and length
+        with gzip.GzipFile(fileobj=stream, mode="rb") as compressed, \
+                tarfile.open(fileobj=compressed, mode="r|") as archive:
+            for member in archive:
+                if not member.isfile() or not member.name.endswith(_YAML_SUFFIXES):
+                    continue
+                # Archives hold a single "<repo>-<ref>/" root directory
+                _root, _, path = member.name.partition("/")
+                path = posixpath.normpath(path)
+                if path.startswith(".."):
+                    continue
+                if any(part.startswith(".") for part in path.split("/")):
+                    # Hidden folders such as .github are never part of a template
+                    continue
+                total += member.size
+                if total > MAX_TEMPLATE_BYTES:
+                    raise ValueError("Template archive has too much YAML to be a template.")
+                data = archive.extractfile(member).read()
+                files[path] = data.decode("utf-8")
+            # Members end before the gzip stream does; read on to reach its trailer
+            while compressed.read(CHUNK_SIZE):
+                pass
+    except (tarfile.TarError, EOFError, OSError, zlib.error) as e:
+        raise ValueError(f"Template archive is truncated or corrupt: {e}") from e
+    finally:
+        stream.drain()
+    return files
+
+
+def _select_folder(files: Dict[str, str], folder: Optional[str]) -> Dict[str, str]:
+    """Get the files under ``folder``, keyed relative to it."""
+    if not folder:
+        return dict(files)
+    prefix = folder.strip("/") + "/"
+    return {path[len(prefix):]: data for path, data in files.items() if path.startswith(prefix)}
+
+
+def _read_cache_file(path: str) -> Optional[CachedArchive]:
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return CachedArchive(**json.load(f))
+    except (OSError, ValueError, TypeError):
+        # A broken cache entry only costs a full download
+        return None
+
+
+class TemplateArchives:
+    """Downloads template archives over one shared HTTP session."""
+
+    def __init__(self, base_url: Optional[str] = None):
+        self.base_url = (
+            base_url or os.getenv("GITCORD_ARCHIVE_BASE_URL") or DEFAULT_ARCHIVE_BASE_URL
+        ).rstrip("/")
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._memory: "OrderedDict[str, CachedArchive]" = OrderedDict()
+
+    async def _cached(self, archive_url: str) -> Optional[CachedArchive]:
+        """Get the cached copy of an archive from memory or disk."""
+        cached = self._memory.get(archive_url)
+        if cached is None:
+            cached = await asyncio.to_thread(_read_cache_file, get_archive_cache_file(archive_url))
+        if cached is not None:
+            self._remember(archive_url, cached)
+        return cached
+
+    def _remember(self, archive_url: str, cached: CachedArchive) -> None:
+        self._memory[archive_url] = cached
+        self._memory.move_to_end(archive_url)
+        while len(self._memory) > config.performance.archive_cache_size:
+            self._memory.popitem(last=False)
+
+    async def _store(self, archive_url: str, cached: CachedArchive) -> None:
+        """Cache a downloaded archive if the server gave validators for it."""
+        if not cached.validators:
+            return
+        self._remember(archive_url, cached)
+        await asyncio.to_thread(atomic_write_json, get_archive_cache_file(archive_url), asdict(cached))
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=8))
+        return self._session
+
+    def archive_url(self, url: str, ref: str = "main") -> str:
+        """Get the tar.gz download URL of a GitHub repository at ``ref``."""
+        user, repo = parse_github_url(url)
+        return f"{self.base_url}/{user}/{repo}/tar.gz/{ref}"
+
+    async def fetch(self, url: str, folder: Optional[str] = None, ref: str = "main") -> Dict[str, str]:
+        """
+        Download a repository's template files, or revalidate a cached copy.
+
+        Args:
+            url: GitHub repository URL
+            folder: Subfolder holding the template, the repo root if omitted
+            ref: Branch, tag or commit
+
+        Returns:
+            Template file contents keyed by path relative to the template root
+
+        Raises:
+            ValueError: If the download fails or the folder has no YAML files
+        """
+        archive_url = self.archive_url(url, ref)
+        cached = await self._cached(archive_url)
+        headers = cached.validators if cached else {}
+        timeout = aiohttp.ClientTimeout(total=config.performance.http_timeout)
+        async with self._get_session().get(archive_url, headers=headers, timeout=timeout) as resp:
+            if resp.status == 304 and cached:
+                TEMPLATE_DOWNLOADS.inc("hit")
+                logger.info("Template archive %s not modified, using cached copy", archive_url)
+                all_files = cached.files
+            elif resp.status == 200:
+                TEMPLATE_DOWNLOADS.inc("miss")
+                all_files = await self._extract(resp)
+                await self._store(archive_url, CachedArchive(
+                    all_files, resp.headers.get("ETag"), resp.headers.get("Last-Modified")
+                ))
+                logger.info("Downloaded %d template file(s) from %s", len(all_files), archive_url)
+            else:
+                raise ValueError(
+                    f"Failed to download archive from {archive_url} (status {resp.status})"
+                )
+        files = _select_folder(all_files, folder)
+        if not files:
+            if folder:
+                raise ValueError(f"Subfolder '{folder}' not found in repo.")
+            raise ValueError("No template files found in repo.")
+        return files
+
+    @staticmethod
+    async def _extract(resp: aiohttp.ClientResponse) -> Dict[str, str]:
+        """Extract YAML files from an archive response as it streams in."""
+        stream = _ChunkStream()
+        extract = asyncio.ensure_future(asyncio.to_thread(_extract_yaml, stream))
+        try:
+            async for chunk in resp.content.iter_chunked(CHUNK_SIZE):
+                if not stream.try_feed(chunk):
+                    # The extractor is behind, wait for room off the loop
+                    await asyncio.to_thread(stream.feed, chunk)
+        except BaseException:
+            await asyncio.to_thread(stream.feed, b"")
+            with contextlib.suppress(Exception):
+                await extract
+            raise
+        await asyncio.to_thread(stream.feed, b"")
+        return await extract
+
+    async def close(self) -> None:
+        """Close the HTTP session."""
+        if self._session and not self._session.closed:
+            await self._session.close()
+
+
+# Shared so every download reuses the same connection pool
+template_archives = TemplateArchives()
@@ -1,24 +1,73 @@
-import os
-import json
-from ..constants.paths import get_metadata_file
+"""
+Per-guild template source metadata for GitCord bot.
+
+Metadata is kept in a write-through in-memory cache in front of the state
+store: each guild's entry is read at most once per process, and every write
+goes straight to the store (atomic file replace or SQLite transaction), so a
+crash never leaves a half-written entry behind.
+"""
+
+import threading
+from typing import Dict, Optional
+
+from .state_store import get_state_store
+
+_cache: Dict[int, Optional[dict]] = {}
+_locks: Dict[int, threading.Lock] = {}
+_locks_guard = threading.Lock()
+
+
+def _lock_for(guild_id: int) -> threading.Lock:
+    """Get the lock serialising metadata access for a guild."""
+    with _locks_guard:
+        return _locks.setdefault(guild_id, threading.Lock())
+
+
+def _read(guild_id: int) -> Optional[dict]:
+    """Return the cached metadata, reading the store on first use. Caller holds the lock."""
+    if guild_id not in _cache:
+        _cache[guild_id] = get_state_store().get_metadata(guild_id)
+    return _cache[guild_id]
+
+
+def _write(guild_id: int, data: dict) -> None:
+    """Persist metadata and update the cache entry. Caller holds the lock."""
+    get_state_store().set_metadata(guild_id, data)
+    _cache[guild_id] = dict(data)
+
 
 def save_metadata(guild_id, data):
-    with open(get_metadata_file(guild_id), "w", encoding="utf-8") as f:
-        json.dump(data, f)
+    """Replace a guild's metadata."""
+    guild_id = int(guild_id)
+    with _lock_for(guild_id):
+        _write(guild_id, data)
+
 
 def load_metadata(guild_id):
-    path = get_metadata_file(guild_id)
-    if not os.path.exists(path):
-        return None
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    """Get a copy of a guild's metadata, or None if it has none."""
+    guild_id = int(guild_id)
+    with _lock_for(guild_id):
+        data = _read(guild_id)
+    return dict(data) if data is not None else None
+
 
 def update_metadata(guild_id, key, value):
-    data = load_metadata(guild_id) or {}
-    data[key] = value
-    save_metadata(guild_id, data)
+    """Set a single metadata key for a guild."""
+    guild_id = int(guild_id)
+    with _lock_for(guild_id):
+        data = dict(_read(guild_id) or {})
+        data[key] = value
+        _write(guild_id, data)
+
 
 def clear_metadata(guild_id):
-    path = get_metadata_file(guild_id)
-    if os.path.exists(path):
-        os.remove(path) 
\ No newline at end of file
+    """Remove a guild's metadata."""
+    guild_id = int(guild_id)
+    with _lock_for(guild_id):
+        get_state_store().delete_metadata(guild_id)
+        _cache[guild_id] = None
+
+
+def guilds_for_url(url):
+    """Get the IDs of guilds whose template repository is ``url``."""
+    return get_state_store().guilds_for_url(url)
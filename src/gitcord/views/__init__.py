@@ -2,14 +2,27 @@
 Views module for GitCord bot UI components.
 """
 
-from .base_views import BaseView, ConfirmationView, ErrorView, LoadingView
+from .base_views import (
+    PERSISTENT_ITEMS,
+    BaseView,
+    ConfirmationView,
+    DeleteExtraObjectsView,
+    ErrorView,
+    LoadingView,
+    add_object_list_fields,
+)
 from .channel_views import DeleteExtraChannelsView, ConfirmDeleteView
+from .report_views import ApplyReportView
 
 __all__ = [
+    "PERSISTENT_ITEMS",
     "BaseView",
     "ConfirmationView",
+    "DeleteExtraObjectsView",
     "ErrorView",
     "LoadingView",
+    "add_object_list_fields",
     "DeleteExtraChannelsView",
     "ConfirmDeleteView",
+    "ApplyReportView",
 ]
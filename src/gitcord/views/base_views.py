@@ -2,17 +2,24 @@
 Base UI components and utilities for GitCord bot views.
 """
 
+import re
+from typing import Iterable, List, Optional
+
 import discord
-from discord.ui import Button, View
+from discord.ui import Button, DynamicItem, View
 
-from ..utils.helpers import create_embed
+from ..config import config
+from ..utils.helpers import create_embed, truncate_text
+from ..utils.logger import main_logger as logger
+from ..utils.metrics import tag_api_operation
 
 
 class BaseView(View):
     """Base view class with common functionality."""
 
-    def __init__(self, timeout=60):
-        super().__init__(timeout=timeout)
+    def __init__(self, timeout: Optional[float] = None):
+        # Omitted timeouts follow the view_timeout performance setting
+        super().__init__(timeout=config.performance.view_timeout if timeout is None else timeout)
 
     async def on_timeout(self):
         """Handle view timeout."""
@@ -31,7 +38,7 @@ class BaseView(View):
 class ConfirmationView(BaseView):
     """Base confirmation view with yes/no buttons."""
 
-    def __init__(self, title: str, description: str, timeout=60):
+    def __init__(self, title: str, description: str, timeout: Optional[float] = None):
         super().__init__(timeout=timeout)
         self.title = title
         self.description = description
@@ -107,126 +114,283 @@ class LoadingView(BaseView):
         self.add_item(loading_button)
 
 
-class DeleteExtraObjectsView(View):
+# Embed fields whose name starts with this prefix carry the mentions of the
+# objects a delete button acts on. Nothing else is kept between clicks, so the
+# buttons keep working after a restart and hold no channel objects in memory.
+EXTRA_FIELD_PREFIX = "Extra"
+_MENTION_RE = re.compile(r"<#(\d+)>")
+_FIELD_LIMIT = 1024
+_MAX_LIST_FIELDS = 5
+
+
+def _plural(label: str) -> str:
+    """Return the plural form of an object type label."""
+    return "categories" if label == "category" else f"{label}s"
+
+
+def add_object_list_fields(
+    embed: discord.Embed,
+    field_name: str,
+    object_ids: Iterable[int],
+    max_fields: int = _MAX_LIST_FIELDS,
+) -> List[int]:
     """
-    Generic view for confirming deletion of extra Discord objects (channels, categories, etc.).
-    Objects must have .name and .delete().
+    Add mention list fields for the given object IDs to an embed.
+
+    Args:
+        embed: Embed to add the fields to
+        field_name: Field name, must start with ``EXTRA_FIELD_PREFIX``
+        object_ids: Snowflake IDs of the listed channels or categories
+        max_fields: Maximum number of list fields to add
+
+    Returns:
+        The IDs that fit into the embed, which are the ones a delete button acts on
     """
+    ids = list(object_ids)
+    chunks: List[List[str]] = [[]]
+    size = 0
+    for object_id in ids:
+        line = f"• <#{object_id}>"
+        if chunks[-1] and size + len(line) + 1 > _FIELD_LIMIT:
+            chunks.append([])
+            size = 0
+        chunks[-1].append(line)
+        size += len(line) + 1
+
+    listed = chunks[:max_fields]
+    for index, chunk in enumerate(listed):
+        if chunk:
+            embed.add_field(
+                name=field_name if not index else f"{field_name} (cont.)",
+                value="\n".join(chunk),
+                inline=False,
+            )
+    count = sum(len(chunk) for chunk in listed)
+    if count < len(ids):
+        embed.add_field(
+            name="Not Listed",
+            value=f"{len(ids) - count} more, run the command again after cleanup.",
+            inline=False,
+        )
+    return ids[:count]
+
+
+def object_ids_from_message(message: discord.Message | None) -> List[int]:
+    """Read the object IDs listed in a message's ``Extra ...`` embed fields."""
+    if message is None:
+        return []
+    object_ids: List[int] = []
+    for embed in message.embeds:
+        for field in embed.fields:
+            if field.name and field.name.startswith(EXTRA_FIELD_PREFIX):
+                for match in _MENTION_RE.finditer(field.value or ""):
+                    object_id = int(match.group(1))
+                    if object_id not in object_ids:
+                        object_ids.append(object_id)
+    return object_ids
+
+
+class DeleteExtraObjectsButton(
+    DynamicItem[Button],
+    template=r"gitcord:delete_extra:(?P<label>[a-z]+):(?P<scope>\d+)",
+):
+    """
+    Persistent button that starts deletion of the objects listed in its message.
 
-    def __init__(self, extra_objects, object_type_label, timeout=60):
-        super().__init__(timeout=timeout)
-        self.extra_objects = extra_objects
-        self.object_type_label = object_type_label
-        delete_button = Button(
-            label=f"🗑️ Delete Extra {object_type_label.title()}s",
-            style=discord.ButtonStyle.danger,
-            custom_id=f"delete_extra_{object_type_label}s",
+    The custom ID encodes the object type label and an optional scope (the
+    category the objects belong to, or ``0`` for the whole guild).
+    """
+
+    def __init__(self, object_type_label: str, scope_id: int = 0):
+        super().__init__(
+            Button(
+                label=f"🗑️ Delete Extra {_plural(object_type_label).title()}",
+                style=discord.ButtonStyle.danger,
+                custom_id=f"gitcord:delete_extra:{object_type_label}:{scope_id}",
+            )
         )
-        delete_button.callback = self.delete_callback
-        self.add_item(delete_button)
+        self.object_type_label = object_type_label
+        self.scope_id = scope_id
 
-    async def delete_callback(self, interaction: discord.Interaction):
-        # Check permissions (manage_channels for channels, manage_channels for categories)
-        if not interaction.user.guild_permissions.manage_channels:  # type: ignore
-            from ..utils.helpers import create_embed
+    @classmethod
+    async def from_custom_id(
+        cls, interaction: discord.Interaction, item: Button, match: re.Match[str], /
+    ):
+        return cls(match["label"], int(match["scope"]))
 
+    async def callback(self, interaction: discord.Interaction):
+        """Ask for confirmation before deleting the listed objects."""
+        plural = _plural(self.object_type_label)
+        if not interaction.user.guild_permissions.manage_channels:  # type: ignore
             embed = create_embed(
                 title="❌ Permission Denied",
-                description=f"You need the 'Manage Channels' permission to delete {self.object_type_label}s.",
+                description=f"You need the 'Manage Channels' permission to delete {plural}.",
                 color=discord.Color.red(),
             )
             await interaction.response.send_message(embed=embed, ephemeral=True)
             return
-        # Create confirmation embed
-        object_list = "\n".join(
-            [
-                f"• {getattr(obj, 'mention', '#' + obj.name)}"
-                for obj in self.extra_objects
-            ]
-        )
-        from ..utils.helpers import create_embed
 
+        object_ids = [
+            object_id
+            for object_id in object_ids_from_message(interaction.message)
+            if interaction.guild and interaction.guild.get_channel(object_id)
+        ]
+        if not object_ids:
+            embed = create_embed(
+                title="ℹ️ Nothing to Delete",
+                description=f"The listed {plural} no longer exist.",
+            )
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+            return
+
+        scope = ""
+        if self.scope_id and interaction.guild:
+            category = interaction.guild.get_channel(self.scope_id)
+            if category:
+                scope = f" from **{category.name}**"
         embed = create_embed(
             title="⚠️ Confirm Deletion",
             description=(
-                f"Are you sure you want to delete the following {self.object_type_label}s?\n\n{object_list}\n\n**This action is irreversible!**"
+                f"Are you sure you want to delete the following {plural}{scope}?\n\n"
+                "**This action is irreversible!**"
             ),
             color=discord.Color.orange(),
         )
-        confirm_view = ConfirmDeleteObjectsView(
-            self.extra_objects, self.object_type_label
-        )
+        add_object_list_fields(embed, f"{EXTRA_FIELD_PREFIX} {plural.title()}", object_ids)
         await interaction.response.send_message(
-            embed=embed, view=confirm_view, ephemeral=True
+            embed=embed,
+            view=ConfirmDeleteObjectsView(self.object_type_label),
+            ephemeral=True,
         )
 
 
-class ConfirmDeleteObjectsView(View):
-    """
-    View for final confirmation of object deletion.
-    Objects must have .name and .delete().
-    """
+class ConfirmDeleteObjectsButton(
+    DynamicItem[Button], template=r"gitcord:confirm_delete:(?P<label>[a-z]+)"
+):
+    """Persistent button that deletes the objects listed in its message."""
 
-    def __init__(self, extra_objects, object_type_label, timeout=60):
-        super().__init__(timeout=timeout)
-        self.extra_objects = extra_objects
-        self.object_type_label = object_type_label
-        confirm_button = Button(
-            label="✅ Yes, Delete All",
-            style=discord.ButtonStyle.danger,
-            custom_id="confirm_delete",
-        )
-        confirm_button.callback = self.confirm_callback
-        cancel_button = Button(
-            label="❌ Cancel",
-            style=discord.ButtonStyle.secondary,
-            custom_id="cancel_delete",
+    def __init__(self, object_type_label: str):
+        super().__init__(
+            Button(
+                label="✅ Yes, Delete All",
+                style=discord.ButtonStyle.danger,
+                custom_id=f"gitcord:confirm_delete:{object_type_label}",
+            )
         )
-        cancel_button.callback = self.cancel_callback
-        self.add_item(confirm_button)
-        self.add_item(cancel_button)
+        self.object_type_label = object_type_label
 
-    async def confirm_callback(self, interaction: discord.Interaction):
+    @classmethod
+    async def from_custom_id(
+        cls, interaction: discord.Interaction, item: Button, match: re.Match[str], /
+    ):
+        return cls(match["label"])
+
+    async def callback(self, interaction: discord.Interaction):
+        """Resolve the listed IDs from the guild cache and delete them."""
+        plural = _plural(self.object_type_label)
         deleted = []
         failed = []
-        for obj in self.extra_objects:
-            try:
-                await obj.delete()
-                deleted.append(obj.name)
-            except Exception:
-                failed.append(obj.name)
-        from ..utils.helpers import create_embed
+        with tag_api_operation("delete_view"):
+            for object_id in object_ids_from_message(interaction.message):
+                obj = interaction.guild.get_channel(object_id) if interaction.guild else None
+                if obj is None:
+                    continue
+                try:
+                    await obj.delete()
+                    deleted.append(obj.name)
+                    logger.info("Deleted extra %s '%s'", self.object_type_label, obj.name)
+                except (discord.Forbidden, discord.HTTPException) as e:
+                    failed.append(obj.name)
+                    logger.error(
+                        "Failed to delete %s '%s': %s", self.object_type_label, obj.name, e
+                    )
 
         if deleted:
             embed = create_embed(
-                title=f"✅ {self.object_type_label.title()}s Deleted",
-                description=f"Successfully deleted {len(deleted)} {self.object_type_label}s.",
+                title=f"✅ {plural.title()} Deleted",
+                description=f"Successfully deleted {len(deleted)} {plural}.",
                 color=discord.Color.green(),
             )
             embed.add_field(
                 name="Deleted",
-                value="\n".join([f"• {name}" for name in deleted]),
+                value=truncate_text("\n".join([f"• {name}" for name in deleted])),
                 inline=False,
             )
             if failed:
                 embed.add_field(
                     name="Failed",
-                    value="\n".join([f"• {name}" for name in failed]),
+                    value=truncate_text("\n".join([f"• {name}" for name in failed])),
                     inline=False,
                 )
-        else:
+        elif failed:
             embed = create_embed(
                 title="❌ Deletion Failed",
                 description="Failed to delete any objects. Please check permissions and try again.",
                 color=discord.Color.red(),
             )
+        else:
+            embed = create_embed(
+                title="ℹ️ Nothing to Delete",
+                description=f"The listed {plural} no longer exist.",
+            )
         await interaction.response.edit_message(embed=embed, view=None)
 
-    async def cancel_callback(self, interaction: discord.Interaction):
-        from ..utils.helpers import create_embed
 
+class CancelDeleteObjectsButton(
+    DynamicItem[Button], template=r"gitcord:cancel_delete:(?P<label>[a-z]+)"
+):
+    """Persistent button that cancels a pending deletion."""
+
+    def __init__(self, object_type_label: str):
+        super().__init__(
+            Button(
+                label="❌ Cancel",
+                style=discord.ButtonStyle.secondary,
+                custom_id=f"gitcord:cancel_delete:{object_type_label}",
+            )
+        )
+        self.object_type_label = object_type_label
+
+    @classmethod
+    async def from_custom_id(
+        cls, interaction: discord.Interaction, item: Button, match: re.Match[str], /
+    ):
+        return cls(match["label"])
+
+    async def callback(self, interaction: discord.Interaction):
+        """Handle cancel button click."""
         embed = create_embed(
             title="❌ Deletion Cancelled",
-            description=f"{self.object_type_label.title()} deletion was cancelled."
+            description=f"{self.object_type_label.title()} deletion was cancelled.",
         )
         await interaction.response.edit_message(embed=embed, view=None)
+
+
+class DeleteExtraObjectsView(View):
+    """
+    Generic view for confirming deletion of extra Discord objects (channels, categories, etc.).
+
+    The message sent with this view must list the objects with
+    ``add_object_list_fields``; the view itself only holds a persistent button.
+    """
+
+    def __init__(self, object_type_label, scope_id: int = 0):
+        super().__init__(timeout=None)
+        self.add_item(DeleteExtraObjectsButton(object_type_label, scope_id))
+
+
+class ConfirmDeleteObjectsView(View):
+    """View for final confirmation of object deletion."""
+
+    def __init__(self, object_type_label):
+        super().__init__(timeout=None)
+        self.add_item(ConfirmDeleteObjectsButton(object_type_label))
+        self.add_item(CancelDeleteObjectsButton(object_type_label))
+
+
+# Registered with ``Client.add_dynamic_items`` so the buttons survive restarts
+PERSISTENT_ITEMS = (
+    DeleteExtraObjectsButton,
+    ConfirmDeleteObjectsButton,
+    CancelDeleteObjectsButton,
+)
@@ -0,0 +1,81 @@
+"""
+Apply report UI components for GitCord bot.
+"""
+
+from typing import TYPE_CHECKING, Optional
+
+import discord
+from discord.ui import Button
+
+from ..config import config
+from .base_views import BaseView, DeleteExtraObjectsButton
+
+if TYPE_CHECKING:
+    from ..utils.apply_report import ApplyReport
+
+
+class ApplyReportView(BaseView):
+    """Page buttons for the change list plus a single cleanup action."""
+
+    def __init__(self, report: "ApplyReport", timeout: Optional[float] = None):
+        super().__init__(
+            timeout=config.performance.report_view_timeout if timeout is None else timeout
+        )
+        self.report = report
+        self.page = 0
+        self.message: Optional[discord.Message] = None
+
+        if report.page_count > 1:
+            self.previous_button: Button = Button(
+                label="◀ Previous", style=discord.ButtonStyle.secondary, disabled=True
+            )
+            self.previous_button.callback = self.previous_callback
+            self.next_button: Button = Button(
+                label="Next ▶", style=discord.ButtonStyle.secondary
+            )
+            self.next_button.callback = self.next_callback
+            self.add_item(self.previous_button)
+            self.add_item(self.next_button)
+
+        if report.extra_ids:
+            # Persistent, so cleanup still works once the page buttons expire
+            self.add_item(DeleteExtraObjectsButton("object"))
+
+    async def send(self, ctx=None, interaction=None, message=None) -> discord.Message:
+        """Send the report, replacing ``message`` (such as a progress message) if given."""
+        embeds = self.report.build_embeds(self.page)
+        if message:
+            self.message = await message.edit(embeds=embeds, view=self)
+        elif interaction:
+            self.message = await interaction.followup.send(
+                embeds=embeds, view=self, wait=True
+            )
+        else:
+            self.message = await ctx.send(embeds=embeds, view=self)
+        return self.message
+
+    async def _show_page(self, interaction: discord.Interaction, page: int):
+        """Re-render the report at the given page."""
+        self.page = min(max(page, 0), self.report.page_count - 1)
+        self.previous_button.disabled = self.page == 0
+        self.next_button.disabled = self.page == self.report.page_count - 1
+        await interaction.response.edit_message(
+            embeds=self.report.build_embeds(self.page), view=self
+        )
+
+    async def previous_callback(self, interaction: discord.Interaction):
+        """Handle previous page button click."""
+        await self._show_page(interaction, self.page - 1)
+
+    async def next_callback(self, interaction: discord.Interaction):
+        """Handle next page button click."""
+        await self._show_page(interaction, self.page + 1)
+
+    async def on_timeout(self):
+        """Disable the page buttons once the view expires."""
+        await super().on_timeout()
+        if self.message and self.report.page_count > 1:
+            try:
+                await self.message.edit(view=self)
+            except discord.HTTPException:
+                pass